@@ -1,7 +1,11 @@
 from flask import Flask
 from .config import Config
+from . import cache, metrics, query_trace
 from flask_cors import CORS
 from app.auth.token_utils import configure_jwt
+from app.auth import middleware as auth_middleware, passwords, refresh_tokens
+from app.data import database, feed_matrix, food_types, write_queue
+from app.data.migrations import apply_migrations
 from .routes import register_routes
 
 def create_app():
@@ -12,8 +16,39 @@ def create_app():
     app.config.from_object(Config)
     CORS(app, supports_credentials=True, origins=["http://localhost:3000"])
 
+    # Record request and SQL metrics, before any other request hook runs
+    metrics.init_app(app)
+
+    # Opt-in slow-query and N+1 diagnostics (QUERY_TRACE_ENABLED)
+    query_trace.init_app(app)
+
     # Configure JWT with secret key
-    configure_jwt(app.config['SECRET_KEY'])
+    configure_jwt(app.config['SECRET_KEY'], app.config.get('TOKEN_CACHE_SIZE'), app.config.get('ACCESS_TOKEN_TTL'))
+    refresh_tokens.init_app(app)
+
+    # Configure the password hashing worker pool
+    passwords.init_app(app)
+
+    # Authenticate every request once, before the routes run
+    auth_middleware.init_app(app)
+
+    # Bring the database schema up to date
+    apply_migrations(app.config['DATABASE_PATH'])
+
+    # Configure the SQLite connection pool
+    database.init_app(app)
+
+    # Group-commit small writes on a dedicated writer thread
+    write_queue.init_app(app)
+
+    # Prune the event change log read by the feed
+    feed_matrix.init_app(app)
+
+    # Load the FoodTypes reference map
+    food_types.init_app(app)
+
+    # Configure the in-process response caches
+    cache.init_app(app)
 
     # Register routes
     register_routes(app)
@@ -3,3 +3,4 @@ The auth package is responsible for authentication-related utilities.
 """
 
 from app.auth.token_utils import generate_token, validate_token
+from app.auth.middleware import load_current_user
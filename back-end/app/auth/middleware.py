@@ -0,0 +1,17 @@
+from flask import g, request
+from app.auth.token_utils import validate_token
+
+
+def load_current_user():
+    """
+    Authenticate the request once, before any route runs: validate the token cookie (if any)
+    and set g.user_id to its user ID, or None.
+    """
+    g.user_id = validate_token(request.cookies.get('token'))
+
+
+def init_app(app):
+    """
+    Register the authentication layer on the application.
+    """
+    app.before_request(load_current_user)
@@ -0,0 +1,132 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from werkzeug.security import generate_password_hash, check_password_hash
+
+# Werkzeug's default; "method$salt$hash" hashes store the full method string
+DEFAULT_HASH_METHOD = 'scrypt:32768:8:1'
+
+_settings = {
+    'method': DEFAULT_HASH_METHOD,
+    'workers': os.cpu_count() or 1,
+    'max_pending': (os.cpu_count() or 1) * 4,
+    'timeout': 10.0,
+}
+
+_executor = None
+_executor_pid = None
+_pending = None
+_lock = threading.Lock()
+
+
+class HashingPoolBusy(Exception):
+    """
+    Raised when too many hash or verify operations are already queued, or one did not finish
+    within the configured timeout.
+    """
+
+
+def init_app(app):
+    """
+    Configure the password hashing pool from the app config. The pool itself is started
+    lazily in each process that uses it, so it is never shared across a fork.
+    """
+    global _executor, _pending
+
+    workers = int(app.config.get('PASSWORD_HASH_WORKERS') or _settings['workers'])
+    _settings.update(
+        method=app.config.get('PASSWORD_HASH_METHOD', DEFAULT_HASH_METHOD),
+        workers=workers,
+        max_pending=int(app.config.get('PASSWORD_HASH_MAX_PENDING') or workers * 4),
+        timeout=float(app.config.get('PASSWORD_HASH_TIMEOUT', 10.0)),
+    )
+
+    with _lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False)
+        _executor = None
+        _pending = None
+
+
+def _get_executor():
+    global _executor, _executor_pid, _pending
+
+    with _lock:
+        if _executor is None or _executor_pid != os.getpid():
+            # spawn, not fork: the web server process is multi-threaded
+            _executor = ProcessPoolExecutor(
+                max_workers=_settings['workers'],
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+            _executor_pid = os.getpid()
+            _pending = threading.BoundedSemaphore(_settings['max_pending'])
+        return _executor, _pending
+
+
+def _run(fn, *args):
+    executor, pending = _get_executor()
+
+    if not pending.acquire(blocking=False):
+        raise HashingPoolBusy()
+
+    try:
+        future = executor.submit(fn, *args)
+    except Exception:
+        pending.release()
+        raise
+
+    future.add_done_callback(lambda _: pending.release())
+    try:
+        return future.result(timeout=_settings['timeout'])
+    except FutureTimeoutError:
+        raise HashingPoolBusy()
+    except BrokenProcessPool:
+        # A worker died; start a fresh pool on the next call
+        _reset_executor(executor)
+        raise HashingPoolBusy()
+
+
+def _reset_executor(executor):
+    global _executor
+
+    with _lock:
+        if _executor is executor:
+            _executor = None
+
+
+def _hash(password, method):
+    return generate_password_hash(password, method=method)
+
+
+def _verify(password_hash, password):
+    return check_password_hash(password_hash, password)
+
+
+def hash_password(password):
+    """
+    hash_password(password) hashes a password in the worker pool with the configured method.
+
+    Raises:
+        HashingPoolBusy: If the pool's queue is full.
+    """
+    return _run(_hash, password, _settings['method'])
+
+
+def verify_password(password_hash, password):
+    """
+    verify_password(password_hash, password) checks a password in the worker pool.
+
+    Raises:
+        HashingPoolBusy: If the pool's queue is full.
+    """
+    return _run(_verify, password_hash, password)
+
+
+def needs_rehash(password_hash):
+    """
+    needs_rehash(password_hash) returns True if the hash was made with a method or cost other
+    than the configured one.
+    """
+    return password_hash.split('$', 1)[0] != _settings['method']
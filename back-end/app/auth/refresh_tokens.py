@@ -0,0 +1,122 @@
+import hashlib
+import logging
+import secrets
+import time
+from app.data.database import get_db_connection
+
+logger = logging.getLogger(__name__)
+
+_settings = {
+    'ttl': 30 * 24 * 3600,
+}
+
+
+def init_app(app):
+    """
+    Configure refresh token lifetime from the app config, and schedule the purge of expired
+    tokens on the write queue's writer thread.
+    """
+    from app.data.write_queue import add_maintenance_task
+
+    _settings['ttl'] = int(app.config.get('REFRESH_TOKEN_TTL', _settings['ttl']))
+    add_maintenance_task(
+        purge_expired_refresh_tokens, float(app.config.get('REFRESH_TOKEN_PURGE_INTERVAL', 3600))
+    )
+
+
+def _digest(token):
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def issue_refresh_token(user_id, family_id=None):
+    """
+    issue_refresh_token(user_id) creates a refresh token for a user. The caller commits.
+
+    Parameters:
+        user_id (int): The user the token belongs to.
+        family_id (str): The family of the token being rotated, or None to start a new one.
+
+    Returns:
+        str: The refresh token. Only its digest is stored.
+    """
+    token = secrets.token_urlsafe(32)
+    conn = get_db_connection()
+    conn.execute(
+        """
+        INSERT INTO RefreshToken (token_hash, user_id, family_id, expires_at)
+        VALUES (?, ?, ?, ?)
+        """,
+        (_digest(token), user_id, family_id or secrets.token_hex(16), int(time.time()) + _settings['ttl'])
+    )
+    return token
+
+
+def rotate_refresh_token(token):
+    """
+    rotate_refresh_token(token) revokes a valid refresh token and issues its replacement.
+
+    Presenting a token that was already rotated means it was copied, so its whole family is
+    revoked and the user has to log in again.
+
+    Returns:
+        tuple: (user_id, new_token), or (None, None) if the token is invalid.
+    """
+    if not token:
+        return None, None
+
+    token_hash = _digest(token)
+    conn = get_db_connection()
+
+    # A single indexed update both validates and revokes the token
+    row = conn.execute(
+        """
+        UPDATE RefreshToken SET revoked = 1
+        WHERE token_hash = ? AND revoked = 0 AND expires_at > ?
+        RETURNING user_id, family_id
+        """,
+        (token_hash, int(time.time()))
+    ).fetchone()
+
+    if row is None:
+        reused = conn.execute(
+            "SELECT family_id FROM RefreshToken WHERE token_hash = ? AND revoked = 1",
+            (token_hash,)
+        ).fetchone()
+        if reused is not None:
+            logger.warning("Refresh token reuse detected; revoking token family")
+            conn.execute("UPDATE RefreshToken SET revoked = 1 WHERE family_id = ?", (reused["family_id"],))
+        conn.commit()
+        return None, None
+
+    new_token = issue_refresh_token(row["user_id"], row["family_id"])
+    conn.commit()
+    return row["user_id"], new_token
+
+
+def revoke_refresh_token(token):
+    """
+    revoke_refresh_token(token) revokes a refresh token and every token rotated from the same login.
+    """
+    if not token:
+        return
+
+    conn = get_db_connection()
+    conn.execute(
+        """
+        UPDATE RefreshToken SET revoked = 1
+        WHERE family_id = (SELECT family_id FROM RefreshToken WHERE token_hash = ?)
+        """,
+        (_digest(token),)
+    )
+    conn.commit()
+
+
+def purge_expired_refresh_tokens(conn):
+    """
+    purge_expired_refresh_tokens(conn) deletes expired refresh tokens, which are no longer useful
+    to reuse detection. The caller commits.
+
+    Returns:
+        int: The number of tokens deleted.
+    """
+    return conn.execute("DELETE FROM RefreshToken WHERE expires_at <= ?", (int(time.time()),)).rowcount
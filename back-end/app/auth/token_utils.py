@@ -1,15 +1,40 @@
+import hashlib
+import logging
 import jwt
 from datetime import datetime, timedelta, timezone
+from app.cache import TTLCache
+
+logger = logging.getLogger(__name__)
 
 SECRET_KEY = None
 
+# Lifetime of access tokens, in seconds; sessions can be renewed with a refresh token
+ACCESS_TOKEN_TTL = 60 * 60
+
+# Verified claims keyed by token digest; each entry expires with the token's exp claim
+_token_cache = TTLCache(max_entries=10000, ttl=3600)
 
-def configure_jwt(secret_key):
+
+def configure_jwt(secret_key, cache_size=None, access_token_ttl=None):
     """
     Configure the JWT utility with the application's secret key.
     """
-    global SECRET_KEY
+    global SECRET_KEY, ACCESS_TOKEN_TTL
     SECRET_KEY = secret_key
+    if access_token_ttl is not None:
+        ACCESS_TOKEN_TTL = access_token_ttl
+
+    # Tokens verified with a previous key must be verified again
+    _token_cache.clear()
+    if cache_size is not None:
+        _token_cache.max_entries = cache_size
+
+
+def get_token_cache_stats():
+    """
+    get_token_cache_stats() returns the decoded-token cache counters.
+    """
+    return _token_cache.stats()
 
 
 def generate_token(user_id):
@@ -22,7 +47,7 @@ def generate_token(user_id):
         )
 
     now = datetime.now(timezone.utc)  # Current time in UTC
-    exp = now + timedelta(hours=1)  # Token expires in 1 hour
+    exp = now + timedelta(seconds=ACCESS_TOKEN_TTL)
 
     payload = {"user_id": user_id, "exp": exp.timestamp()}  # Convert to Unix timestamp
     token = jwt.encode(payload, SECRET_KEY, algorithm="HS256")
@@ -30,26 +55,36 @@ def generate_token(user_id):
 
 
 def validate_token(token):
+    """
+    Validate a JWT and return its user ID, or None if it is invalid or expired.
+
+    A token is only decoded and verified once; the verified claims are cached under the
+    token's SHA-256 digest until the token expires.
+    """
+    if not token:
+        return None
+
+    key = hashlib.sha256(token.encode()).digest()
+    user_id = _token_cache.get(key)
+    if user_id is not None:
+        return user_id
+
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=["HS256"])
-        print(f"Decoded payload: {payload}")
-
-        # Convert expiration time to a human-readable format
-        exp = datetime.fromtimestamp(payload["exp"], timezone.utc)
-        print(f"Token expiration time (UTC): {exp}")
+        logger.debug("Decoded token payload: %s", payload)
 
         # Check if the token has expired
-        current_time = datetime.now(timezone.utc)
-        print(f"Current time (UTC): {current_time}")
-
-        if payload["exp"] < current_time.timestamp():
-            print("Token has expired.")
+        if payload["exp"] < datetime.now(timezone.utc).timestamp():
+            logger.debug("Token has expired.")
             return None
 
-        return payload.get("user_id")
+        user_id = payload.get("user_id")
+        if user_id is not None:
+            _token_cache.set(key, user_id, expires_at=payload["exp"])
+        return user_id
     except jwt.ExpiredSignatureError:
-        print("Token has expired (ExpiredSignatureError).")
+        logger.debug("Token has expired (ExpiredSignatureError).")
         return None
     except jwt.InvalidTokenError as e:
-        print(f"Invalid token error: {e}")
+        logger.debug("Invalid token error: %s", e)
         return None
@@ -0,0 +1,303 @@
+"""
+In-process caches and HTTP caching helpers shared by the routes.
+"""
+
+import hashlib
+import multiprocessing
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from flask import Response, current_app, request
+
+# Identifies this app instance (shared by forked workers) so ETags built from in-memory
+# version counters never collide with ones issued before a restart
+INSTANCE_ID = secrets.token_hex(4)
+
+
+class VersionCounter:
+    """
+    VersionCounter is a monotonically increasing counter used to invalidate cached data.
+
+    The value lives in shared memory, so when the app is created before a pre-forking
+    server forks its workers, a bump in one worker is seen by all of them.
+    """
+
+    def __init__(self):
+        self._value = multiprocessing.Value('q', 0)
+
+    @property
+    def value(self):
+        return self._value.value
+
+    def bump(self):
+        """
+        bump() increments the counter and returns the new value.
+        """
+        with self._value.get_lock():
+            self._value.value += 1
+            return self._value.value
+
+
+class KeyedVersionCounter:
+    """
+    KeyedVersionCounter keeps a VersionCounter per key (e.g. per user), so invalidating one
+    key's cached data leaves every other key's entries valid.
+
+    The counters live in a fixed shared-memory array like VersionCounter's value, so bumps are
+    seen by forked workers too. Keys are hashed onto the array's slots; two keys that share a
+    slot also share invalidations, which only costs an extra miss.
+    """
+
+    def __init__(self, slots=4096):
+        self._values = multiprocessing.Array('q', slots)
+
+    def _slot(self, key):
+        return hash(key) % len(self._values)
+
+    def value(self, key):
+        return self._values[self._slot(key)]
+
+    def bump(self, key):
+        """
+        bump(key) increments the key's counter and returns the new value.
+        """
+        with self._values.get_lock():
+            slot = self._slot(key)
+            self._values[slot] += 1
+            return self._values[slot]
+
+
+class ResponseCache:
+    """
+    ResponseCache is a thread-safe LRU cache of encoded response bodies, bounded by size in bytes.
+
+    Every entry is stored with the version it was built at and is treated as a miss once the
+    version has moved on or the entry is older than ttl seconds.
+    """
+
+    def __init__(self, max_bytes=8 * 1024 * 1024, ttl=300):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'stale': 0, 'evictions': 0}
+
+    def configure(self, max_bytes, ttl):
+        with self._lock:
+            self.max_bytes = max_bytes
+            self.ttl = ttl
+            self._evict()
+
+    def get(self, key, version):
+        """
+        get(key, version) returns the cached body for key if it was built at version, else None.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats['misses'] += 1
+                return None
+
+            entry_version, stored_at, body = entry
+            if entry_version != version or time.monotonic() - stored_at > self.ttl:
+                self._remove(key)
+                self._stats['stale'] += 1
+                self._stats['misses'] += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            return body
+
+    def set(self, key, version, body):
+        """
+        set(key, version, body) stores an encoded body built at version.
+        Bodies larger than the whole cache are not stored.
+        """
+        if len(body) > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (version, time.monotonic(), body)
+            self._size += len(body)
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self):
+        """
+        stats() returns the hit/miss counters and current size.
+        """
+        with self._lock:
+            lookups = self._stats['hits'] + self._stats['misses']
+            return dict(
+                self._stats,
+                entries=len(self._entries),
+                bytes=self._size,
+                max_bytes=self.max_bytes,
+                hit_ratio=self._stats['hits'] / lookups if lookups else 0.0,
+            )
+
+    def _remove(self, key):
+        _, _, body = self._entries.pop(key)
+        self._size -= len(body)
+
+    def _evict(self):
+        while self._size > self.max_bytes and self._entries:
+            _, (_, _, body) = self._entries.popitem(last=False)
+            self._size -= len(body)
+            self._stats['evictions'] += 1
+
+
+class TTLCache:
+    """
+    TTLCache is a thread-safe LRU cache bounded by entry count, where each entry expires at
+    its own absolute time (time.time() seconds).
+
+    Entries can also be stored with a version, in which case they are treated as a miss once
+    looked up with a different one.
+    """
+
+    def __init__(self, max_entries=10000, ttl=300):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'expired': 0, 'stale': 0, 'evictions': 0}
+
+    def get(self, key, version=None):
+        """
+        get(key, version) returns the cached value, or None if it is missing, expired or was
+        stored with another version.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats['misses'] += 1
+                return None
+
+            expires_at, entry_version, value = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                self._stats['expired'] += 1
+                self._stats['misses'] += 1
+                return None
+
+            if entry_version != version:
+                del self._entries[key]
+                self._stats['stale'] += 1
+                self._stats['misses'] += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            return value
+
+    def set(self, key, value, expires_at=None, version=None):
+        """
+        set(key, value, expires_at, version) stores value until expires_at, or for ttl seconds if
+        not given, whichever is sooner.
+        """
+        default_expiry = time.time() + self.ttl
+        expires_at = default_expiry if expires_at is None else min(expires_at, default_expiry)
+
+        with self._lock:
+            self._entries[key] = (expires_at, version, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """
+        stats() returns the hit/miss counters and current size.
+        """
+        with self._lock:
+            lookups = self._stats['hits'] + self._stats['misses']
+            return dict(
+                self._stats,
+                entries=len(self._entries),
+                max_entries=self.max_entries,
+                hit_ratio=self._stats['hits'] / lookups if lookups else 0.0,
+            )
+
+
+# Bumped by every write that can change the event feed
+event_version = VersionCounter()
+
+# Encoded /api/getevents responses
+event_feed_cache = ResponseCache()
+
+# Bumped per user by every profile write; a user's cached profile built at an older version is
+# ignored, so forked workers drop their copies too
+profile_version = KeyedVersionCounter()
+
+# Per-user profiles for /api/get_profile and /auth/profile_status, stored at the user's
+# profile_version
+profile_cache = TTLCache(max_entries=10000, ttl=300)
+
+
+def feed_etag(version, key):
+    """
+    feed_etag(version, key) returns the ETag of an event feed query at the given event version.
+    It depends only on the version and the normalized query, not on the payload.
+    """
+    digest = hashlib.blake2b(repr(key).encode(), digest_size=8).hexdigest()
+    return f"feed-{INSTANCE_ID}-{version}-{digest}"
+
+
+def event_etag(event_id, version):
+    """
+    event_etag(event_id, version) returns the ETag of a single event from its Event.version stamp.
+    """
+    return f"event-{event_id}-{version}"
+
+
+def not_modified(etag):
+    """
+    not_modified(etag) returns a 304 response if the request's If-None-Match matches etag,
+    otherwise None.
+    """
+    if not request.if_none_match.contains(etag):
+        return None
+
+    response = Response(status=304)
+    return set_cache_headers(response, etag)
+
+
+def set_cache_headers(response, etag):
+    """
+    set_cache_headers(response, etag) adds the strong ETag and Cache-Control headers.
+    """
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = current_app.config.get(
+        'EVENT_CACHE_CONTROL', 'public, max-age=0, must-revalidate'
+    )
+    return response
+
+
+def init_app(app):
+    """
+    init_app(app) applies the cache settings from the app config.
+    """
+    event_feed_cache.configure(
+        int(app.config.get('EVENT_FEED_CACHE_MAX_BYTES', 8 * 1024 * 1024)),
+        float(app.config.get('EVENT_FEED_CACHE_TTL', 300)),
+    )
+    profile_cache.max_entries = int(app.config.get('PROFILE_CACHE_SIZE', 10000))
+    profile_cache.ttl = float(app.config.get('PROFILE_CACHE_TTL', 300))
@@ -6,3 +6,67 @@ load_dotenv()
 
 class Config:
     SECRET_KEY = os.getenv('SECRET_KEY', secrets.token_hex(16))
+
+    # Per-endpoint request and SQL metrics at /metrics
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', '1').lower() not in ('0', 'false', 'no')
+
+    # Opt-in SQL diagnostics: log slow and repeated statements with their query plans
+    QUERY_TRACE_ENABLED = os.getenv('QUERY_TRACE_ENABLED', '0').lower() in ('1', 'true', 'yes')
+    QUERY_TRACE_SLOW_MS = float(os.getenv('QUERY_TRACE_SLOW_MS', 50))
+    QUERY_TRACE_REPEAT_THRESHOLD = int(os.getenv('QUERY_TRACE_REPEAT_THRESHOLD', 10))
+
+    # Maximum number of verified tokens kept by the auth layer
+    TOKEN_CACHE_SIZE = 10000
+
+    # Access tokens, renewable through /auth/refresh with a rotating refresh token. Kept at one
+    # hour until the front-end calls /auth/refresh on a 401; shorten it once it does
+    ACCESS_TOKEN_TTL = int(os.getenv('ACCESS_TOKEN_TTL', 60 * 60))  # seconds
+    REFRESH_TOKEN_TTL = int(os.getenv('REFRESH_TOKEN_TTL', 30 * 24 * 3600))  # seconds
+    REFRESH_TOKEN_PURGE_INTERVAL = 3600  # seconds between deletes of expired refresh tokens
+
+    # Password hashing worker pool
+    PASSWORD_HASH_METHOD = os.getenv('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')
+    PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', os.cpu_count() or 1))
+    PASSWORD_HASH_MAX_PENDING = int(os.getenv('PASSWORD_HASH_MAX_PENDING', 4 * (os.cpu_count() or 1)))
+    PASSWORD_HASH_TIMEOUT = 10.0  # seconds
+
+    # SQLite connection pool
+    DATABASE_PATH = os.getenv('DATABASE_PATH', os.path.join(os.path.dirname(__file__), 'data', 'database.db'))
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 8))
+    SQLITE_JOURNAL_MODE = 'WAL'
+    SQLITE_SYNCHRONOUS = 'NORMAL'
+    SQLITE_BUSY_TIMEOUT_MS = 5000
+    SQLITE_MMAP_SIZE = 64 * 1024 * 1024  # 64 MiB
+    SQLITE_CACHE_SIZE = -16000  # negative values are KiB, i.e. ~16 MiB per connection
+
+    # Writer thread that group-commits RSVP, favorite and review writes
+    WRITE_QUEUE_MAX_BATCH = 64
+    WRITE_QUEUE_MAX_DELAY = 0.002  # seconds to wait for more writes before committing a batch
+    WRITE_QUEUE_TIMEOUT = 10.0  # seconds
+
+    # /api/getevents response cache
+    EVENT_FEED_CACHE_MAX_BYTES = 8 * 1024 * 1024  # 8 MiB
+    EVENT_FEED_CACHE_TTL = 300  # seconds
+
+    # Per-user profile cache for /api/get_profile and /auth/profile_status
+    PROFILE_CACHE_SIZE = 10000
+    PROFILE_CACHE_TTL = 300  # seconds
+
+    # Cache-Control for the event feed and event detail, revalidated with ETags
+    EVENT_CACHE_CONTROL = 'public, max-age=0, must-revalidate'
+
+    # Maximum number of IDs accepted by the batch event lookup
+    EVENT_BATCH_MAX_IDS = 100
+
+    # Rows fetched and encoded per chunk by streaming (NDJSON) responses
+    STREAM_CHUNK_SIZE = 500
+
+    # Personalized /api/feed scoring
+    FEED_WEIGHTS = {'diet': 0.4, 'time': 0.3, 'quantity': 0.1, 'interest': 0.2}
+    FEED_TIME_SCALE_HOURS = 48.0
+    FEED_QUANTITY_SCALE = 20.0
+    FEED_REFRESH_INTERVAL = 5.0  # seconds between change-log checks when no write was seen
+
+    # EventChange entries kept for incremental feed refreshes, pruned by the writer thread
+    EVENT_CHANGE_LOG_RETAIN = 10000
+    EVENT_CHANGE_LOG_PRUNE_INTERVAL = 60  # seconds
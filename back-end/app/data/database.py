@@ -1,9 +1,287 @@
 import sqlite3
 import os
+import threading
+import time
+from collections import deque
+from flask import g, has_app_context
+
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(__file__), 'database.db')
+
+_pool = None
+
+# Callables notified of every statement run on a pooled connection, as fn(sql, seconds)
+_query_observers = []
+
+# Callables run on every new pooled connection, as fn(conn)
+_connection_hooks = []
+
+
+def add_connection_hook(hook):
+    """
+    add_connection_hook(hook) registers hook(conn) to be called on every connection the pool
+    opens from now on, after its PRAGMAs are applied.
+    """
+    if hook not in _connection_hooks:
+        _connection_hooks.append(hook)
+
+
+def add_query_observer(observer):
+    """
+    add_query_observer(observer) registers observer(sql, seconds) to be called after every
+    statement executed through a pooled connection. Statements are only timed while at least
+    one observer is registered.
+    """
+    if observer not in _query_observers:
+        _query_observers.append(observer)
+
+
+def remove_query_observer(observer):
+    """
+    remove_query_observer(observer) unregisters an observer added with add_query_observer().
+    """
+    if observer in _query_observers:
+        _query_observers.remove(observer)
+
+
+def _observed(method, sql, *args):
+    if not _query_observers:
+        return method(sql, *args)
+
+    started = time.perf_counter()
+    try:
+        return method(sql, *args)
+    finally:
+        elapsed = time.perf_counter() - started
+        for observer in _query_observers:
+            observer(sql, elapsed)
+
+
+class ObservedCursor(sqlite3.Cursor):
+    """
+    ObservedCursor reports the statements it executes to the registered query observers.
+    """
+
+    def execute(self, sql, *args):
+        return _observed(super().execute, sql, *args)
+
+    def executemany(self, sql, *args):
+        return _observed(super().executemany, sql, *args)
+
+    def executescript(self, sql):
+        return _observed(super().executescript, sql)
+
+
+class PooledConnection(sqlite3.Connection):
+    """
+    PooledConnection is a sqlite3.Connection that belongs to a ConnectionPool.
+
+    Calling close() hands the connection back to its pool instead of closing it, so existing
+    handlers that close their connection keep working unchanged.
+    """
+
+    pool = None
+
+    def cursor(self, factory=ObservedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, *args):
+        return self.cursor().execute(sql, *args)
+
+    def executemany(self, sql, *args):
+        return self.cursor().executemany(sql, *args)
+
+    def executescript(self, sql):
+        return self.cursor().executescript(sql)
+
+    def close(self):
+        if has_app_context() and g.get('_db_conn') is self:
+            # Released by the teardown_appcontext handler at the end of the request
+            return
+        self.pool.release(self)
+
+    def _close(self):
+        super().close()
+
+
+class ConnectionPool:
+    """
+    ConnectionPool keeps a bounded set of idle, pre-configured SQLite connections.
+
+    Connections are configured once, when they are opened, with the PRAGMAs in `pragmas`.
+    Inside a Flask application context one connection is checked out per context and
+    returned to the pool on teardown.
+
+    SQLite connections must not be used across a fork, so a forked process (e.g. a server
+    worker forked after the app was preloaded) never reuses the connections it inherited.
+    """
+
+    def __init__(self, db_path, max_idle=8, pragmas=None, timeout=5.0):
+        self.db_path = db_path
+        self.max_idle = max_idle
+        self.pragmas = pragmas or {}
+        self.timeout = timeout
+        self._idle = deque()
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        # Connections inherited across a fork: kept referenced but never used or closed here,
+        # since closing them could disturb the parent's locks and WAL
+        self._inherited = []
+        self._stats = {
+            'created': 0,
+            'reused': 0,
+            'released': 0,
+            'discarded': 0,
+            'in_use': 0,
+        }
+
+    def _connect(self):
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.timeout,
+            factory=PooledConnection,
+            check_same_thread=False,
+        )
+        conn.pool = self
+        conn.row_factory = sqlite3.Row
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        for hook in _connection_hooks:
+            hook(conn)
+        return conn
+
+    def acquire(self):
+        """
+        acquire() returns an idle connection from the pool, opening a new one if none is idle.
+        """
+        with self._lock:
+            if self._pid != os.getpid():
+                self._inherited.extend(self._idle)
+                self._idle.clear()
+                self._pid = os.getpid()
+            conn = self._idle.pop() if self._idle else None
+            if conn is not None:
+                self._stats['reused'] += 1
+            self._stats['in_use'] += 1
+
+        if conn is None:
+            try:
+                conn = self._connect()
+            except sqlite3.Error:
+                with self._lock:
+                    self._stats['in_use'] -= 1
+                raise
+            with self._lock:
+                self._stats['created'] += 1
+        return conn
+
+    def release(self, conn):
+        """
+        release(conn) rolls back any open transaction and returns the connection to the pool.
+        Connections beyond max_idle, or in a broken state, are closed.
+        """
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            conn._close()
+            with self._lock:
+                self._stats['in_use'] -= 1
+                self._stats['discarded'] += 1
+            return
+
+        with self._lock:
+            self._stats['in_use'] -= 1
+            if len(self._idle) < self.max_idle:
+                self._idle.append(conn)
+                self._stats['released'] += 1
+                return
+            self._stats['discarded'] += 1
+        conn._close()
+
+    def close_all(self):
+        """
+        close_all() closes every idle connection.
+        """
+        with self._lock:
+            idle = list(self._idle)
+            self._idle.clear()
+        for conn in idle:
+            conn._close()
+
+    def stats(self):
+        """
+        stats() returns a snapshot of the pool counters.
+        """
+        with self._lock:
+            return dict(self._stats, idle=len(self._idle), max_idle=self.max_idle)
+
+
+def _pragmas_from_config(config):
+    return {
+        'journal_mode': config.get('SQLITE_JOURNAL_MODE', 'WAL'),
+        'synchronous': config.get('SQLITE_SYNCHRONOUS', 'NORMAL'),
+        'foreign_keys': 'ON',
+        'busy_timeout': int(config.get('SQLITE_BUSY_TIMEOUT_MS', 5000)),
+        'mmap_size': int(config.get('SQLITE_MMAP_SIZE', 0)),
+        'cache_size': int(config.get('SQLITE_CACHE_SIZE', -2000)),
+        'temp_store': 'MEMORY',
+    }
+
+
+def init_app(app):
+    """
+    init_app(app) creates the connection pool from the app config and releases the
+    request's connection when the application context is torn down.
+    """
+    global _pool
+
+    if _pool is not None:
+        _pool.close_all()
+
+    _pool = ConnectionPool(
+        app.config.get('DATABASE_PATH', DEFAULT_DB_PATH),
+        max_idle=int(app.config.get('DB_POOL_SIZE', 8)),
+        pragmas=_pragmas_from_config(app.config),
+    )
+    app.teardown_appcontext(release_db_connection)
+
+
+def release_db_connection(exception=None):
+    """
+    release_db_connection() returns the application context's connection to the pool.
+    """
+    conn = g.pop('_db_conn', None)
+    if conn is not None:
+        conn.pool.release(conn)
+
+
+def get_pool():
+    """
+    get_pool() returns the active connection pool, creating one with default settings if
+    init_app() has not been called (e.g. from a script).
+    """
+    global _pool
+
+    if _pool is None:
+        _pool = ConnectionPool(DEFAULT_DB_PATH, pragmas=_pragmas_from_config({}))
+    return _pool
+
+
+def get_pool_stats():
+    """
+    get_pool_stats() returns the connection pool counters (created, reused, released,
+    discarded, in_use, idle, max_idle).
+    """
+    return get_pool().stats()
+
 
 def get_db_connection():
     """
-    get_db_connection() establishes a connection to the SQLite database.
+    get_db_connection() returns a pooled connection to the SQLite database.
+
+    Inside an application context the same connection is returned for the lifetime of the
+    context and released on teardown; outside of one, the caller should close() it to hand
+    it back to the pool.
 
     Returns:
         sqlite3.connection: Database connection object with rows returned as dictionaries.
@@ -12,10 +290,14 @@ def get_db_connection():
     """
 
     try:
-        db_path = os.path.join(os.path.dirname(__file__), 'database.db')
-        conn = sqlite3.connect(db_path)
-        conn.row_factory = sqlite3.Row
-        return conn
-    
+        if has_app_context():
+            conn = g.get('_db_conn')
+            if conn is None:
+                conn = get_pool().acquire()
+                g._db_conn = conn
+            return conn
+
+        return get_pool().acquire()
+
     except sqlite3.Error as e:
         raise RuntimeError(f"Database connection error: {e}")
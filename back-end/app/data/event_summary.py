@@ -0,0 +1,52 @@
+import json
+
+# Columns the listing endpoints select from EventSummary (aliased e)
+SUMMARY_COLUMNS = """
+    e.event_id, e.title, e.description, e.event_date, e.start_time, e.end_time,
+    e.location, e.address, e.quantity, e.dietary_needs, e.rsvp_count, e.favorite_count,
+    e.rating_count, e.rating_sum
+"""
+
+# Rating histogram columns, for 1 to 5 stars
+RATING_COLUMNS = "e.rating_1, e.rating_2, e.rating_3, e.rating_4, e.rating_5"
+
+
+def format_event_summary(row):
+    """
+    format_event_summary(row) converts an EventSummary row selected with SUMMARY_COLUMNS into
+    the event dict returned by the listing endpoints.
+    """
+    return {
+        "event_id": row["event_id"],
+        "title": row["title"],
+        "description": row["description"],
+        "event_date": row["event_date"],
+        "start_time": row["start_time"],
+        "end_time": row["end_time"],
+        "location": row["location"],
+        "address": row["address"],
+        "quantity": row["quantity"],
+        "dietary_needs": json.loads(row["dietary_needs"]),
+        "rsvp_count": row["rsvp_count"],
+        "favorite_count": row["favorite_count"],
+        "rating_count": row["rating_count"],
+        "average_rating": average_rating(row),
+    }
+
+
+def average_rating(row):
+    """
+    average_rating(row) returns the event's mean rating rounded to two decimals, or None if it
+    has no ratings.
+    """
+    if not row["rating_count"]:
+        return None
+    return round(row["rating_sum"] / row["rating_count"], 2)
+
+
+def format_rating_histogram(row):
+    """
+    format_rating_histogram(row) converts a row selected with RATING_COLUMNS into a
+    {"1": count, ..., "5": count} dict.
+    """
+    return {str(stars): row[f"rating_{stars}"] for stars in range(1, 6)}
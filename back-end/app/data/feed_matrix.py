@@ -0,0 +1,307 @@
+import re
+import threading
+import time
+from datetime import datetime
+import numpy as np
+from app.cache import event_version
+from app.data.food_types import MAX_FOOD_TYPE_ID
+
+# One column per possible food type (bit food_type_id - 1 of Event.food_type_mask)
+FOOD_TYPE_COLUMNS = MAX_FOOD_TYPE_ID
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+_EVENT_COLUMNS = "event_id, title, description, quantity, event_date, start_time, food_type_mask"
+
+_settings = {
+    'retain': 10000,
+}
+
+
+def tokenize(*texts):
+    """
+    tokenize(*texts) returns the set of lowercased words (two characters or more) in texts.
+    """
+    return {
+        token
+        for text in texts if text
+        for token in _TOKEN_RE.findall(text.lower())
+        if len(token) > 1
+    }
+
+
+def _start_timestamp(event_date, start_time):
+    try:
+        return datetime.strptime(f"{event_date} {start_time}", "%Y-%m-%d %H:%M:%S").timestamp()
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _mask_to_columns(mask):
+    return [bit for bit in range(FOOD_TYPE_COLUMNS) if mask >> bit & 1]
+
+
+class EventMatrix:
+    """
+    EventMatrix holds upcoming events as NumPy arrays for batched feed scoring:
+    an events x food types matrix, start timestamps and remaining quantities, plus an inverted
+    keyword index over titles and descriptions.
+
+    It is loaded once from EventSummary and then refreshed incrementally from the EventChange
+    log, which the database triggers append to whenever an event is created, edited or deleted.
+    Events that have started are dropped whenever the log is read. The log is pruned to its
+    most recent entries (see prune_change_log()); a matrix that fell further behind than that
+    is reloaded in full.
+    """
+
+    def __init__(self, initial_capacity=1024):
+        self._lock = threading.Lock()
+        self._allocate(initial_capacity)
+        self.loaded = False
+        self.last_seq = 0
+        self.synced_version = None
+        self.checked_at = 0.0
+
+    def _allocate(self, capacity):
+        self.event_ids = np.zeros(capacity, dtype=np.int64)
+        self.food_types = np.zeros((capacity, FOOD_TYPE_COLUMNS), dtype=np.float32)
+        self.starts = np.full(capacity, np.nan)
+        self.quantities = np.zeros(capacity)
+        self.active = np.zeros(capacity, dtype=bool)
+        self._size = 0
+        self._rows = {}
+        self._free_rows = []
+        self._row_tokens = {}
+        self._token_rows = {}
+
+    def _grow(self):
+        capacity = len(self.event_ids) * 2
+        self.event_ids = np.resize(self.event_ids, capacity)
+        self.food_types = np.vstack([self.food_types, np.zeros_like(self.food_types)])
+        self.starts = np.concatenate([self.starts, np.full(capacity - len(self.starts), np.nan)])
+        self.quantities = np.concatenate([self.quantities, np.zeros(capacity - len(self.quantities))])
+        self.active = np.concatenate([self.active, np.zeros(capacity - len(self.active), dtype=bool)])
+
+    def _upsert(self, event):
+        event_id = event["event_id"]
+        row = self._rows.get(event_id)
+
+        if row is None:
+            if self._free_rows:
+                row = self._free_rows.pop()
+            else:
+                if self._size == len(self.event_ids):
+                    self._grow()
+                row = self._size
+                self._size += 1
+            self._rows[event_id] = row
+        else:
+            self._unindex_tokens(row)
+
+        self.event_ids[row] = event_id
+        self.food_types[row] = 0
+        self.food_types[row, _mask_to_columns(event["food_type_mask"] or 0)] = 1
+        self.starts[row] = _start_timestamp(event["event_date"], event["start_time"])
+        self.quantities[row] = event["quantity"] or 0
+        self.active[row] = True
+
+        tokens = tokenize(event["title"], event["description"])
+        self._row_tokens[row] = tokens
+        for token in tokens:
+            self._token_rows.setdefault(token, set()).add(row)
+
+    def _remove(self, event_id):
+        row = self._rows.pop(event_id, None)
+        if row is None:
+            return
+        self._unindex_tokens(row)
+        self.active[row] = False
+        self._free_rows.append(row)
+
+    def _unindex_tokens(self, row):
+        for token in self._row_tokens.pop(row, ()):
+            rows = self._token_rows.get(token)
+            if rows is not None:
+                rows.discard(row)
+                if not rows:
+                    del self._token_rows[token]
+
+    def _full_load(self, conn):
+        # Read the log position first: anything changed while loading is re-applied next refresh
+        last_seq = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM EventChange").fetchone()[0]
+        self._allocate(max(1024, len(self.event_ids)))
+        cursor = conn.execute(
+            f"""
+            SELECT {_EVENT_COLUMNS}
+            FROM EventSummary
+            WHERE event_date >= date('now', 'localtime', '-1 day')
+            """
+        )
+        while True:
+            events = cursor.fetchmany(1000)
+            if not events:
+                break
+            for event in events:
+                self._upsert(event)
+        self.last_seq = last_seq
+        self.loaded = True
+
+    def _drop_started(self, now):
+        n = self._size
+        with np.errstate(invalid='ignore'):
+            rows = np.flatnonzero(self.active[:n] & ~(self.starts[:n] > now))
+        for row in rows:
+            self._remove(int(self.event_ids[row]))
+
+    def _apply_changes(self, conn):
+        self._apply_change_log(conn)
+        # Started events can no longer be recommended; an edit that moves one later re-adds it
+        self._drop_started(time.time())
+
+    def _apply_change_log(self, conn):
+        changes = conn.execute(
+            "SELECT seq, event_id FROM EventChange WHERE seq > ? ORDER BY seq",
+            (self.last_seq,)
+        ).fetchall()
+        if not changes:
+            return
+
+        if changes[0]["seq"] != self.last_seq + 1:
+            # The log was pruned past our position (pruning always keeps the latest entry, so
+            # a gap is always visible)
+            self._full_load(conn)
+            return
+
+        changed_ids = list({change["event_id"] for change in changes})
+        found = set()
+        for start in range(0, len(changed_ids), 500):
+            chunk = changed_ids[start:start + 500]
+            events = conn.execute(
+                f"""
+                SELECT {_EVENT_COLUMNS}
+                FROM EventSummary
+                WHERE event_id IN ({",".join("?" for _ in chunk)})
+                """,
+                chunk
+            ).fetchall()
+            for event in events:
+                self._upsert(event)
+                found.add(event["event_id"])
+
+        for event_id in changed_ids:
+            if event_id not in found:
+                self._remove(event_id)
+
+        self.last_seq = changes[-1]["seq"]
+
+    def refresh(self, conn, min_interval=5.0):
+        """
+        refresh(conn) brings the matrix up to date. The change log is only read when the shared
+        event version has moved or min_interval seconds have passed since the last check.
+        """
+        with self._lock:
+            version = event_version.value
+            now = time.monotonic()
+
+            if not self.loaded:
+                self._full_load(conn)
+            elif version != self.synced_version or now - self.checked_at >= min_interval:
+                self._apply_changes(conn)
+            else:
+                return
+
+            self.synced_version = version
+            self.checked_at = now
+
+    def score(self, diet_mask, interests, limit, weights, time_scale_hours=48.0, quantity_scale=20.0):
+        """
+        score() ranks every upcoming, non-sold-out event for one user in a single vectorized pass.
+
+        Parameters:
+            diet_mask (int): The user's food types as a bitmask. If non-zero, events offering none
+                of them are excluded.
+            interests (set): Lowercased interest keywords.
+            limit (int): The number of events to return.
+            weights (dict): Weights for the 'diet', 'time', 'quantity' and 'interest' scores.
+            time_scale_hours (float): Hours over which the time-to-start score decays by 1/e.
+            quantity_scale (float): Remaining quantity at which the quantity score reaches ~0.63.
+
+        Returns:
+            list: (event_id, score) tuples, best first.
+        """
+        with self._lock:
+            n = self._size
+            if n == 0:
+                return []
+
+            now = time.time()
+            starts = self.starts[:n]
+            quantities = self.quantities[:n]
+
+            with np.errstate(invalid='ignore'):
+                candidates = self.active[:n] & (starts > now) & (quantities > 0)
+
+            # Diet compatibility: share of the user's food types the event offers
+            diet_columns = _mask_to_columns(diet_mask)
+            if diet_columns:
+                user_vector = np.zeros(FOOD_TYPE_COLUMNS, dtype=np.float32)
+                user_vector[diet_columns] = 1
+                diet_score = (self.food_types[:n] @ user_vector) / len(diet_columns)
+                candidates &= diet_score > 0
+            else:
+                diet_score = np.ones(n, dtype=np.float32)
+
+            hours_until = np.nan_to_num((starts - now) / 3600.0, nan=np.inf)
+            time_score = np.exp(-np.maximum(hours_until, 0) / time_scale_hours)
+            quantity_score = 1 - np.exp(-np.maximum(quantities, 0) / quantity_scale)
+
+            interest_score = np.zeros(n)
+            if interests:
+                for token in interests:
+                    rows = self._token_rows.get(token)
+                    if rows:
+                        interest_score[np.fromiter(rows, dtype=np.int64, count=len(rows))] += 1
+                interest_score /= len(interests)
+
+            scores = (
+                weights.get('diet', 0) * diet_score
+                + weights.get('time', 0) * time_score
+                + weights.get('quantity', 0) * quantity_score
+                + weights.get('interest', 0) * interest_score
+            )
+
+            rows = np.flatnonzero(candidates)
+            if len(rows) > limit:
+                rows = rows[np.argpartition(-scores[rows], limit - 1)[:limit]]
+            rows = rows[np.argsort(-scores[rows], kind='stable')]
+
+            return [(int(self.event_ids[row]), float(scores[row])) for row in rows]
+
+
+def prune_change_log(conn, retain=None):
+    """
+    prune_change_log(conn, retain) deletes all but the latest retain EventChange entries (at
+    least one is always kept). The caller commits.
+
+    Returns:
+        int: The number of entries deleted.
+    """
+    retain = max(1, int(_settings['retain'] if retain is None else retain))
+    return conn.execute(
+        "DELETE FROM EventChange WHERE seq <= (SELECT MAX(seq) FROM EventChange) - ?",
+        (retain,)
+    ).rowcount
+
+
+# Shared by all requests in this process
+event_matrix = EventMatrix()
+
+
+def init_app(app):
+    """
+    init_app(app) schedules the EventChange pruning on the write queue's writer thread.
+    """
+    from app.data.write_queue import add_maintenance_task
+
+    _settings['retain'] = int(app.config.get('EVENT_CHANGE_LOG_RETAIN', _settings['retain']))
+    add_maintenance_task(prune_change_log, float(app.config.get('EVENT_CHANGE_LOG_PRUNE_INTERVAL', 60)))
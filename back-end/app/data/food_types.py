@@ -0,0 +1,161 @@
+import threading
+import time
+from collections import namedtuple
+from types import MappingProxyType
+from app.data.database import get_db_connection
+
+# Read-only views of the FoodTypes table
+FoodTypeMap = namedtuple('FoodTypeMap', ['by_id', 'by_name'])
+
+# Highest food_type_id that fits Event.food_type_mask (enforced by migration 0013)
+MAX_FOOD_TYPE_ID = 63
+
+# Minimum number of seconds between checks of FoodTypesVersion on lookups
+VERSION_CHECK_INTERVAL = 1.0
+
+_food_types = None
+_version = None
+_checked_at = 0.0
+_lock = threading.Lock()
+
+
+class UnknownFoodTypeError(ValueError):
+    """
+    Raised when a write references food type names that are not in the FoodTypes table.
+    """
+
+    def __init__(self, names):
+        self.names = names
+        super().__init__(f"Unknown food types: {', '.join(map(str, names))}")
+
+
+def load_food_types():
+    """
+    load_food_types() (re)loads the FoodTypes table into an immutable name <-> id map.
+
+    Returns:
+        FoodTypeMap: by_id maps food_type_id to food_type_name, by_name the reverse.
+    """
+    global _food_types, _version, _checked_at
+
+    conn = get_db_connection()
+    # Read before the rows: a change in between leaves an older version, which only costs a reload
+    version = _read_version(conn)
+    rows = conn.execute("SELECT food_type_id, food_type_name FROM FoodTypes").fetchall()
+    by_id = {row["food_type_id"]: row["food_type_name"] for row in rows}
+
+    with _lock:
+        _food_types = FoodTypeMap(
+            MappingProxyType(by_id),
+            MappingProxyType({name: food_type_id for food_type_id, name in by_id.items()}),
+        )
+        _version = version
+        _checked_at = time.monotonic()
+        return _food_types
+
+
+def _read_version(conn):
+    return conn.execute("SELECT version FROM FoodTypesVersion WHERE id = 1").fetchone()[0]
+
+
+def _refresh():
+    """
+    _refresh() reloads the map if FoodTypesVersion moved since it was loaded.
+    """
+    global _checked_at
+
+    if _read_version(get_db_connection()) != _version:
+        return load_food_types()
+    _checked_at = time.monotonic()
+    return _food_types
+
+
+def init_app(app):
+    """
+    init_app(app) loads the FoodTypes map at startup.
+    """
+    with app.app_context():
+        load_food_types()
+
+
+def get_food_types():
+    """
+    get_food_types() returns the cached FoodTypeMap, loading it on first use and reloading it
+    when FoodTypes has changed (checked at most every VERSION_CHECK_INTERVAL seconds).
+    """
+    food_types = _food_types
+    if food_types is None:
+        food_types = load_food_types()
+    elif time.monotonic() - _checked_at >= VERSION_CHECK_INTERVAL:
+        food_types = _refresh()
+    return food_types
+
+
+def resolve_food_type_ids(names):
+    """
+    resolve_food_type_ids(names) maps food type names to their IDs, dropping duplicates.
+
+    If a name is unknown, FoodTypesVersion is checked right away and the map reloaded if
+    FoodTypes changed since it was loaded.
+
+    Returns:
+        list: The food_type_ids, in the order the names were given.
+    Raises:
+        UnknownFoodTypeError: If any name is not a known food type.
+    """
+    by_name = get_food_types().by_name
+    unknown = [name for name in names if not isinstance(name, str) or name not in by_name]
+
+    if unknown:
+        by_name = _refresh().by_name
+        unknown = [name for name in names if not isinstance(name, str) or name not in by_name]
+
+    if unknown:
+        raise UnknownFoodTypeError(unknown)
+
+    return list(dict.fromkeys(by_name[name] for name in names))
+
+
+def encode_mask(names):
+    """
+    encode_mask(names) converts food type names to an Event.food_type_mask value.
+
+    Returns:
+        tuple: (mask, unknown), where unknown lists the names that are not food types.
+    """
+    by_name = get_food_types().by_name
+    mask = 0
+    unknown = []
+    for name in names:
+        food_type_id = by_name.get(name)
+        if food_type_id is None:
+            unknown.append(name)
+        else:
+            mask |= 1 << (food_type_id - 1)
+    return mask, unknown
+
+
+def dietary_condition(dietary_needs, match='any'):
+    """
+    dietary_condition() builds the WHERE condition for a dietary_needs filter on Event e.
+
+    The filter tests bits of Event.food_type_mask, which is why food type IDs are capped at
+    MAX_FOOD_TYPE_ID: the FoodTypes triggers reject any ID that has no bit in the mask.
+
+    Parameters:
+        dietary_needs (list): Food type names to filter by.
+        match (str): 'any' keeps events offering at least one of them, 'all' keeps events
+            offering every one of them.
+
+    Returns:
+        tuple: (condition, params)
+    """
+    mask, unknown = encode_mask(dietary_needs)
+
+    if match == 'all':
+        if unknown:
+            # No event can offer a food type that does not exist
+            return "0", []
+        return "(e.food_type_mask & ?) = ?", [mask, mask]
+
+    return "(e.food_type_mask & ?) != 0", [mask]
@@ -0,0 +1,22 @@
+-- Secondary indexes for the route hot paths
+
+-- rsvp_event duplicate check and get_user_rsvps (covers status)
+CREATE INDEX IF NOT EXISTS idx_rsvp_user_event ON RSVP (user_id, event_id, status);
+
+-- get_event_rsvps and ON DELETE CASCADE from Event (covers user_id and status)
+CREATE INDEX IF NOT EXISTS idx_rsvp_event_user ON RSVP (event_id, user_id, status);
+
+-- get_user_events and ON DELETE CASCADE from User
+CREATE INDEX IF NOT EXISTS idx_event_user ON Event (user_id);
+
+-- Default feed ordering and the date / start_time filters in get_events
+CREATE INDEX IF NOT EXISTS idx_event_date_time ON Event (event_date, start_time);
+
+-- Dietary filter in get_events and user_favorites (covers event_id)
+CREATE INDEX IF NOT EXISTS idx_eventfoodtypes_food_type ON EventFoodTypes (food_type_id, event_id);
+
+-- Reviews by event and ON DELETE CASCADE from Event
+CREATE INDEX IF NOT EXISTS idx_review_event ON Review (event_id);
+
+-- ON DELETE CASCADE from Event into Favorite
+CREATE INDEX IF NOT EXISTS idx_favorite_event ON Favorite (event_id);
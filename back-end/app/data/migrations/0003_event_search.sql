@@ -0,0 +1,35 @@
+-- Full-text index over Event title, description and location
+
+CREATE VIRTUAL TABLE IF NOT EXISTS EventSearch USING fts5(
+    title,
+    description,
+    location,
+    content = 'Event',
+    content_rowid = 'event_id',
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
+);
+
+-- Keep EventSearch in sync with Event
+CREATE TRIGGER IF NOT EXISTS trg_event_search_insert AFTER INSERT ON Event
+BEGIN
+    INSERT INTO EventSearch (rowid, title, description, location)
+    VALUES (NEW.event_id, NEW.title, NEW.description, NEW.location);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_event_search_delete AFTER DELETE ON Event
+BEGIN
+    INSERT INTO EventSearch (EventSearch, rowid, title, description, location)
+    VALUES ('delete', OLD.event_id, OLD.title, OLD.description, OLD.location);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_event_search_update AFTER UPDATE OF title, description, location ON Event
+BEGIN
+    INSERT INTO EventSearch (EventSearch, rowid, title, description, location)
+    VALUES ('delete', OLD.event_id, OLD.title, OLD.description, OLD.location);
+    INSERT INTO EventSearch (rowid, title, description, location)
+    VALUES (NEW.event_id, NEW.title, NEW.description, NEW.location);
+END;
+
+-- Backfill the index from existing events
+INSERT INTO EventSearch (EventSearch) VALUES ('rebuild');
@@ -0,0 +1,36 @@
+-- Bitmask of each event's food types: bit (food_type_id - 1) is set for every EventFoodTypes row
+
+ALTER TABLE Event ADD COLUMN food_type_mask INTEGER NOT NULL DEFAULT 0;
+
+CREATE TRIGGER IF NOT EXISTS trg_event_food_type_mask_insert AFTER INSERT ON EventFoodTypes
+BEGIN
+    UPDATE Event
+    SET food_type_mask = food_type_mask | (1 << (NEW.food_type_id - 1))
+    WHERE event_id = NEW.event_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_event_food_type_mask_delete AFTER DELETE ON EventFoodTypes
+BEGIN
+    UPDATE Event
+    SET food_type_mask = food_type_mask & ~(1 << (OLD.food_type_id - 1))
+    WHERE event_id = OLD.event_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_event_food_type_mask_update AFTER UPDATE ON EventFoodTypes
+BEGIN
+    UPDATE Event
+    SET food_type_mask = (
+        SELECT COALESCE(SUM(1 << (food_type_id - 1)), 0)
+        FROM EventFoodTypes
+        WHERE event_id = Event.event_id
+    )
+    WHERE event_id IN (OLD.event_id, NEW.event_id);
+END;
+
+-- Backfill existing events
+UPDATE Event
+SET food_type_mask = (
+    SELECT COALESCE(SUM(1 << (food_type_id - 1)), 0)
+    FROM EventFoodTypes
+    WHERE event_id = Event.event_id
+);
@@ -0,0 +1,9 @@
+-- Per-event version stamp, bumped on every change to the Event row (used for ETags)
+
+ALTER TABLE Event ADD COLUMN version INTEGER NOT NULL DEFAULT 1;
+
+CREATE TRIGGER IF NOT EXISTS trg_event_version AFTER UPDATE ON Event
+WHEN NEW.version = OLD.version
+BEGIN
+    UPDATE Event SET version = OLD.version + 1 WHERE event_id = NEW.event_id;
+END;
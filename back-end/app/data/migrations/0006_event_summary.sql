@@ -0,0 +1,125 @@
+-- Denormalized, trigger-maintained event listing rows
+
+CREATE TABLE IF NOT EXISTS EventSummary (
+    event_id INTEGER PRIMARY KEY,
+    user_id INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    description TEXT,
+    quantity INTEGER DEFAULT 0,
+    location TEXT NOT NULL,
+    address TEXT NOT NULL,
+    event_date DATE NOT NULL,
+    start_time TIME NOT NULL,
+    end_time TIME,
+    food_type_mask INTEGER NOT NULL DEFAULT 0,
+    dietary_needs TEXT NOT NULL DEFAULT '[]',  -- JSON array of food type names
+    rsvp_count INTEGER NOT NULL DEFAULT 0,     -- RSVPs with status 'Going'
+    favorite_count INTEGER NOT NULL DEFAULT 0,
+    FOREIGN KEY (event_id) REFERENCES Event(event_id) ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS idx_event_summary_date ON EventSummary (event_date, event_id);
+CREATE INDEX IF NOT EXISTS idx_event_summary_user ON EventSummary (user_id, event_id);
+
+-- Event rows
+
+CREATE TRIGGER IF NOT EXISTS trg_event_summary_insert AFTER INSERT ON Event
+BEGIN
+    INSERT INTO EventSummary (event_id, user_id, title, description, quantity, location, address,
+                              event_date, start_time, end_time, food_type_mask)
+    VALUES (NEW.event_id, NEW.user_id, NEW.title, NEW.description, NEW.quantity, NEW.location, NEW.address,
+            NEW.event_date, NEW.start_time, NEW.end_time, NEW.food_type_mask);
+END;
+
+-- Food type changes reach Event.food_type_mask first, so dietary_needs is re-rendered here
+CREATE TRIGGER IF NOT EXISTS trg_event_summary_update AFTER UPDATE ON Event
+BEGIN
+    UPDATE EventSummary
+    SET user_id = NEW.user_id,
+        title = NEW.title,
+        description = NEW.description,
+        quantity = NEW.quantity,
+        location = NEW.location,
+        address = NEW.address,
+        event_date = NEW.event_date,
+        start_time = NEW.start_time,
+        end_time = NEW.end_time,
+        food_type_mask = NEW.food_type_mask,
+        dietary_needs = (
+            SELECT json_group_array(food_type_name) FROM (
+                SELECT food_type_name FROM FoodTypes
+                WHERE NEW.food_type_mask & (1 << (food_type_id - 1))
+                ORDER BY food_type_id
+            )
+        )
+    WHERE event_id = NEW.event_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_event_summary_delete AFTER DELETE ON Event
+BEGIN
+    DELETE FROM EventSummary WHERE event_id = OLD.event_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_event_summary_food_type_rename AFTER UPDATE OF food_type_name ON FoodTypes
+BEGIN
+    UPDATE EventSummary
+    SET dietary_needs = (
+        SELECT json_group_array(food_type_name) FROM (
+            SELECT food_type_name FROM FoodTypes
+            WHERE EventSummary.food_type_mask & (1 << (food_type_id - 1))
+            ORDER BY food_type_id
+        )
+    )
+    WHERE food_type_mask & (1 << (NEW.food_type_id - 1));
+END;
+
+-- RSVP counts
+
+CREATE TRIGGER IF NOT EXISTS trg_event_summary_rsvp_insert AFTER INSERT ON RSVP
+WHEN NEW.status = 'Going'
+BEGIN
+    UPDATE EventSummary SET rsvp_count = rsvp_count + 1 WHERE event_id = NEW.event_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_event_summary_rsvp_delete AFTER DELETE ON RSVP
+WHEN OLD.status = 'Going'
+BEGIN
+    UPDATE EventSummary SET rsvp_count = rsvp_count - 1 WHERE event_id = OLD.event_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_event_summary_rsvp_update AFTER UPDATE OF status, event_id ON RSVP
+BEGIN
+    UPDATE EventSummary SET rsvp_count = rsvp_count - 1
+    WHERE event_id = OLD.event_id AND OLD.status = 'Going';
+    UPDATE EventSummary SET rsvp_count = rsvp_count + 1
+    WHERE event_id = NEW.event_id AND NEW.status = 'Going';
+END;
+
+-- Favorite counts
+
+CREATE TRIGGER IF NOT EXISTS trg_event_summary_favorite_insert AFTER INSERT ON Favorite
+BEGIN
+    UPDATE EventSummary SET favorite_count = favorite_count + 1 WHERE event_id = NEW.event_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_event_summary_favorite_delete AFTER DELETE ON Favorite
+BEGIN
+    UPDATE EventSummary SET favorite_count = favorite_count - 1 WHERE event_id = OLD.event_id;
+END;
+
+-- Backfill existing events
+INSERT OR REPLACE INTO EventSummary (event_id, user_id, title, description, quantity, location, address,
+                                     event_date, start_time, end_time, food_type_mask, dietary_needs,
+                                     rsvp_count, favorite_count)
+SELECT e.event_id, e.user_id, e.title, e.description, e.quantity, e.location, e.address,
+       e.event_date, e.start_time, e.end_time, e.food_type_mask,
+       (
+           SELECT json_group_array(food_type_name) FROM (
+               SELECT food_type_name FROM FoodTypes
+               WHERE e.food_type_mask & (1 << (food_type_id - 1))
+               ORDER BY food_type_id
+           )
+       ),
+       (SELECT COUNT(*) FROM RSVP r WHERE r.event_id = e.event_id AND r.status = 'Going'),
+       (SELECT COUNT(*) FROM Favorite f WHERE f.event_id = e.event_id)
+FROM Event e;
@@ -0,0 +1,29 @@
+-- Append-only log of changed events, read by in-memory event indexes to refresh incrementally
+
+CREATE TABLE IF NOT EXISTS EventChange (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    event_id INTEGER NOT NULL
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_event_change_insert AFTER INSERT ON EventSummary
+BEGIN
+    INSERT INTO EventChange (event_id) VALUES (NEW.event_id);
+END;
+
+-- RSVP and favorite count changes are not logged
+CREATE TRIGGER IF NOT EXISTS trg_event_change_update
+AFTER UPDATE OF title, description, quantity, event_date, start_time, food_type_mask ON EventSummary
+WHEN OLD.title IS NOT NEW.title
+    OR OLD.description IS NOT NEW.description
+    OR OLD.quantity IS NOT NEW.quantity
+    OR OLD.event_date IS NOT NEW.event_date
+    OR OLD.start_time IS NOT NEW.start_time
+    OR OLD.food_type_mask IS NOT NEW.food_type_mask
+BEGIN
+    INSERT INTO EventChange (event_id) VALUES (NEW.event_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_event_change_delete AFTER DELETE ON EventSummary
+BEGIN
+    INSERT INTO EventChange (event_id) VALUES (OLD.event_id);
+END;
@@ -0,0 +1,15 @@
+-- Long-lived, rotating refresh tokens. Only the SHA-256 digest of a token is stored.
+-- Tokens issued from one login share a family_id, so reuse of a rotated token revokes the family.
+
+CREATE TABLE IF NOT EXISTS RefreshToken (
+    token_hash TEXT PRIMARY KEY,
+    user_id INTEGER NOT NULL,
+    family_id TEXT NOT NULL,
+    expires_at INTEGER NOT NULL,       -- Unix timestamp
+    revoked INTEGER NOT NULL DEFAULT 0,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (user_id) REFERENCES User(user_id) ON DELETE CASCADE
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_refresh_token_family ON RefreshToken(family_id);
+CREATE INDEX IF NOT EXISTS idx_refresh_token_user ON RefreshToken(user_id);
@@ -0,0 +1,11 @@
+-- One RSVP per user and event, so RSVP writes can be a single INSERT ... ON CONFLICT
+
+-- Keep the most recent RSVP of any duplicates (the EventSummary triggers adjust rsvp_count)
+DELETE FROM RSVP
+WHERE rsvp_id NOT IN (
+    SELECT MAX(rsvp_id) FROM RSVP GROUP BY user_id, event_id
+);
+
+-- Replaces the non-unique (user_id, event_id, status) index
+DROP INDEX IF EXISTS idx_rsvp_user_event;
+CREATE UNIQUE INDEX IF NOT EXISTS idx_rsvp_user_event_unique ON RSVP (user_id, event_id);
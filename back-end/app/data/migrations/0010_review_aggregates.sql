@@ -0,0 +1,76 @@
+-- Per-event rating aggregates on EventSummary, kept up to date by triggers on Review
+
+ALTER TABLE EventSummary ADD COLUMN rating_count INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE EventSummary ADD COLUMN rating_sum INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE EventSummary ADD COLUMN rating_1 INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE EventSummary ADD COLUMN rating_2 INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE EventSummary ADD COLUMN rating_3 INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE EventSummary ADD COLUMN rating_4 INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE EventSummary ADD COLUMN rating_5 INTEGER NOT NULL DEFAULT 0;
+
+-- Reviews without a rating are not counted
+
+CREATE TRIGGER IF NOT EXISTS trg_event_summary_review_insert AFTER INSERT ON Review
+WHEN NEW.rating IS NOT NULL
+BEGIN
+    UPDATE EventSummary
+    SET rating_count = rating_count + 1,
+        rating_sum = rating_sum + NEW.rating,
+        rating_1 = rating_1 + (NEW.rating = 1),
+        rating_2 = rating_2 + (NEW.rating = 2),
+        rating_3 = rating_3 + (NEW.rating = 3),
+        rating_4 = rating_4 + (NEW.rating = 4),
+        rating_5 = rating_5 + (NEW.rating = 5)
+    WHERE event_id = NEW.event_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_event_summary_review_delete AFTER DELETE ON Review
+WHEN OLD.rating IS NOT NULL
+BEGIN
+    UPDATE EventSummary
+    SET rating_count = rating_count - 1,
+        rating_sum = rating_sum - OLD.rating,
+        rating_1 = rating_1 - (OLD.rating = 1),
+        rating_2 = rating_2 - (OLD.rating = 2),
+        rating_3 = rating_3 - (OLD.rating = 3),
+        rating_4 = rating_4 - (OLD.rating = 4),
+        rating_5 = rating_5 - (OLD.rating = 5)
+    WHERE event_id = OLD.event_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_event_summary_review_update AFTER UPDATE OF rating, event_id ON Review
+BEGIN
+    UPDATE EventSummary
+    SET rating_count = rating_count - 1,
+        rating_sum = rating_sum - OLD.rating,
+        rating_1 = rating_1 - (OLD.rating = 1),
+        rating_2 = rating_2 - (OLD.rating = 2),
+        rating_3 = rating_3 - (OLD.rating = 3),
+        rating_4 = rating_4 - (OLD.rating = 4),
+        rating_5 = rating_5 - (OLD.rating = 5)
+    WHERE event_id = OLD.event_id AND OLD.rating IS NOT NULL;
+    UPDATE EventSummary
+    SET rating_count = rating_count + 1,
+        rating_sum = rating_sum + NEW.rating,
+        rating_1 = rating_1 + (NEW.rating = 1),
+        rating_2 = rating_2 + (NEW.rating = 2),
+        rating_3 = rating_3 + (NEW.rating = 3),
+        rating_4 = rating_4 + (NEW.rating = 4),
+        rating_5 = rating_5 + (NEW.rating = 5)
+    WHERE event_id = NEW.event_id AND NEW.rating IS NOT NULL;
+END;
+
+-- /api/events/top_rated reads events in average rating order straight from this index
+CREATE INDEX IF NOT EXISTS idx_event_summary_top_rated
+ON EventSummary (rating_sum * 1.0 / rating_count DESC, rating_count DESC, event_id)
+WHERE rating_count > 0;
+
+-- Backfill existing reviews
+UPDATE EventSummary
+SET (rating_count, rating_sum, rating_1, rating_2, rating_3, rating_4, rating_5) = (
+    SELECT COUNT(*), COALESCE(SUM(r.rating), 0),
+           COALESCE(SUM(r.rating = 1), 0), COALESCE(SUM(r.rating = 2), 0), COALESCE(SUM(r.rating = 3), 0),
+           COALESCE(SUM(r.rating = 4), 0), COALESCE(SUM(r.rating = 5), 0)
+    FROM Review r
+    WHERE r.event_id = EventSummary.event_id AND r.rating IS NOT NULL
+);
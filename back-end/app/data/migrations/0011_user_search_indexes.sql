@@ -0,0 +1,4 @@
+-- Case-insensitive prefix search on /api/users by name or email
+
+CREATE INDEX IF NOT EXISTS idx_user_name_nocase ON User (name COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_user_email_nocase ON User (email COLLATE NOCASE);
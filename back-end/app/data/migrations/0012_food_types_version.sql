@@ -0,0 +1,24 @@
+-- Version stamp of the FoodTypes table, bumped on every change to it, so processes holding
+-- the in-memory FoodTypes map know when to reload it
+
+CREATE TABLE IF NOT EXISTS FoodTypesVersion (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    version INTEGER NOT NULL
+);
+
+INSERT OR IGNORE INTO FoodTypesVersion (id, version) VALUES (1, 1);
+
+CREATE TRIGGER IF NOT EXISTS trg_food_types_version_insert AFTER INSERT ON FoodTypes
+BEGIN
+    UPDATE FoodTypesVersion SET version = version + 1 WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_food_types_version_update AFTER UPDATE ON FoodTypes
+BEGIN
+    UPDATE FoodTypesVersion SET version = version + 1 WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_food_types_version_delete AFTER DELETE ON FoodTypes
+BEGIN
+    UPDATE FoodTypesVersion SET version = version + 1 WHERE id = 1;
+END;
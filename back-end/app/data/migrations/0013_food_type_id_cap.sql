@@ -0,0 +1,15 @@
+-- Food type IDs must fit Event.food_type_mask: bit (food_type_id - 1) of a signed 64-bit
+-- integer, so 1 to 63. SQLite can't add a CHECK to an existing table, so triggers reject the
+-- rest (AFTER INSERT, since NEW.food_type_id is not assigned yet in a BEFORE INSERT trigger).
+
+CREATE TRIGGER IF NOT EXISTS trg_food_types_id_cap_insert AFTER INSERT ON FoodTypes
+WHEN NEW.food_type_id NOT BETWEEN 1 AND 63
+BEGIN
+    SELECT RAISE(ABORT, 'food_type_id must be between 1 and 63');
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_food_types_id_cap_update AFTER UPDATE OF food_type_id ON FoodTypes
+WHEN NEW.food_type_id NOT BETWEEN 1 AND 63
+BEGIN
+    SELECT RAISE(ABORT, 'food_type_id must be between 1 and 63');
+END;
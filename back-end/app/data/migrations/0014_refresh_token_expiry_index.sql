@@ -0,0 +1,3 @@
+-- Expired refresh tokens are purged periodically by expiry range
+
+CREATE INDEX IF NOT EXISTS idx_refresh_token_expires ON RefreshToken(expires_at);
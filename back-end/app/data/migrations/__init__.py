@@ -0,0 +1,112 @@
+"""
+The migrations package versions the SQLite schema.
+
+schema.sql is the baseline (version 1). Every later change lives in this directory as a
+`NNNN_description.sql` file and is applied once, in order, inside its own transaction.
+Applied versions are recorded in the SchemaVersion table.
+"""
+
+import os
+import re
+import sqlite3
+
+MIGRATIONS_DIR = os.path.dirname(__file__)
+SCHEMA_PATH = os.path.join(os.path.dirname(MIGRATIONS_DIR), 'schema.sql')
+
+_FILENAME_RE = re.compile(r'^(\d{4})_(\w+)\.sql$')
+
+
+def list_migrations():
+    """
+    list_migrations() returns every known migration as (version, name, path), ordered by version.
+    """
+    migrations = [(1, 'baseline', SCHEMA_PATH)]
+    for filename in sorted(os.listdir(MIGRATIONS_DIR)):
+        match = _FILENAME_RE.match(filename)
+        if match:
+            migrations.append((int(match.group(1)), match.group(2), os.path.join(MIGRATIONS_DIR, filename)))
+    return migrations
+
+
+def split_statements(script):
+    """
+    split_statements(script) splits an SQL script into individual statements.
+
+    sqlite3.complete_statement() is used so that trigger bodies, which contain their own
+    semicolons, stay in one piece.
+    """
+    statements = []
+    buffer = ''
+    for line in script.splitlines(keepends=True):
+        buffer += line
+        if sqlite3.complete_statement(buffer):
+            statements.append(buffer.strip())
+            buffer = ''
+    return statements
+
+
+def get_schema_version(conn):
+    """
+    get_schema_version(conn) returns the highest applied migration version (0 if none).
+    """
+    row = conn.execute("SELECT MAX(version) FROM SchemaVersion").fetchone()
+    return row[0] or 0
+
+
+def apply_migrations(db_path):
+    """
+    apply_migrations(db_path) brings the database at db_path up to the latest schema version.
+
+    Each migration runs in a BEGIN IMMEDIATE transaction, so concurrent processes starting at
+    the same time serialize on the write lock and skip versions that were applied meanwhile.
+
+    Returns:
+        list: The versions that were applied by this call.
+    Raises:
+        RuntimeError: If a migration fails. The failed migration is rolled back.
+    """
+    conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+    applied = []
+    try:
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS SchemaVersion (
+                version INTEGER PRIMARY KEY,
+                name TEXT NOT NULL,
+                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+            """
+        )
+
+        for version, name, path in list_migrations():
+            if version <= get_schema_version(conn):
+                continue
+
+            with open(path) as f:
+                statements = split_statements(f.read())
+
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Another process may have applied it while we waited for the lock
+                if version <= get_schema_version(conn):
+                    conn.execute("ROLLBACK")
+                    continue
+
+                for statement in statements:
+                    conn.execute(statement)
+
+                conn.execute(
+                    "INSERT INTO SchemaVersion (version, name) VALUES (?, ?)",
+                    (version, name)
+                )
+                conn.execute("COMMIT")
+                applied.append(version)
+
+            except sqlite3.Error as e:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                raise RuntimeError(f"Migration {version:04d}_{name} failed: {e}")
+
+        return applied
+    finally:
+        conn.close()
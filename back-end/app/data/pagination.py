@@ -0,0 +1,109 @@
+import base64
+import binascii
+import json
+
+# Sortable listing columns and the SQL expression used for each. Nullable columns are
+# coalesced so that every row has a comparable sort key.
+SORT_COLUMNS = {
+    'event_date': 'e.event_date',
+    'start_time': 'e.start_time',
+    'end_time': "COALESCE(e.end_time, '')",
+    'title': 'e.title',
+    'location': 'e.location',
+    'quantity': 'COALESCE(e.quantity, 0)',
+}
+
+DEFAULT_SORT = 'event_date'
+MAX_PER_PAGE = 100
+
+
+def parse_page_args(args):
+    """
+    parse_page_args(args) reads page, per_page, sort_by and order from the request args,
+    falling back to the defaults for invalid values.
+
+    Returns:
+        tuple: (page, per_page, sort_by, order)
+    """
+    try:
+        page = max(1, int(args.get('page', 1)))
+    except ValueError:
+        page = 1
+
+    try:
+        per_page = min(max(1, int(args.get('per_page', 10))), MAX_PER_PAGE)
+    except ValueError:
+        per_page = 10
+
+    sort_by = args.get('sort_by', DEFAULT_SORT)
+    if sort_by not in SORT_COLUMNS:
+        sort_by = DEFAULT_SORT
+
+    order = args.get('order', 'asc').lower()
+    if order not in ['asc', 'desc']:
+        order = 'asc'
+
+    return page, per_page, sort_by, order
+
+
+def encode_cursor(sort_by, order, sort_value, event_id):
+    """
+    encode_cursor() packs the position after the last row of a page into an opaque string.
+    """
+    payload = json.dumps([sort_by, order, sort_value, event_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, sort_by, order):
+    """
+    decode_cursor() unpacks a cursor created by encode_cursor().
+
+    Returns:
+        tuple: (sort_value, event_id) of the last row of the previous page.
+    Raises:
+        ValueError: If the cursor is malformed or was issued for a different sort.
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        cursor_sort_by, cursor_order, sort_value, event_id = json.loads(base64.urlsafe_b64decode(padded))
+    except (ValueError, TypeError, binascii.Error):
+        raise ValueError('Invalid cursor.')
+
+    if cursor_sort_by != sort_by or cursor_order != order or not isinstance(event_id, int):
+        raise ValueError('Cursor does not match the requested sort order.')
+
+    return sort_value, event_id
+
+
+def keyset_condition(sort_expr, order):
+    """
+    keyset_condition() returns the WHERE condition selecting rows after a cursor position.
+    It takes two parameters: the cursor's sort value and event ID.
+    """
+    operator = '>' if order == 'asc' else '<'
+    return f"({sort_expr}, e.event_id) {operator} (?, ?)"
+
+
+def order_clause(sort_expr, order):
+    """
+    order_clause() orders by the sort expression with event_id as a unique tiebreaker.
+    """
+    return f"ORDER BY {sort_expr} {order}, e.event_id {order}"
+
+
+def next_page_cursor(rows, per_page, sort_by, order):
+    """
+    next_page_cursor() trims the look-ahead row from a page fetched with LIMIT per_page + 1
+    and returns the cursor for the following page.
+
+    Rows must expose the 'sort_key' and 'event_id' columns.
+
+    Returns:
+        tuple: (rows, next_cursor), where next_cursor is None on the last page.
+    """
+    if len(rows) <= per_page:
+        return rows, None
+
+    rows = rows[:per_page]
+    last = rows[-1]
+    return rows, encode_cursor(sort_by, order, last['sort_key'], last['event_id'])
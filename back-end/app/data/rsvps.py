@@ -0,0 +1,103 @@
+from app.data.write_queue import WriteRejected
+
+
+class EventNotFoundError(WriteRejected, LookupError):
+    """
+    Raised when an RSVP or review references an event that does not exist.
+    """
+
+
+class SoldOutError(WriteRejected):
+    """
+    Raised when an RSVP of 'Going' is made for an event with no portions left.
+    """
+
+
+def check_rsvp(conn, user_id, event_id, status):
+    """
+    check_rsvp() answers the cheap cases of an RSVP from a plain read, without waiting for the
+    write lock: a 'Going' RSVP that is already 'Going', or one for a sold-out event.
+
+    Returns:
+        bool: False if the RSVP already has this status, True if it needs to be written.
+    Raises:
+        EventNotFoundError: If status is 'Going' and the event does not exist.
+        SoldOutError: If status is 'Going' and no portions are left.
+    """
+    if status != 'Going':
+        return True
+
+    current = conn.execute(
+        """
+        SELECT e.quantity, r.status
+        FROM Event e
+        LEFT JOIN RSVP r ON r.event_id = e.event_id AND r.user_id = ?
+        WHERE e.event_id = ?
+        """,
+        (user_id, event_id)
+    ).fetchone()
+    if current is None:
+        raise EventNotFoundError(event_id)
+    if current["status"] == 'Going':
+        return False
+    if current["quantity"] <= 0:
+        raise SoldOutError(event_id)
+    return True
+
+
+def save_rsvp(conn, user_id, event_id, status):
+    """
+    save_rsvp() creates a user's RSVP to an event or changes its status, reserving a portion of
+    the event's quantity for 'Going' and giving it back when a 'Going' RSVP changes status.
+
+    It must run inside a write transaction (e.g. as a write queue op): the reservation is a
+    conditional UPDATE ... WHERE quantity > 0 in the same transaction as the RSVP itself, so
+    concurrent RSVPs can never take more portions than the event has. The caller commits, or
+    rolls back if an error is raised.
+
+    Parameters:
+        conn (sqlite3.Connection): The connection holding the write transaction.
+        user_id (int): The user RSVPing.
+        event_id (int): The event.
+        status (str): 'Going', 'Interested' or 'Not Going'.
+
+    Returns:
+        bool: True if the RSVP changed, False if it already had this status.
+    Raises:
+        EventNotFoundError: If the event does not exist.
+        SoldOutError: If status is 'Going' and no portions are left.
+        sqlite3.IntegrityError: If the status is not a valid RSVP status.
+    """
+    going = status == 'Going'
+
+    previous = conn.execute(
+        "SELECT status FROM RSVP WHERE user_id = ? AND event_id = ?",
+        (user_id, event_id)
+    ).fetchone()
+    if previous is not None and previous["status"] == status:
+        return False
+    was_going = previous is not None and previous["status"] == 'Going'
+
+    if going and not was_going:
+        reserved = conn.execute(
+            "UPDATE Event SET quantity = quantity - 1 WHERE event_id = ? AND quantity > 0",
+            (event_id,)
+        ).rowcount
+        if not reserved:
+            if conn.execute("SELECT 1 FROM Event WHERE event_id = ?", (event_id,)).fetchone():
+                raise SoldOutError(event_id)
+            raise EventNotFoundError(event_id)
+    elif was_going and not going:
+        # Cancelling gives the portion back
+        conn.execute("UPDATE Event SET quantity = quantity + 1 WHERE event_id = ?", (event_id,))
+
+    # The foreign key rejects a missing event
+    conn.execute(
+        """
+        INSERT INTO RSVP (user_id, event_id, status)
+        VALUES (?, ?, ?)
+        ON CONFLICT (user_id, event_id) DO UPDATE SET status = excluded.status
+        """,
+        (user_id, event_id, status)
+    )
+    return True
@@ -1,6 +1,6 @@
 -- User information
 
-CREATE TABLE User(
+CREATE TABLE IF NOT EXISTS User(
     user_id INTEGER PRIMARY KEY AUTOINCREMENT,
     email TEXT UNIQUE NOT NULL,
     password_hash TEXT UNIQUE NOT NULL,
@@ -13,7 +13,7 @@ CREATE TABLE User(
 ); 
 
 -- Event information
-CREATE TABLE Event (
+CREATE TABLE IF NOT EXISTS Event (
     event_id INTEGER PRIMARY KEY AUTOINCREMENT,
     user_id INTEGER NOT NULL,
     title TEXT NOT NULL,
@@ -28,12 +28,12 @@ CREATE TABLE Event (
 );
 
 -- Food types 
-CREATE TABLE FoodTypes (
+CREATE TABLE IF NOT EXISTS FoodTypes (
     food_type_id INTEGER PRIMARY KEY AUTOINCREMENT,
     food_type_name TEXT UNIQUE NOT NULL
 );
 
-INSERT INTO FoodTypes (food_type_name) VALUES 
+INSERT OR IGNORE INTO FoodTypes (food_type_name) VALUES 
 ('Snacks'), 
 ('Vegetarian'), 
 ('Vegan'), 
@@ -46,7 +46,7 @@ INSERT INTO FoodTypes (food_type_name) VALUES
 ('Other');
 
 -- Assoc table food types and events
-CREATE TABLE EventFoodTypes (
+CREATE TABLE IF NOT EXISTS EventFoodTypes (
     event_id INTEGER NOT NULL,
     food_type_id INTEGER NOT NULL,
     PRIMARY KEY (event_id, food_type_id),
@@ -56,7 +56,7 @@ CREATE TABLE EventFoodTypes (
 
 -- Assoc table food types (diet) and user
 
-CREATE TABLE UserFoodTypes (
+CREATE TABLE IF NOT EXISTS UserFoodTypes (
     user_id INTEGER NOT NULL,
     food_type_id INTEGER NOT NULL,
     PRIMARY KEY (user_id, food_type_id),
@@ -65,7 +65,7 @@ CREATE TABLE UserFoodTypes (
 );
 
 -- Favorite event information
-CREATE TABLE Favorite (
+CREATE TABLE IF NOT EXISTS Favorite (
     user_id INTEGER NOT NULL,
     event_id INTEGER NOT NULL,
     PRIMARY KEY (user_id, event_id),
@@ -74,7 +74,7 @@ CREATE TABLE Favorite (
 );
 
 -- RSVP information
-CREATE TABLE RSVP (
+CREATE TABLE IF NOT EXISTS RSVP (
     rsvp_id INTEGER PRIMARY KEY,
     user_id INTEGER NOT NULL,
     event_id INTEGER NOT NULL,
@@ -84,7 +84,7 @@ CREATE TABLE RSVP (
 );
 
 -- Review information
-CREATE TABLE Review (
+CREATE TABLE IF NOT EXISTS Review (
     Review_id INTEGER PRIMARY KEY,
     user_id INTEGER NOT NULL,
     event_id INTEGER NOT NULL,
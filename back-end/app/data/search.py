@@ -0,0 +1,29 @@
+import re
+
+# Column weights for bm25(): title matches rank above description, description above location
+BM25_WEIGHTS = (10.0, 5.0, 1.0)
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def build_match_query(text):
+    """
+    build_match_query(text) turns free-form user input into an FTS5 MATCH expression.
+
+    Every word becomes a quoted prefix term ("word"*), and terms are implicitly ANDed, so user
+    input can never be interpreted as FTS5 query syntax.
+
+    Returns:
+        str: The MATCH expression, or None if the input contains no searchable words.
+    """
+    tokens = _TOKEN_RE.findall(text or '')
+    if not tokens:
+        return None
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+
+def bm25_expression(table='EventSearch'):
+    """
+    bm25_expression(table) returns the weighted bm25() call used to rank matches (lower is better).
+    """
+    return f"bm25({table}, {', '.join(str(w) for w in BM25_WEIGHTS)})"
@@ -0,0 +1,69 @@
+import json
+from flask import Response, current_app, request
+from app.data.database import get_pool
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+
+def ndjson_requested():
+    """
+    ndjson_requested() returns True if the client asked for a streamed response, either with
+    ?stream=1 or by preferring application/x-ndjson in its Accept header.
+    """
+    if request.args.get('stream', '').lower() in ('1', 'true'):
+        return True
+    return request.accept_mimetypes.best_match(['application/json', NDJSON_MIMETYPE]) == NDJSON_MIMETYPE
+
+
+def stream_query(query, params, format_row):
+    """
+    stream_query() runs a query and streams its rows as newline-delimited JSON.
+
+    Rows are read with fetchmany() in STREAM_CHUNK_SIZE chunks and encoded one chunk at a time,
+    so memory stays flat regardless of the number of rows. The generator runs after the request
+    context has been torn down, so it uses its own pooled connection and releases it when the
+    stream ends or the response is closed, whether or not the body was ever read.
+
+    Parameters:
+        query (str): The SQL query.
+        params (sequence): The query parameters.
+        format_row (callable): Converts a sqlite3.Row into a JSON-serializable object.
+
+    Returns:
+        Flask.Response: A streaming application/x-ndjson response.
+    Raises:
+        sqlite3.Error: If the query fails to execute.
+    """
+    chunk_size = current_app.config.get('STREAM_CHUNK_SIZE', 500)
+    pool = get_pool()
+    conn = pool.acquire()
+
+    try:
+        cursor = conn.execute(query, params)
+    except Exception:
+        pool.release(conn)
+        raise
+
+    released = []
+
+    def release():
+        # Runs when the stream ends and again when the response is closed; only the first counts
+        if not released:
+            released.append(True)
+            cursor.close()
+            pool.release(conn)
+
+    def generate():
+        try:
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield ''.join(json.dumps(format_row(row), separators=(',', ':')) + '\n' for row in rows)
+        finally:
+            release()
+
+    response = Response(generate(), status=200, mimetype=NDJSON_MIMETYPE)
+    # A body that is never iterated (HEAD, an early disconnect) never reaches the finally above
+    response.call_on_close(release)
+    return response
@@ -0,0 +1,308 @@
+import atexit
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from app.data.database import get_pool
+
+logger = logging.getLogger(__name__)
+
+_settings = {
+    'max_batch': 64,
+    'max_delay': 0.002,
+    'timeout': 10.0,
+}
+
+_writer = None
+_lock = threading.Lock()
+
+# Periodic upkeep run on the writer thread, as {fn: interval in seconds}
+_maintenance_tasks = {}
+
+# Tells the writer thread to finish what is queued and exit
+_STOP = object()
+
+# Shortest idle wait for a due maintenance task, so a zero interval doesn't spin the writer
+_MIN_IDLE_WAIT = 0.05
+
+
+class WriteRejected(Exception):
+    """
+    Base class for exceptions an op raises to reject a write for a business reason (e.g. a
+    sold-out event). They are counted as rejected rather than failed in the queue stats.
+    """
+
+
+class WriteQueueTimeout(sqlite3.OperationalError):
+    """
+    Raised when a queued write did not complete within the configured timeout.
+    """
+
+
+class WriteQueue:
+    """
+    WriteQueue funnels small write operations from request handlers through one writer thread,
+    which group-commits them: every op queued within max_delay seconds (up to max_batch ops)
+    runs in a single BEGIN IMMEDIATE ... COMMIT, so the batch pays for one fsync and writers in
+    this process never contend for SQLite's write lock.
+
+    Each op runs inside its own SAVEPOINT, so a failing op is rolled back on its own and its
+    exception is raised to its caller while the rest of the batch commits. Results are only
+    handed back once the batch has committed.
+
+    Maintenance tasks (see add_maintenance_task()) run between batches, in their own
+    transaction, at most once per interval. An idle writer wakes up when the next one is due,
+    so they run without any write traffic too.
+    """
+
+    def __init__(self, pool, max_batch=64, max_delay=0.002, maintenance_tasks=None):
+        self.pool = pool
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._queue = queue.Queue()
+        self._thread = None
+        # [fn, interval, next run (time.monotonic())]
+        self._maintenance = [
+            [fn, interval, time.monotonic() + interval]
+            for fn, interval in (maintenance_tasks or {}).items()
+        ]
+        self._stats_lock = threading.Lock()
+        self._stats = {'ops': 0, 'failed': 0, 'rejected': 0, 'batches': 0, 'largest_batch': 0}
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='sqlite-writer', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=10.0):
+        """
+        stop() commits every op already queued, then stops the writer thread.
+        """
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+
+    def submit(self, fn, *args):
+        """
+        submit(fn, *args) queues fn(conn, *args) to run on the writer's connection.
+
+        Returns:
+            concurrent.futures.Future: Resolves to fn's return value once the batch has committed.
+        """
+        future = Future()
+        self._queue.put((future, fn, args))
+        return future
+
+    def stats(self):
+        """
+        stats() returns the writer counters (ops, failed, rejected, batches, largest_batch, queued).
+        Ops that raised WriteRejected are counted as rejected, any other exception as failed.
+        """
+        with self._stats_lock:
+            return dict(self._stats, queued=self._queue.qsize())
+
+    def _next_batch(self):
+        try:
+            item = self._queue.get(timeout=self._idle_timeout())
+        except queue.Empty:
+            return [], False
+        if item is _STOP:
+            return [], True
+
+        batch = [item]
+        deadline = time.monotonic() + self.max_delay
+        while len(batch) < self.max_batch:
+            try:
+                remaining = deadline - time.monotonic()
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _idle_timeout(self):
+        # None (wait for a write) unless a maintenance task is scheduled
+        if not self._maintenance:
+            return None
+        due = min(next_run for _, _, next_run in self._maintenance)
+        return max(due - time.monotonic(), _MIN_IDLE_WAIT)
+
+    def _run(self):
+        conn = self.pool.acquire()
+        try:
+            stopping = False
+            while not stopping:
+                batch, stopping = self._next_batch()
+                batch = [op for op in batch if op[0].set_running_or_notify_cancel()]
+                if batch:
+                    self._commit_batch(conn, batch)
+                self._run_maintenance(conn)
+        finally:
+            self.pool.release(conn)
+
+    def _run_maintenance(self, conn):
+        now = time.monotonic()
+        for task in self._maintenance:
+            fn, interval, next_run = task
+            if now < next_run:
+                continue
+            task[2] = now + interval
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                fn(conn)
+                conn.commit()
+            except Exception as e:
+                logger.error("Write queue maintenance task %s failed: %s", fn.__name__, e)
+                if conn.in_transaction:
+                    conn.rollback()
+
+    def _commit_batch(self, conn, batch):
+        results = []
+        failed = rejected = 0
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for future, fn, args in batch:
+                conn.execute("SAVEPOINT write_op")
+                try:
+                    results.append((future, True, fn(conn, *args)))
+                    conn.execute("RELEASE write_op")
+                except Exception as e:
+                    conn.execute("ROLLBACK TO write_op")
+                    conn.execute("RELEASE write_op")
+                    results.append((future, False, e))
+                    if isinstance(e, WriteRejected):
+                        rejected += 1
+                    else:
+                        failed += 1
+            conn.commit()
+        except Exception as e:
+            logger.error("Group commit of %d writes failed: %s", len(batch), e)
+            if conn.in_transaction:
+                conn.rollback()
+            for future, _, _ in batch:
+                future.set_exception(e)
+            failed, rejected = len(batch), 0
+        else:
+            for future, ok, value in results:
+                if ok:
+                    future.set_result(value)
+                else:
+                    future.set_exception(value)
+
+        with self._stats_lock:
+            self._stats['ops'] += len(batch)
+            self._stats['failed'] += failed
+            self._stats['rejected'] += rejected
+            self._stats['batches'] += 1
+            self._stats['largest_batch'] = max(self._stats['largest_batch'], len(batch))
+
+
+def init_app(app):
+    """
+    init_app(app) configures the write queue from the app config. The writer thread is started
+    lazily in each process, since threads don't survive a fork: on the first write, or on the
+    first request if maintenance tasks are registered, so they run in processes that never
+    write through the queue.
+    """
+    global _writer
+
+    _settings.update(
+        max_batch=int(app.config.get('WRITE_QUEUE_MAX_BATCH', _settings['max_batch'])),
+        max_delay=float(app.config.get('WRITE_QUEUE_MAX_DELAY', _settings['max_delay'])),
+        timeout=float(app.config.get('WRITE_QUEUE_TIMEOUT', _settings['timeout'])),
+    )
+
+    with _lock:
+        if _writer is not None and _writer[1] == os.getpid():
+            _writer[0].stop()
+        _writer = None
+
+    app.before_request(_start_for_maintenance)
+
+
+def _start_for_maintenance():
+    if _maintenance_tasks:
+        get_write_queue()
+
+
+def add_maintenance_task(fn, interval):
+    """
+    add_maintenance_task(fn, interval) runs fn(conn) on the writer thread every interval seconds,
+    between batches or when the writer is idle, inside its own write transaction. Registering the same
+    fn again replaces its interval. Writer threads started before the call don't run it.
+    """
+    _maintenance_tasks[fn] = float(interval)
+
+
+def get_write_queue():
+    """
+    get_write_queue() returns this process's WriteQueue, starting its writer thread on first use.
+    """
+    global _writer
+
+    writer = _writer
+    if writer is not None and writer[1] == os.getpid():
+        return writer[0]
+
+    with _lock:
+        if _writer is None or _writer[1] != os.getpid():
+            write_queue = WriteQueue(
+                get_pool(), _settings['max_batch'], _settings['max_delay'], _maintenance_tasks
+            )
+            write_queue.start()
+            atexit.register(write_queue.stop)
+            _writer = (write_queue, os.getpid())
+        return _writer[0]
+
+
+def get_write_queue_stats():
+    """
+    get_write_queue_stats() returns the counters of this process's write queue, or an empty dict
+    if it has not written anything yet.
+    """
+    writer = _writer
+    if writer is None or writer[1] != os.getpid():
+        return {}
+    return writer[0].stats()
+
+
+def execute_write(fn, *args):
+    """
+    execute_write(fn, *args) runs fn(conn, *args) on the writer thread and waits for its batch
+    to commit. fn must not commit or roll back itself.
+
+    Returns:
+        The return value of fn.
+    Raises:
+        WriteQueueTimeout: If the writer did not start fn within WRITE_QUEUE_TIMEOUT seconds; fn
+            is then cancelled and never runs.
+        Exception: Whatever fn raised; its changes were rolled back.
+    """
+    future = get_write_queue().submit(fn, *args)
+    try:
+        return future.result(timeout=_settings['timeout'])
+    except FutureTimeoutError:
+        if future.cancel():
+            raise WriteQueueTimeout("Timed out waiting for the database writer")
+        # fn is already running and its batch may still commit, so wait for the outcome rather
+        # than report a failure for a write that then lands (and skip the caller's invalidation)
+        return future.result()
+
+
+def shutdown(timeout=10.0):
+    """
+    shutdown() commits every write already queued in this process and stops its writer thread.
+    A later write starts a new one.
+    """
+    global _writer
+
+    with _lock:
+        writer = _writer
+        if writer is None or writer[1] != os.getpid():
+            return
+        _writer = None
+    writer[0].stop(timeout)
@@ -0,0 +1,245 @@
+"""
+Request and SQL metrics, exposed in the Prometheus text format.
+
+Metrics are kept per process: under a pre-forking server each worker reports its own
+counters, labelled with its pid.
+"""
+
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from flask import request
+
+# Upper bounds of the histogram buckets
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (100, 1000, 10000, 100000, 1000000, 10000000)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+# Metrics state of the request being handled in this context
+_request_state = ContextVar('request_metrics', default=None)
+
+
+class Histogram:
+    """
+    Histogram counts observations into cumulative buckets, Prometheus style.
+    """
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def samples(self, name, labels):
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            yield f"{name}_bucket", dict(labels, le=_format_value(bound)), cumulative
+        yield f"{name}_bucket", dict(labels, le='+Inf'), self.count
+        yield f"{name}_sum", labels, self.sum
+        yield f"{name}_count", labels, self.count
+
+
+class MetricsRegistry:
+    """
+    MetricsRegistry holds the request and SQL metrics of this process.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = {}          # (endpoint, method, status) -> count
+        self.latency = {}           # (endpoint, method) -> Histogram
+        self.response_size = {}     # (endpoint, method) -> Histogram
+        self.in_flight = {}         # (endpoint, method) -> gauge
+        self.queries = {}           # (endpoint, method) -> Histogram of statements per request
+        self.query_seconds = {}     # (endpoint, method) -> total seconds spent executing SQL
+        self.collectors = []        # callables returning (name, help, value) gauges
+
+    def start(self, key):
+        with self._lock:
+            self.in_flight[key] = self.in_flight.get(key, 0) + 1
+
+    def finish(self, key):
+        with self._lock:
+            self.in_flight[key] -= 1
+
+    def record(self, key, status, seconds, size, query_count, query_seconds):
+        with self._lock:
+            request_key = key + (status,)
+            self.requests[request_key] = self.requests.get(request_key, 0) + 1
+            _histogram(self.latency, key, LATENCY_BUCKETS).observe(seconds)
+            if size is not None:
+                _histogram(self.response_size, key, SIZE_BUCKETS).observe(size)
+            _histogram(self.queries, key, QUERY_COUNT_BUCKETS).observe(query_count)
+            self.query_seconds[key] = self.query_seconds.get(key, 0.0) + query_seconds
+
+    def render(self):
+        """
+        render() returns every metric in the Prometheus text exposition format.
+        """
+        pid = str(os.getpid())
+        lines = []
+
+        def family(name, kind, help_text, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for sample_name, labels, value in samples:
+                lines.append(f"{sample_name}{_format_labels(dict(labels, pid=pid))} {_format_value(value)}")
+
+        with self._lock:
+            family(
+                'http_requests_total', 'counter', 'Requests handled, by endpoint, method and status.',
+                [('http_requests_total', _labels(key, ('endpoint', 'method', 'status')), count)
+                 for key, count in sorted(self.requests.items())]
+            )
+            family(
+                'http_requests_in_flight', 'gauge', 'Requests currently being handled.',
+                [('http_requests_in_flight', _labels(key), count) for key, count in sorted(self.in_flight.items())]
+            )
+            for name, kind, help_text, histograms in (
+                ('http_request_duration_seconds', 'histogram',
+                 'Time to produce the response, by endpoint.', self.latency),
+                ('http_response_size_bytes', 'histogram',
+                 'Response body size, by endpoint (streamed responses are not counted).', self.response_size),
+                ('db_queries_per_request', 'histogram',
+                 'SQL statements executed per request, by endpoint.', self.queries),
+            ):
+                family(name, kind, help_text, [
+                    sample
+                    for key, histogram in sorted(histograms.items())
+                    for sample in histogram.samples(name, _labels(key))
+                ])
+            family(
+                'db_query_seconds_total', 'counter', 'Time spent executing SQL statements, by endpoint.',
+                [('db_query_seconds_total', _labels(key), seconds) for key, seconds in sorted(self.query_seconds.items())]
+            )
+            collectors = list(self.collectors)
+
+        for collector in collectors:
+            for name, help_text, value in collector():
+                family(name, 'gauge', help_text, [(name, {}, value)])
+
+        return '\n'.join(lines) + '\n'
+
+
+def _histogram(histograms, key, buckets):
+    histogram = histograms.get(key)
+    if histogram is None:
+        histogram = histograms[key] = Histogram(buckets)
+    return histogram
+
+
+def _labels(key, names=('endpoint', 'method')):
+    return dict(zip(names, key))
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + '}'
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+# Shared by all requests in this process
+registry = MetricsRegistry()
+
+
+def _request_key():
+    rule = request.url_rule
+    # Unmatched URLs share one label so 404 scans can't blow up the label set
+    return (rule.rule if rule is not None else '<unmatched>', request.method)
+
+
+def _before_request():
+    # [key, start time, statement count, statement seconds]
+    state = [_request_key(), time.perf_counter(), 0, 0.0]
+    _request_state.set(state)
+    registry.start(state[0])
+
+
+def _after_request(response):
+    state = _request_state.get()
+    if state is not None:
+        # Content-Length is unset for streamed responses
+        registry.record(
+            state[0], response.status_code, time.perf_counter() - state[1],
+            response.content_length, state[2], state[3]
+        )
+    return response
+
+
+def _teardown_request(exception=None):
+    state = _request_state.get()
+    if state is not None:
+        _request_state.set(None)
+        registry.finish(state[0])
+
+
+def _count_query(sql, seconds):
+    state = _request_state.get()
+    if state is not None:
+        state[2] += 1
+        state[3] += seconds
+
+
+def add_collector(collector):
+    """
+    add_collector(collector) adds a callable returning (name, help text, value) gauges, such as
+    pool or cache counters, that is read at every scrape.
+    """
+    registry.collectors.append(collector)
+
+
+def _stats_gauges(prefix, stats, help_text):
+    return [
+        (f"{prefix}_{name}", f"{help_text} ({name.replace('_', ' ')}).", value)
+        for name, value in sorted(stats.items())
+        if isinstance(value, (int, float))
+    ]
+
+
+def _app_collector():
+    from app.auth.token_utils import get_token_cache_stats
+    from app.cache import event_feed_cache, profile_cache
+    from app.data.database import get_pool_stats
+    from app.data.write_queue import get_write_queue_stats
+
+    return (
+        _stats_gauges('db_pool', get_pool_stats(), 'SQLite connection pool')
+        + _stats_gauges('db_write_queue', get_write_queue_stats(), 'Group-commit write queue')
+        + _stats_gauges('event_feed_cache', event_feed_cache.stats(), 'Event feed response cache')
+        + _stats_gauges('profile_cache', profile_cache.stats(), 'Profile cache')
+        + _stats_gauges('token_cache', get_token_cache_stats(), 'Decoded token cache')
+    )
+
+
+def init_app(app):
+    """
+    init_app(app) starts recording request and SQL metrics, unless METRICS_ENABLED is off.
+    It should run before the other before_request hooks so their time is measured too.
+    """
+    from app.data.database import add_query_observer
+
+    if not app.config.get('METRICS_ENABLED', True):
+        return
+
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.teardown_request(_teardown_request)
+    add_query_observer(_count_query)
+    if _app_collector not in registry.collectors:
+        add_collector(_app_collector)
@@ -0,0 +1,200 @@
+"""
+Opt-in SQL diagnostics: slow-query and N+1 detection for statements run on pooled connections.
+
+Every pooled connection gets a sqlite3 trace callback, which sees each statement with its
+parameters expanded, and every statement is timed through the pool's query observers. Statements
+are grouped by fingerprint (the SQL with literals and IN lists normalized) for each request. A
+statement slower than QUERY_TRACE_SLOW_MS, or a fingerprint run more than
+QUERY_TRACE_REPEAT_THRESHOLD times in one request, is logged with its call site and EXPLAIN QUERY
+PLAN output.
+"""
+
+import functools
+import logging
+import os
+import re
+import sqlite3
+import sys
+import threading
+from contextvars import ContextVar
+from flask import current_app, request
+
+logger = logging.getLogger(__name__)
+
+_settings = {
+    'slow_seconds': 0.05,
+    'repeat_threshold': 10,
+    'db_path': None,
+}
+
+# Files whose frames are skipped when looking for the code that ran a statement
+_APP_DIR = os.path.dirname(os.path.abspath(__file__))
+_SKIP_FILES = {
+    os.path.join(_APP_DIR, 'data', 'database.py'),
+    os.path.abspath(__file__),
+}
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACE_RE = re.compile(r"\s+")
+_PLANNABLE_RE = re.compile(r"\s*(SELECT|WITH|INSERT|UPDATE|DELETE|REPLACE)\b", re.IGNORECASE)
+
+# Trace state of the request being handled in this context
+_request_trace = ContextVar('request_trace', default=None)
+
+# The last statement seen by the trace callback, with its parameters expanded, per thread
+_expanded = threading.local()
+
+
+class RequestTrace:
+    """
+    RequestTrace accumulates the statements run while handling one request.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.slowest = 0.0
+        self.slow = 0
+        self.fingerprints = {}
+        self.reported = set()
+
+    def summary(self):
+        """
+        summary() returns a one-line description for the X-Query-Trace header.
+        """
+        parts = [
+            f"{self.count} queries",
+            f"{self.seconds * 1000:.2f} ms",
+            f"slowest {self.slowest * 1000:.2f} ms",
+            f"slow {self.slow}",
+        ]
+        if self.fingerprints:
+            fingerprint, count = max(self.fingerprints.items(), key=lambda item: item[1])
+            if count > 1:
+                parts.append(f"most repeated x{count}: {fingerprint[:200]}")
+        return '; '.join(parts)
+
+
+@functools.lru_cache(maxsize=1024)
+def fingerprint(sql):
+    """
+    fingerprint(sql) normalizes a statement so that executions differing only in literal
+    values or IN list length share a fingerprint.
+    """
+    normalized = _STRING_RE.sub('?', sql)
+    normalized = _NUMBER_RE.sub('?', normalized)
+    normalized = _IN_LIST_RE.sub('(?+)', normalized)
+    return _SPACE_RE.sub(' ', normalized).strip()
+
+
+def _call_site():
+    frame = sys._getframe(2)
+    while frame is not None and frame.f_code.co_filename in _SKIP_FILES:
+        frame = frame.f_back
+    if frame is None:
+        return '<unknown>'
+    filename = os.path.relpath(frame.f_code.co_filename, _APP_DIR)
+    return f"{filename}:{frame.f_lineno} ({frame.f_code.co_name})"
+
+
+def explain(sql):
+    """
+    explain(sql) returns the EXPLAIN QUERY PLAN of a statement with its parameters expanded,
+    one plan step per line, using a separate read-only connection.
+    """
+    if not _PLANNABLE_RE.match(sql):
+        return "  (no plan for this statement)"
+
+    try:
+        conn = sqlite3.connect(f"file:{_settings['db_path']}?mode=ro", uri=True)
+        try:
+            rows = conn.execute(f"EXPLAIN QUERY PLAN {sql}").fetchall()
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        return f"(no plan: {e})"
+    return '\n'.join(f"  {row[3]}" for row in rows)
+
+
+def _trace_statement(statement):
+    # Statements run by triggers are reported as comments; keep the statement that fired them
+    if not statement.startswith('--'):
+        _expanded.statement = statement
+
+
+def _attach(conn):
+    conn.set_trace_callback(_trace_statement)
+
+
+def _observe(sql, seconds):
+    # Connection setup, not application queries
+    if sql.lstrip()[:6].upper() == 'PRAGMA':
+        return
+
+    trace = _request_trace.get()
+    key = fingerprint(sql)
+    report = None
+
+    if seconds >= _settings['slow_seconds']:
+        report = f"Slow query ({seconds * 1000:.1f} ms)"
+
+    if trace is not None:
+        trace.count += 1
+        trace.seconds += seconds
+        trace.slowest = max(trace.slowest, seconds)
+        if report:
+            trace.slow += 1
+
+        count = trace.fingerprints[key] = trace.fingerprints.get(key, 0) + 1
+        if count > _settings['repeat_threshold'] and key not in trace.reported:
+            trace.reported.add(key)
+            report = report or f"Repeated query ({count} times in {request.method} {request.path})"
+
+    if report:
+        statement = getattr(_expanded, 'statement', None) or sql
+        logger.warning(
+            "%s at %s: %s\n%s", report, _call_site(), key, explain(statement)
+        )
+
+
+def _before_request():
+    _request_trace.set(RequestTrace())
+
+
+def _after_request(response):
+    trace = _request_trace.get()
+    if trace is not None and current_app.debug:
+        response.headers['X-Query-Trace'] = trace.summary()
+    return response
+
+
+def _teardown_request(exception=None):
+    _request_trace.set(None)
+
+
+def init_app(app):
+    """
+    init_app(app) enables the tracer if QUERY_TRACE_ENABLED is set. It must run before the
+    connection pool opens its first connection. The per-request X-Query-Trace summary header
+    is only added while the app runs in debug mode.
+    """
+    from app.data.database import add_connection_hook, add_query_observer
+
+    if not app.config.get('QUERY_TRACE_ENABLED'):
+        return
+
+    _settings.update(
+        slow_seconds=float(app.config.get('QUERY_TRACE_SLOW_MS', 50)) / 1000,
+        repeat_threshold=int(app.config.get('QUERY_TRACE_REPEAT_THRESHOLD', 10)),
+        db_path=app.config.get('DATABASE_PATH'),
+    )
+
+    add_connection_hook(_attach)
+    add_query_observer(_observe)
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.teardown_request(_teardown_request)
+    logger.info("Query tracing enabled (slow: %s ms, repeat threshold: %s)",
+                app.config.get('QUERY_TRACE_SLOW_MS', 50), _settings['repeat_threshold'])
@@ -7,6 +7,8 @@ def register_routes(app: Flask):
     from .rsvp_routes import rsvp_bp
     from .favorite_routes import fav_bp
     from .review_routes import review_bp
+    from .feed_routes import feed_bp
+    from .metrics_routes import metrics_bp
 
     app.register_blueprint(user_bp)
     app.register_blueprint(event_bp)
@@ -14,4 +16,6 @@ def register_routes(app: Flask):
     app.register_blueprint(rsvp_bp)
     app.register_blueprint(fav_bp)
     app.register_blueprint(review_bp)
+    app.register_blueprint(feed_bp)
+    app.register_blueprint(metrics_bp)
 
@@ -1,12 +1,49 @@
-from flask import Blueprint, request, jsonify, make_response
-from werkzeug.security import generate_password_hash, check_password_hash
-from app.auth import generate_token, validate_token
+from flask import Blueprint, request, jsonify, make_response, g, current_app
+from app.auth import generate_token
+from app.auth.refresh_tokens import issue_refresh_token, rotate_refresh_token, revoke_refresh_token
+from app.auth.passwords import hash_password, verify_password, needs_rehash, HashingPoolBusy
 from app.data.database import get_db_connection
 import sqlite3
 import jwt
+import logging
 
 auth_bp = Blueprint('auth_bp', __name__)
 
+logger = logging.getLogger(__name__)
+
+def _busy_response():
+    """
+    _busy_response() is returned when the password hashing pool is saturated.
+    """
+    response = jsonify({'success': False, 'message': 'Server is busy, please try again shortly.'})
+    response.headers['Retry-After'] = '1'
+    return response, 503
+
+def _set_auth_cookies(response, user_id, refresh_token):
+    """
+    _set_auth_cookies() sets a fresh access token cookie and the refresh token cookie. The refresh
+    token is only sent back to the /auth endpoints.
+    """
+    response.set_cookie(
+        'token',
+        generate_token(user_id),
+        httponly=True,
+        secure=False,
+        samesite='Lax',
+        domain=None
+    )
+    response.set_cookie(
+        'refresh_token',
+        refresh_token,
+        max_age=current_app.config.get('REFRESH_TOKEN_TTL'),
+        path='/auth',
+        httponly=True,
+        secure=False,
+        samesite='Lax',
+        domain=None
+    )
+    return response
+
 @auth_bp.route('/auth/register', methods=['POST'])
 def register():
     """
@@ -25,7 +62,11 @@ def register():
     if not email.endswith('@bu.edu'):
          return jsonify({'success': False, 'message': 'Only @bu.edu email domains are allowed'}), 400
 
-    password_hash = generate_password_hash(password)
+    # Hashing runs in the worker pool so it doesn't stall other requests
+    try:
+        password_hash = hash_password(password)
+    except HashingPoolBusy:
+        return _busy_response()
 
     try:
         with get_db_connection() as conn:
@@ -66,42 +107,71 @@ def login():
             
             user_id, password_hash = result[0], result[1]
 
-            if not check_password_hash(password_hash, password):
+            if not verify_password(password_hash, password):
                 return jsonify({'success': False, 'message': 'Invalid email or password'}), 401
 
-            # If login is successful, create and return a JWT.
-            token = generate_token(user_id)
+            # Transparently upgrade hashes made with an older method or cost
+            if needs_rehash(password_hash):
+                try:
+                    cursor.execute(
+                        "UPDATE User SET password_hash = ? WHERE user_id = ?",
+                        (hash_password(password), user_id)
+                    )
+                    conn.commit()
+                except HashingPoolBusy:
+                    logger.info("Skipped password rehash for user %s: hashing pool busy", user_id)
+
+            # If login is successful, create and return a JWT and a refresh token.
+            refresh_token = issue_refresh_token(user_id)
+            conn.commit()
 
             response = make_response(jsonify({'success': True, 'message': 'Login successful'}))
-            response.set_cookie(
-                'token',
-                token,
-                httponly=True,          
-                secure=False,        
-                samesite='Lax',         
-                domain=None
-            )
-            
-            print(response)
-
-            return response
+            return _set_auth_cookies(response, user_id, refresh_token)
         
+    except HashingPoolBusy:
+        return _busy_response()
     except sqlite3.Error as e:
-        print("Database error:", str(e))
+        logger.error("Database error during login: %s", e)
         return jsonify({'success': False, 'message': 'Failed to login', 'details': str(e)}), 500
     except Exception as e:
-        print("Unexpected error:", str(e))
+        logger.exception("Unexpected error during login")
         return jsonify({'success': False, 'message': 'An unexpected error occurred', 'details': str(e)}), 500
 
 @auth_bp.route('/auth/logout', methods=['POST'])
 def logout():
     """
-    Logs out the user by clearing the JWT token cookie.
+    Logs out the user by clearing the JWT token cookie and revoking the refresh token.
     """
+    try:
+        revoke_refresh_token(request.cookies.get('refresh_token'))
+    except sqlite3.Error as e:
+        logger.error("Database error while revoking refresh token: %s", e)
+
     response = make_response(jsonify({'success': True, 'message': 'Logged out success'}))
     response.delete_cookie('token')
+    response.delete_cookie('refresh_token', path='/auth')
     return response
 
+@auth_bp.route('/auth/refresh', methods=['POST'])
+def refresh():
+    """
+    Issues a new access token for a valid refresh token, without re-checking the password.
+    The refresh token is rotated: the one presented is revoked and a new one is returned.
+    """
+    try:
+        user_id, refresh_token = rotate_refresh_token(request.cookies.get('refresh_token'))
+    except sqlite3.Error as e:
+        logger.error("Database error during refresh: %s", e)
+        return jsonify({'success': False, 'message': 'Failed to refresh session', 'details': str(e)}), 500
+
+    if user_id is None:
+        response = make_response(jsonify({'success': False, 'message': 'Invalid or expired refresh token'}), 401)
+        response.delete_cookie('refresh_token', path='/auth')
+        return response
+
+    response = make_response(jsonify({'success': True, 'message': 'Session refreshed'}))
+    return _set_auth_cookies(response, user_id, refresh_token)
+
 @auth_bp.route('/auth/verify', methods=['GET'])
 def verify():
     """
@@ -113,7 +183,7 @@ def verify():
         return jsonify({'authenticated': False, 'message': 'Token missing'}), 401
 
     try:
-        user_id = validate_token(token)
+        user_id = g.user_id
        
         if not user_id:
             return jsonify({'authenticated': False, 'message':'Invalid or expired token'}), 401
@@ -1,11 +1,26 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, current_app, request, jsonify, g
 from app.data.database import get_db_connection
-from app.auth.token_utils import validate_token
+from app.cache import (
+    event_version, event_feed_cache, feed_etag, event_etag, not_modified, set_cache_headers
+)
+from app.data.search import build_match_query, bm25_expression
+from app.data.food_types import dietary_condition, resolve_food_type_ids, UnknownFoodTypeError
+from app.data.event_summary import SUMMARY_COLUMNS, RATING_COLUMNS, format_event_summary, format_rating_histogram
+from app.data.streaming import ndjson_requested, stream_query
+from app.data.pagination import (
+    SORT_COLUMNS, MAX_PER_PAGE, parse_page_args, decode_cursor, keyset_condition, order_clause, next_page_cursor
+)
 from datetime import datetime
 import sqlite3
 
 event_bp = Blueprint('event_bp', __name__)
 
+# Columns get_event returns; internal ones (food_type_mask, version) stay out of the response
+EVENT_COLUMNS = """
+    event_id, user_id, title, description, quantity, location, address, event_date,
+    start_time, end_time
+"""
+
 # CREATE event
 @event_bp.route('/api/events', methods=['POST'])
 def create_event():
@@ -35,8 +50,8 @@ def create_event():
     if not token:
         return jsonify({'success': False, 'message': 'Authorization token is missing or invalid.'}), 401
 
-    # Validate the token and extract the user ID
-    user_id = validate_token(token)
+    # The user ID was validated by the auth layer
+    user_id = g.user_id
 
     if not user_id:
         return jsonify({'success': False, 'message': 'Invalid or expired JWT token.'}), 401
@@ -76,6 +91,15 @@ def create_event():
     except ValueError as e:
         return jsonify({'success': False, 'message': f'Invalid date or time format: {e}'}), 400
 
+    # Resolve food types up front so unknown names are rejected before anything is written
+    if not isinstance(food_types, list):
+        return jsonify({'success': False, 'message': 'food_types must be a list.'}), 400
+
+    try:
+        food_type_ids = resolve_food_type_ids(food_types)
+    except UnknownFoodTypeError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+
     # Insert to database
     try:
         with get_db_connection() as conn:
@@ -91,15 +115,12 @@ def create_event():
             )
             event_id = cursor.lastrowid
 
-            for food_type in food_types:
-                cursor.execute(
-                    """
-                    INSERT INTO EventFoodTypes (event_id, food_type_id)
-                    SELECT ?, food_type_id FROM FoodTypes WHERE food_type_name = ?
-                    """,
-                    (event_id, food_type)
-                )
+            cursor.executemany(
+                "INSERT INTO EventFoodTypes (event_id, food_type_id) VALUES (?, ?)",
+                [(event_id, food_type_id) for food_type_id in food_type_ids]
+            )
 
+        event_version.bump()
         return jsonify({'message': 'Event created successfully', 'event_id': event_id}), 201
     
     except sqlite3.Error as e:
@@ -109,65 +130,122 @@ def create_event():
 @event_bp.route('/api/getevents', methods=['GET'])
 def get_events():
     """
-    get_events() retrieves all events from the Event table as a paginated list of events.
+    get_events() retrieves all events from the EventSummary table as a paginated list of events.
 
     Paramaters:
         Pagination
+        cursor (str): Opaque position returned as next_cursor by the previous page. Every page
+            costs the same regardless of depth. Takes precedence over page.
         page (int): The page number (default 1).
-        per_page (int): The number of events per page (default 10).
+        per_page (int): The number of events per page (default 10, max 100).
         
         Sorting
-        sort_by (str): The column to sort by (e.g., 'event_date', 'start_time').
+        sort_by (str): The column to sort by ('event_date', 'start_time', 'end_time', 'title',
+            'location' or 'quantity').
         order (str): The sort order ('asc' or 'desc', default 'asc').
 
         Filtering
-        keyword (str): A keyword to search for in the title or description.
+        keyword (str): Keywords to search for in the title, description or location.
         dietary_needs (list): List of dietary needs to filter by (e.g., ['Vegan', 'Gluten-Free']).
+        dietary_match (str): 'any' (default) to match events offering any of the dietary needs,
+            'all' to match events offering all of them.
         date (str): Filter by a specific date (format: YYYY-MM-DD).
         start_time (str): Filter by events starting after this time (format: HH:MM:SS).
         end_time (str): Filter by events ending before this time (format: HH:MM:SS).
+
+        Search
+        search (str): Full-text search mode. Filters like keyword, but results are ranked by
+            relevance (bm25) instead of sort_by.
+
+    Responses are served from an in-process cache keyed by the normalized parameters until an
+    event or RSVP write bumps the event version. The ETag is derived from the same version and
+    parameters, so unchanged feeds are answered with 304 Not Modified.
+
+    Returns:
+        Flask.Response: JSON with the page of events and next_cursor (null on the last page).
     """
     # Extract query parameters
-    page = int(request.args.get('page', 1))
-    per_page = int(request.args.get('per_page', 10))
-    sort_by = request.args.get('sort_by', 'event_date')  # Default to sorting by date
-    order = request.args.get('order', 'asc').lower()
+    page, per_page, sort_by, order = parse_page_args(request.args)
+    cursor_param = request.args.get('cursor')
     keyword = request.args.get('keyword', '').strip()
+    search = request.args.get('search', '').strip()
     dietary_needs = request.args.getlist('dietary_needs')
+    dietary_match = request.args.get('dietary_match', 'any').lower()
     date = request.args.get('date')
     start_time = request.args.get('start_time')
     end_time = request.args.get('end_time')
 
-    # Validate sorting order
-    if order not in ['asc', 'desc']:
-        order = 'asc'
+    # Serve repeated queries without touching SQLite; the version is read before querying so
+    # a write that lands mid-request leaves the stored entry already stale
+    version = event_version.value
+    cache_key = (
+        page, per_page, sort_by, order, cursor_param, keyword, search,
+        tuple(sorted(dietary_needs)), dietary_match, date, start_time, end_time
+    )
+    etag = feed_etag(version, cache_key)
+
+    response = not_modified(etag)
+    if response is not None:
+        return response
+
+    cached = event_feed_cache.get(cache_key, version)
+    if cached is not None:
+        response = Response(cached, status=200, mimetype='application/json', headers={'X-Cache': 'HIT'})
+        return set_cache_headers(response, etag)
+
+    # Search mode ranks full-text matches with bm25
+    search_query = build_match_query(search)
+    if search and not search_query:
+        return jsonify({"success": True, "events": [], "next_cursor": None}), 200
+
+    if search_query:
+        sort_by, order, sort_expr = 'relevance', 'asc', 's.rank'
+    else:
+        sort_expr = SORT_COLUMNS[sort_by]
+
+    # Resolve the keyset position
+    after = None
+    if cursor_param:
+        try:
+            after = decode_cursor(cursor_param, sort_by, order)
+        except ValueError as e:
+            return jsonify({"success": False, "message": str(e)}), 400
+
+    query = ""
+    params = []
+
+    if search_query:
+        # Materialized so bm25() is evaluated against EventSearch itself
+        query += """
+        WITH s AS MATERIALIZED (
+            SELECT rowid AS event_id, {} AS rank
+            FROM EventSearch
+            WHERE EventSearch MATCH ?
+        )
+        """.format(bm25_expression())
+        params.append(search_query)
 
     # Base query
-    query = """
-        SELECT e.event_id, e.title, e.description, e.event_date, e.start_time, e.end_time,
-               e.location, e.address, e.quantity, GROUP_CONCAT(ft.food_type_name) AS dietary_needs
-        FROM Event e
-        LEFT JOIN EventFoodTypes eft ON e.event_id = eft.event_id
-        LEFT JOIN FoodTypes ft ON eft.food_type_id = ft.food_type_id
-        WHERE 1=1
-    """
-    params = []
+    query += """
+        SELECT {}, {} AS sort_key
+        FROM EventSummary e
+    """.format(SUMMARY_COLUMNS, sort_expr)
+
+    if search_query:
+        query += " JOIN s ON s.event_id = e.event_id"
+
+    query += " WHERE 1=1"
 
     # Add filtering conditions
-    if keyword:
-        query += " AND (e.title LIKE ? OR e.description LIKE ?)"
-        params.extend([f"%{keyword}%", f"%{keyword}%"])
+    keyword_query = build_match_query(keyword)
+    if keyword_query:
+        query += " AND e.event_id IN (SELECT rowid FROM EventSearch WHERE EventSearch MATCH ?)"
+        params.append(keyword_query)
 
     if dietary_needs:
-        query += " AND e.event_id IN ("
-        query += """
-            SELECT DISTINCT eft.event_id
-            FROM EventFoodTypes eft
-            JOIN FoodTypes ft ON eft.food_type_id = ft.food_type_id
-            WHERE ft.food_type_name IN ({})
-        """.format(",".join("?" for _ in dietary_needs))
-        query += ")"
-        params.extend(dietary_needs)
+        condition, condition_params = dietary_condition(dietary_needs, dietary_match)
+        query += " AND " + condition
+        params.extend(condition_params)
 
     if date:
         query += " AND e.event_date = ?"
@@ -181,38 +259,90 @@ def get_events():
         query += " AND e.end_time <= ?"
         params.append(end_time)
 
+    if after:
+        query += " AND " + keyset_condition(sort_expr, order)
+        params.extend(after)
+
     # Add sorting
-    query += f" GROUP BY e.event_id ORDER BY {sort_by} {order}"
+    query += " " + order_clause(sort_expr, order)
 
-    # Add pagination
-    offset = (page - 1) * per_page
-    query += " LIMIT ? OFFSET ?"
-    params.extend([per_page, offset])
+    # Add pagination, fetching one extra row to detect the next page
+    query += " LIMIT ?"
+    params.append(per_page + 1)
+    if not after:
+        query += " OFFSET ?"
+        params.append((page - 1) * per_page)
 
     try:
         with get_db_connection() as conn:
             cursor = conn.cursor()
             cursor.execute(query, params)
-            events = cursor.fetchall()
+            events, next_cursor = next_page_cursor(cursor.fetchall(), per_page, sort_by, order)
 
             # Format the results
+            formatted_events = [format_event_summary(row) for row in events]
+
+        response = jsonify({"success": True, "events": formatted_events, "next_cursor": next_cursor})
+        event_feed_cache.set(cache_key, version, response.get_data())
+        response.headers['X-Cache'] = 'MISS'
+        return set_cache_headers(response, etag), 200
+
+    except sqlite3.Error as e:
+        return jsonify({"success": False, "message": "Failed to retrieve events.", "details": str(e)}), 500
+
+# RETRIEVE the highest rated events
+@event_bp.route('/api/events/top_rated', methods=['GET'])
+def get_top_rated_events():
+    """
+    get_top_rated_events() retrieves events by average rating, highest first, with their rating
+    histograms. Ratings are read from the aggregates the Review triggers keep on EventSummary,
+    in the order of the top-rated index, so no aggregate query is run.
+
+    Parameters:
+        limit (int): The number of events to return (default 10, max 100).
+        min_reviews (int): Only include events with at least this many ratings (default 1).
+    """
+    try:
+        limit = min(max(int(request.args.get('limit', 10)), 1), MAX_PER_PAGE)
+        min_reviews = max(int(request.args.get('min_reviews', 1)), 1)
+    except ValueError:
+        return jsonify({"success": False, "message": "limit and min_reviews must be integers."}), 400
+
+    version = event_version.value
+    cache_key = ('top_rated', limit, min_reviews)
+    etag = feed_etag(version, cache_key)
+
+    response = not_modified(etag)
+    if response is not None:
+        return response
+
+    cached = event_feed_cache.get(cache_key, version)
+    if cached is not None:
+        response = Response(cached, status=200, mimetype='application/json', headers={'X-Cache': 'HIT'})
+        return set_cache_headers(response, etag)
+
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                """
+                SELECT {}, {}
+                FROM EventSummary e
+                WHERE e.rating_count > 0 AND e.rating_count >= ?
+                ORDER BY e.rating_sum * 1.0 / e.rating_count DESC, e.rating_count DESC, e.event_id
+                LIMIT ?
+                """.format(SUMMARY_COLUMNS, RATING_COLUMNS),
+                (min_reviews, limit)
+            )
             formatted_events = [
-                {
-                    "event_id": row["event_id"],
-                    "title": row["title"],
-                    "description": row["description"],
-                    "event_date": row["event_date"],
-                    "start_time": row["start_time"],
-                    "end_time": row["end_time"],
-                    "location": row["location"],
-                    "address": row["address"],
-                    "quantity": row["quantity"],
-                    "dietary_needs": row["dietary_needs"].split(",") if row["dietary_needs"] else []
-                }
-                for row in events
+                dict(format_event_summary(row), rating_histogram=format_rating_histogram(row))
+                for row in cursor.fetchall()
             ]
 
-        return jsonify({"success": True, "events": formatted_events}), 200
+        response = jsonify({"success": True, "events": formatted_events})
+        event_feed_cache.set(cache_key, version, response.get_data())
+        response.headers['X-Cache'] = 'MISS'
+        return set_cache_headers(response, etag), 200
 
     except sqlite3.Error as e:
         return jsonify({"success": False, "message": "Failed to retrieve events.", "details": str(e)}), 500
@@ -228,22 +358,118 @@ def get_event(event_id):
         "event_id": Integer
     }
 
+    The ETag is built from the event's version stamp, which is checked before the event is
+    loaded, so an unchanged event is answered with 304 Not Modified.
+
     Returns:
         Flask.Response: A JSON response containing the specified event or an error message.
     """
     try:
         with get_db_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("SELECT * FROM Event WHERE event_id = ?", (event_id,))
+            cursor.execute("SELECT version FROM Event WHERE event_id = ?", (event_id,))
+            row = cursor.fetchone()
+
+            if row is None:
+                return jsonify({'error': 'Event not found'}), 404
+
+            etag = event_etag(event_id, row["version"])
+            response = not_modified(etag)
+            if response is not None:
+                return response
+
+            cursor.execute(
+                "SELECT {}, version FROM Event WHERE event_id = ?".format(EVENT_COLUMNS),
+                (event_id,)
+            )
             event = cursor.fetchone()
 
-            if cursor is None:
+            if event is None:
                 return jsonify({'error': 'Event not found'}), 404
-        
-            return jsonify(dict(event))
+
+            # Re-derive the ETag in case the event changed between the two reads
+            etag = event_etag(event_id, event["version"])
+            event = dict(event)
+            del event["version"]
+            return set_cache_headers(jsonify(event), etag)
     except Exception as e:
         return jsonify({'error': 'An error occurred', 'details': str(e)}), 500
     
+# RETRIEVE several events by ID
+@event_bp.route('/api/events', methods=['GET'])
+def get_events_batch():
+    """
+    get_events_batch() retrieves several events, with their food types, in a single query.
+
+    Paramaters:
+        ids (str): Comma-separated event IDs (e.g., ?ids=1,2,3).
+
+    Returns:
+        Flask.Response: JSON with the events in request order and the IDs that were not found.
+    """
+    raw_ids = request.args.get('ids', '')
+
+    try:
+        event_ids = [int(event_id) for event_id in raw_ids.split(',') if event_id.strip()]
+    except ValueError:
+        return jsonify({'success': False, 'message': 'ids must be a comma-separated list of integers.'}), 400
+
+    return _events_by_ids(event_ids)
+
+@event_bp.route('/api/events/batch', methods=['POST'])
+def post_events_batch():
+    """
+    post_events_batch() is the POST variant of get_events_batch() for lists too long for a URL.
+
+    Expected JSON Payload:
+    {
+        "ids": list of integers
+    }
+    """
+    data = request.get_json(silent=True) or {}
+    event_ids = data.get('ids')
+
+    if not isinstance(event_ids, list) or not all(isinstance(event_id, int) for event_id in event_ids):
+        return jsonify({'success': False, 'message': 'ids must be a list of integers.'}), 400
+
+    return _events_by_ids(event_ids)
+
+def _events_by_ids(event_ids):
+    """
+    _events_by_ids(event_ids) fetches the requested events from EventSummary with one IN query.
+    Duplicate IDs are returned once.
+    """
+    # Deduplicate while keeping the request order
+    event_ids = list(dict.fromkeys(event_ids))
+
+    if not event_ids:
+        return jsonify({'success': False, 'message': 'At least one event ID is required.'}), 400
+
+    max_ids = current_app.config.get('EVENT_BATCH_MAX_IDS', 100)
+    if len(event_ids) > max_ids:
+        return jsonify({'success': False, 'message': f'At most {max_ids} event IDs can be requested at once.'}), 400
+
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                """
+                SELECT {}
+                FROM EventSummary e
+                WHERE e.event_id IN ({})
+                """.format(SUMMARY_COLUMNS, ",".join("?" for _ in event_ids)),
+                event_ids
+            )
+            found = {row["event_id"]: format_event_summary(row) for row in cursor.fetchall()}
+
+        events = [found[event_id] for event_id in event_ids if event_id in found]
+        missing_ids = [event_id for event_id in event_ids if event_id not in found]
+
+        return jsonify({'success': True, 'events': events, 'missing_ids': missing_ids}), 200
+
+    except sqlite3.Error as e:
+        return jsonify({'success': False, 'message': 'Failed to retrieve events.', 'details': str(e)}), 500
+    
 # UPDATE event
 @event_bp.route('/api/events/<int:event_id>', methods=['PUT'])
 def update_event(event_id):
@@ -304,8 +530,9 @@ def update_event(event_id):
 
             if cursor.rowcount == 0:
                 return jsonify({'error': 'Event not found'}), 404
-            
-            return jsonify({'message': 'Event updated successfully'}), 200
+
+        event_version.bump()
+        return jsonify({'message': 'Event updated successfully'}), 200
     except sqlite3.Error as e:
         return jsonify({'error':'Database error occurred', 'details': str(e)}), 500
         
@@ -321,7 +548,9 @@ def del_event(event_id):
             cursor.execute('DELETE FROM Event WHERE event_id = ?', (event_id,))
             if cursor.rowcount == 0:
                 return jsonify({'error': 'Event not found'}), 404
-            return jsonify({'message': 'Event deleted successfully'}), 200
+
+        event_version.bump()
+        return jsonify({'message': 'Event deleted successfully'}), 200
     except sqlite3.Error as e:
         return jsonify({'error': 'Database error occurred', 'details': str(e)}), 500
     
@@ -330,50 +559,36 @@ def del_event(event_id):
 def get_user_events():
     """
     Retrieve all events created by the currently logged-in user.
+
+    With ?stream=1 or Accept: application/x-ndjson, events are streamed one JSON object per line.
     """
     # Extract token from cookie
     token = request.cookies.get('token')
     if not token:
         return jsonify({'success': False, 'message': 'Authorization token is missing.'}), 401
 
-    # Validate token and extract user ID
-    user_id = validate_token(token)
+    # The user ID was validated by the auth layer
+    user_id = g.user_id
     if not user_id:
         return jsonify({'success': False, 'message': 'Invalid or expired token.'}), 401
 
+    query = """
+        SELECT {}
+        FROM EventSummary e
+        WHERE e.user_id = ?
+    """.format(SUMMARY_COLUMNS)
+
     try:
+        if ndjson_requested():
+            return stream_query(query, (user_id,), format_event_summary)
+
         with get_db_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute(
-                """
-                SELECT e.event_id, e.title, e.description, e.event_date, e.start_time, e.end_time,
-                       e.location, e.address, e.quantity, GROUP_CONCAT(ft.food_type_name) AS dietary_needs
-                FROM Event e
-                LEFT JOIN EventFoodTypes eft ON e.event_id = eft.event_id
-                LEFT JOIN FoodTypes ft ON eft.food_type_id = ft.food_type_id
-                WHERE e.user_id = ?
-                GROUP BY e.event_id
-                """,
-                (user_id,)
-            )
+            cursor.execute(query, (user_id,))
             events = cursor.fetchall()
 
             # Format the results
-            formatted_events = [
-                {
-                    "event_id": row["event_id"],
-                    "title": row["title"],
-                    "description": row["description"],
-                    "event_date": row["event_date"],
-                    "start_time": row["start_time"],
-                    "end_time": row["end_time"],
-                    "location": row["location"],
-                    "address": row["address"],
-                    "quantity": row["quantity"],
-                    "dietary_needs": row["dietary_needs"].split(",") if row["dietary_needs"] else []
-                }
-                for row in events
-            ]
+            formatted_events = [format_event_summary(row) for row in events]
 
         return jsonify({"success": True, "events": formatted_events}), 200
 
@@ -1,6 +1,13 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, g
 from app.data.database import get_db_connection
-from app.auth import validate_token
+from app.cache import event_version
+from app.data.search import build_match_query
+from app.data.food_types import dietary_condition
+from app.data.write_queue import execute_write
+from app.data.event_summary import SUMMARY_COLUMNS, format_event_summary
+from app.data.pagination import (
+    SORT_COLUMNS, parse_page_args, decode_cursor, keyset_condition, order_clause, next_page_cursor
+)
 import sqlite3
 
 fav_bp = Blueprint('fav_bp', __name__)
@@ -17,8 +24,8 @@ def favorite_event():
     if not token:
         return jsonify({'success': False, 'message': 'Authorization token is missing or invalid.'}), 401
 
-    # Validate the token and extract the user ID
-    user_id = validate_token(token)
+    # The user ID was validated by the auth layer
+    user_id = g.user_id
 
     # Parse request data to get event_id
     data = request.get_json()
@@ -29,48 +36,40 @@ def favorite_event():
     event_id = data['event_id']
 
     try:
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
+        added = execute_write(_insert_favorite, user_id, event_id)
 
-            # Check if the event exists
-            cursor.execute(
-                """
-                SELECT event_id FROM Event WHERE event_id = ?
-                """,
-                (event_id,)
-            )
-            event = cursor.fetchone()
-
-            if not event:
-                return jsonify({'success': False, 'message': 'Event does not exist.'}), 404
-
-            # Check if the favorite already exists
-            cursor.execute(
-                """
-                SELECT * FROM Favorite WHERE user_id = ? AND event_id = ?
-                """,
-                (user_id, event_id)
-            )
-            existing_favorite = cursor.fetchone()
-
-            if existing_favorite:
-                return jsonify({'success': False, 'message': 'Event is already in favorites.'}), 400
-
-            # Insert the favorite record
-            cursor.execute(
-                """
-                INSERT INTO Favorite (user_id, event_id)
-                VALUES (?, ?)
-                """,
-                (user_id, event_id)
-            )
-            conn.commit()
+        if not added:
+            return jsonify({'success': False, 'message': 'Event is already in favorites.'}), 400
 
+        # The feed reports favorite counts
+        event_version.bump()
         return jsonify({'success': True, 'message': 'Event added to favorites.'}), 201
 
+    except sqlite3.IntegrityError as e:
+        if "FOREIGN KEY" in str(e):
+            return jsonify({'success': False, 'message': 'Event does not exist.'}), 404
+        return jsonify({'success': False, 'message': 'Failed to add favorite.', 'details': str(e)}), 500
     except sqlite3.Error as e:
         return jsonify({'success': False, 'message': 'Failed to add favorite.', 'details': str(e)}), 500
 
+def _insert_favorite(conn, user_id, event_id):
+    """
+    _insert_favorite() is the write queue op for favorite_event(). One statement: the foreign key
+    checks the event exists, the primary key catches duplicates.
+
+    Returns:
+        bool: False if the event was already a favorite.
+    """
+    cursor = conn.execute(
+        """
+        INSERT INTO Favorite (user_id, event_id)
+        VALUES (?, ?)
+        ON CONFLICT (user_id, event_id) DO NOTHING
+        """,
+        (user_id, event_id)
+    )
+    return cursor.rowcount > 0
+
 # RETRIEVE all favorite events for specified user
 @fav_bp.route('/favorites', methods=["GET"])
 def user_favorites():
@@ -79,16 +78,21 @@ def user_favorites():
 
     Parameters:
         Pagination
+        cursor (str): Opaque position returned as next_cursor by the previous page. Takes
+            precedence over page.
         page (int): The page number (default 1).
-        per_page (int): The number of events per page (default 10).
+        per_page (int): The number of events per page (default 10, max 100).
 
         Sorting
-        sort_by (str): The column to sort by (e.g., 'event_date', 'start_time').
+        sort_by (str): The column to sort by ('event_date', 'start_time', 'end_time', 'title',
+            'location' or 'quantity').
         order (str): The sort order ('asc' or 'desc', default 'asc').
 
         Filtering
-        keyword (str): A keyword to search for in the title or description.
+        keyword (str): Keywords to search for in the title, description or location.
         dietary_needs (list): List of dietary needs to filter by (e.g., ['Vegan', 'Gluten-Free']).
+        dietary_match (str): 'any' (default) to match events offering any of the dietary needs,
+            'all' to match events offering all of them.
         date (str): Filter by a specific date (format: YYYY-MM-DD).
         start_time (str): Filter by events starting after this time (format: HH:MM:SS).
         end_time (str): Filter by events ending before this time (format: HH:MM:SS).
@@ -100,51 +104,48 @@ def user_favorites():
     if not token:
         return jsonify({"success": False, "message": "Authorization token is missing or invalid."}), 401
 
-    # Validate the token and extract the user ID
-    user_id = validate_token(token)
+    # The user ID was validated by the auth layer
+    user_id = g.user_id
 
     # Extract query parameters
-    page = int(request.args.get("page", 1))
-    per_page = int(request.args.get("per_page", 10))
-    sort_by = request.args.get("sort_by", "event_date")
-    order = request.args.get("order", "asc").lower()
+    page, per_page, sort_by, order = parse_page_args(request.args)
+    cursor_param = request.args.get("cursor")
     keyword = request.args.get("keyword", "").strip()
     dietary_needs = request.args.getlist("dietary_needs")
+    dietary_match = request.args.get("dietary_match", "any").lower()
     date = request.args.get("date")
     start_time = request.args.get("start_time")
     end_time = request.args.get("end_time")
 
-    # Validate sorting order
-    if order not in ["asc", "desc"]:
-        order = "asc"
+    sort_expr = SORT_COLUMNS[sort_by]
+
+    # Resolve the keyset position
+    after = None
+    if cursor_param:
+        try:
+            after = decode_cursor(cursor_param, sort_by, order)
+        except ValueError as e:
+            return jsonify({"success": False, "message": str(e)}), 400
 
     # Base query for favorited events
     query = """
-        SELECT e.event_id, e.title, e.description, e.event_date, e.start_time, e.end_time,
-               e.location, e.address, e.quantity, GROUP_CONCAT(ft.food_type_name) AS dietary_needs
+        SELECT {}, {} AS sort_key
         FROM Favorite f
-        JOIN Event e ON f.event_id = e.event_id
-        LEFT JOIN EventFoodTypes eft ON e.event_id = eft.event_id
-        LEFT JOIN FoodTypes ft ON eft.food_type_id = ft.food_type_id
+        JOIN EventSummary e ON f.event_id = e.event_id
         WHERE f.user_id = ?
-    """
+    """.format(SUMMARY_COLUMNS, sort_expr)
     params = [user_id]
 
     # Add filtering conditions
-    if keyword:
-        query += " AND (e.title LIKE ? OR e.description LIKE ?)"
-        params.extend([f"%{keyword}%", f"%{keyword}%"])
+    keyword_query = build_match_query(keyword)
+    if keyword_query:
+        query += " AND e.event_id IN (SELECT rowid FROM EventSearch WHERE EventSearch MATCH ?)"
+        params.append(keyword_query)
 
     if dietary_needs:
-        query += " AND e.event_id IN ("
-        query += """
-            SELECT DISTINCT eft.event_id
-            FROM EventFoodTypes eft
-            JOIN FoodTypes ft ON eft.food_type_id = ft.food_type_id
-            WHERE ft.food_type_name IN ({})
-        """.format(",".join("?" for _ in dietary_needs))
-        query += ")"
-        params.extend(dietary_needs)
+        condition, condition_params = dietary_condition(dietary_needs, dietary_match)
+        query += " AND " + condition
+        params.extend(condition_params)
 
     if date:
         query += " AND e.event_date = ?"
@@ -158,38 +159,30 @@ def user_favorites():
         query += " AND e.end_time <= ?"
         params.append(end_time)
 
+    if after:
+        query += " AND " + keyset_condition(sort_expr, order)
+        params.extend(after)
+
     # Add sorting
-    query += f" GROUP BY e.event_id ORDER BY {sort_by} {order}"
+    query += " " + order_clause(sort_expr, order)
 
-    # Add pagination
-    offset = (page - 1) * per_page
-    query += " LIMIT ? OFFSET ?"
-    params.extend([per_page, offset])
+    # Add pagination, fetching one extra row to detect the next page
+    query += " LIMIT ?"
+    params.append(per_page + 1)
+    if not after:
+        query += " OFFSET ?"
+        params.append((page - 1) * per_page)
 
     try:
         with get_db_connection() as conn:
             cursor = conn.cursor()
             cursor.execute(query, params)
-            events = cursor.fetchall()
+            events, next_cursor = next_page_cursor(cursor.fetchall(), per_page, sort_by, order)
 
             # Format the results
-            formatted_events = [
-                {
-                    "event_id": row["event_id"],
-                    "title": row["title"],
-                    "description": row["description"],
-                    "event_date": row["event_date"],
-                    "start_time": row["start_time"],
-                    "end_time": row["end_time"],
-                    "location": row["location"],
-                    "address": row["address"],
-                    "quantity": row["quantity"],
-                    "dietary_needs": row["dietary_needs"].split(",") if row["dietary_needs"] else [],
-                }
-                for row in events
-            ]
-
-        return jsonify({"success": True, "events": formatted_events}), 200
+            formatted_events = [format_event_summary(row) for row in events]
+
+        return jsonify({"success": True, "events": formatted_events, "next_cursor": next_cursor}), 200
 
     except sqlite3.Error as e:
         return jsonify({"success": False, "message": "Failed to retrieve favorited events.", "details": str(e)}), 500
@@ -0,0 +1,96 @@
+from flask import Blueprint, current_app, request, jsonify, g
+from app.data.database import get_db_connection
+from app.data.event_summary import SUMMARY_COLUMNS, format_event_summary
+from app.data.feed_matrix import event_matrix, tokenize
+import sqlite3
+
+feed_bp = Blueprint('feed_bp', __name__)
+
+@feed_bp.route('/api/feed', methods=['GET'])
+def get_feed():
+    """
+    get_feed() returns the upcoming events best suited to the logged-in user.
+
+    Every upcoming event that is not sold out is scored in one vectorized pass by how many of
+    the user's dietary preferences it serves, how soon it starts, how much food is left and
+    how well it matches the user's interests. Events serving none of the user's dietary
+    preferences are left out.
+
+    Paramaters:
+        limit (int): The number of events to return (default 20, max 100).
+
+    Returns:
+        Flask.Response: JSON with the events, best first, each with its score.
+    """
+    # Extract token from cookie
+    token = request.cookies.get('token')
+
+    if not token:
+        return jsonify({'success': False, 'message': 'Authorization token is missing or invalid.'}), 401
+
+    # The user ID was validated by the auth layer
+    user_id = g.user_id
+
+    if not user_id:
+        return jsonify({'success': False, 'message': 'Invalid or expired JWT token.'}), 401
+
+    try:
+        limit = min(max(1, int(request.args.get('limit', 20))), 100)
+    except ValueError:
+        limit = 20
+
+    config = current_app.config
+
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+
+            # The user's diet as a food type bitmask, and their interests
+            cursor.execute(
+                """
+                SELECT u.interests,
+                       (SELECT COALESCE(SUM(1 << (uft.food_type_id - 1)), 0)
+                        FROM UserFoodTypes uft WHERE uft.user_id = u.user_id) AS diet_mask
+                FROM User u
+                WHERE u.user_id = ?
+                """,
+                (user_id,)
+            )
+            user = cursor.fetchone()
+
+            if not user:
+                return jsonify({'success': False, 'message': 'User not found.'}), 404
+
+            event_matrix.refresh(conn, config.get('FEED_REFRESH_INTERVAL', 5.0))
+            ranked = event_matrix.score(
+                user["diet_mask"],
+                tokenize(user["interests"]),
+                limit,
+                config.get('FEED_WEIGHTS', {}),
+                config.get('FEED_TIME_SCALE_HOURS', 48.0),
+                config.get('FEED_QUANTITY_SCALE', 20.0),
+            )
+
+            if not ranked:
+                return jsonify({'success': True, 'events': []}), 200
+
+            event_ids = [event_id for event_id, _ in ranked]
+            cursor.execute(
+                """
+                SELECT {}
+                FROM EventSummary e
+                WHERE e.event_id IN ({})
+                """.format(SUMMARY_COLUMNS, ",".join("?" for _ in event_ids)),
+                event_ids
+            )
+            found = {row["event_id"]: format_event_summary(row) for row in cursor.fetchall()}
+
+        events = [
+            dict(found[event_id], score=round(score, 4))
+            for event_id, score in ranked if event_id in found
+        ]
+
+        return jsonify({'success': True, 'events': events}), 200
+
+    except sqlite3.Error as e:
+        return jsonify({'success': False, 'message': 'Failed to build feed.', 'details': str(e)}), 500
@@ -0,0 +1,12 @@
+from flask import Blueprint, Response
+from app.metrics import registry
+
+metrics_bp = Blueprint('metrics_bp', __name__)
+
+@metrics_bp.route('/metrics', methods=['GET'])
+def metrics():
+    """
+    metrics() returns this process's request, SQL, pool and cache metrics in the Prometheus
+    text exposition format.
+    """
+    return Response(registry.render(), mimetype='text/plain; version=0.0.4')
@@ -1,5 +1,7 @@
 from flask import Blueprint, request, jsonify
-from app.data.database import get_db_connection
+from app.data.rsvps import EventNotFoundError
+from app.data.write_queue import execute_write
+from app.cache import event_version
 import sqlite3
 
 review_bp = Blueprint('review_bp', __name__)
@@ -19,18 +21,33 @@ def give_feedback():
         return jsonify({'error': 'Missing required fields: user_id, event_id, or rating'}), 400
 
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute(
-            """
-            INSERT INTO Review (user_id, event_id, rating, comment)
-            VALUES (?, ?, ?, ?)
-            """,
-            (user_id, event_id, rating, comment)
-        )
-        conn.commit()
-        conn.close()
+        execute_write(_insert_review, user_id, event_id, rating, comment)
+
+        # Listings report rating aggregates
+        event_version.bump()
 
         return jsonify({'message': 'Feedback submitted'}), 201
+    except EventNotFoundError:
+        return jsonify({'error': 'Event not found'}), 404
+    except sqlite3.IntegrityError as e:
+        # Unknown user or a rating outside 1-5
+        return jsonify({'error': 'Invalid feedback', 'details': str(e)}), 400
     except sqlite3.Error as e:
         return jsonify({'error': 'Failed to submit feedback', 'details': str(e)}), 500
+
+
+def _insert_review(conn, user_id, event_id, rating, comment):
+    """
+    _insert_review() is the write queue op for give_feedback(). The Review triggers update the
+    event's rating aggregates in the same transaction.
+    """
+    if conn.execute("SELECT 1 FROM Event WHERE event_id = ?", (event_id,)).fetchone() is None:
+        raise EventNotFoundError(event_id)
+
+    conn.execute(
+        """
+        INSERT INTO Review (user_id, event_id, rating, comments)
+        VALUES (?, ?, ?, ?)
+        """,
+        (user_id, event_id, rating, comment)
+    )
@@ -1,6 +1,10 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, g
 from app.data.database import get_db_connection
-from app.auth.token_utils import validate_token
+from app.cache import event_version
+from app.data.rsvps import check_rsvp, save_rsvp, EventNotFoundError, SoldOutError
+from app.data.write_queue import execute_write
+from app.data.event_summary import SUMMARY_COLUMNS, format_event_summary
+from app.data.streaming import ndjson_requested, stream_query
 import sqlite3
 
 rsvp_bp = Blueprint('rsvp_bp', __name__)
@@ -9,7 +13,10 @@ rsvp_bp = Blueprint('rsvp_bp', __name__)
 @rsvp_bp.route('/api/rsvp', methods=['POST'])
 def rsvp_event():
     """
-    Submits an RSVP for a user to an event.
+    Submits an RSVP for a user to an event, or changes the status of their existing RSVP.
+
+    'Going' reserves one portion of the event's quantity and fails with 409 once the event is
+    sold out; changing a 'Going' RSVP to another status gives the portion back.
     """
     # Extract token from cookie
     token = request.cookies.get('token')
@@ -17,8 +24,8 @@ def rsvp_event():
     if not token:
         return jsonify({'success': False, 'message': 'Authorization token is missing or invalid.'}), 401
 
-    # Validate the token and extract the user ID
-    user_id = validate_token(token)
+    # The user ID was validated by the auth layer
+    user_id = g.user_id
 
     if not user_id:
         return jsonify({'success': False, 'message': 'Invalid or expired JWT token.'}), 401
@@ -32,37 +39,25 @@ def rsvp_event():
         return jsonify({'success': False, 'message': 'Event ID and RSVP status is required.'}), 400
 
     try:
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            
-
-            # Check if the event exists
-            cursor.execute("SELECT event_id FROM Event WHERE event_id = ?", (event_id,))
-            event = cursor.fetchone()
-            if not event:
-                return jsonify({'success': False, 'message': 'Event not found.'}), 404
-
-            # Check for duplicate RSVP
-            cursor.execute(
-                "SELECT * FROM RSVP WHERE user_id = ? AND event_id = ?", 
-                (user_id, event_id)
-            )
-            existing_rsvp = cursor.fetchone()
-            if existing_rsvp:
-                return jsonify({'success': False, 'message': 'You have already RSVPed for this event.'}), 400
-
-            # Insert new RSVP
-            cursor.execute(
-                """
-                INSERT INTO RSVP (user_id, event_id, status)
-                VALUES (?, ?, ?)
-                """,
-                (user_id, event_id, rsvp_status)
-            )
-            conn.commit()
+        # Sold-out and repeated RSVPs are answered without queueing a write
+        changed = check_rsvp(get_db_connection(), user_id, event_id, rsvp_status)
+        if changed:
+            changed = execute_write(save_rsvp, user_id, event_id, rsvp_status)
 
+        if not changed:
+            return jsonify({'success': True, 'message': 'RSVP unchanged.'}), 200
+
+        event_version.bump()
         return jsonify({'success': True, 'message': 'RSVP successful'}), 201
-    
+
+    except EventNotFoundError:
+        return jsonify({'success': False, 'message': 'Event not found.'}), 404
+    except SoldOutError:
+        return jsonify({'success': False, 'message': 'This event is sold out.'}), 409
+    except sqlite3.IntegrityError as e:
+        if "FOREIGN KEY" in str(e):
+            return jsonify({'success': False, 'message': 'Event not found.'}), 404
+        return jsonify({'success': False, 'message': 'Invalid RSVP status.', 'details': str(e)}), 400
     except sqlite3.Error as e:
         return jsonify({'success': False, 'message': 'Failed to RSVP', 'details': str(e)}), 500
     
@@ -70,6 +65,8 @@ def rsvp_event():
 def get_user_rsvps():
     """
     Retrieves all events a user has RSVP'd to, including their RSVP status.
+
+    With ?stream=1 or Accept: application/x-ndjson, events are streamed one JSON object per line.
     """
     # Extract token from cookie
     token = request.cookies.get('token')
@@ -77,21 +74,23 @@ def get_user_rsvps():
     if not token:
         return jsonify({'success': False, 'message': 'Authorization token is missing or invalid.'}), 401
 
-    # Validate the token and extract the user ID
-    user_id = validate_token(token)
+    # The user ID was validated by the auth layer
+    user_id = g.user_id
+
+    # Query to retrieve events RSVP'd by the user
+    query = """
+        SELECT {}, r.status
+        FROM RSVP r
+        JOIN EventSummary e ON r.event_id = e.event_id
+        WHERE r.user_id = ?
+    """.format(SUMMARY_COLUMNS)
 
     try:
+        if ndjson_requested():
+            return stream_query(query, (user_id,), _format_rsvp_event)
+
         with get_db_connection() as conn:
             cursor = conn.cursor()
-
-            # Query to retrieve events RSVP'd by the user
-            query = """
-                SELECT e.event_id, e.title, e.description, e.event_date, e.start_time, e.end_time,
-                       e.location, e.address, e.quantity, r.status
-                FROM RSVP r
-                JOIN Event e ON r.event_id = e.event_id
-                WHERE r.user_id = ?
-            """
             cursor.execute(query, (user_id,))
             rsvps = cursor.fetchall()
 
@@ -99,21 +98,7 @@ def get_user_rsvps():
                 return jsonify({'success': False, 'message': 'No RSVP events found for this user.'}), 404
 
             # Format the results
-            formatted_rsvps = [
-                {
-                    "event_id": row["event_id"],
-                    "title": row["title"],
-                    "description": row["description"],
-                    "event_date": row["event_date"],
-                    "start_time": row["start_time"],
-                    "end_time": row["end_time"],
-                    "location": row["location"],
-                    "address": row["address"],
-                    "quantity": row["quantity"],
-                    "status": row["status"]
-                }
-                for row in rsvps
-            ]
+            formatted_rsvps = [_format_rsvp_event(row) for row in rsvps]
 
         return jsonify({"success": True, "events": formatted_rsvps}), 200
 
@@ -127,18 +112,23 @@ def get_event_rsvps(event_id):
 
         Parameters:
         event_id (int): The ID of the event.
+
+    With ?stream=1 or Accept: application/x-ndjson, users are streamed one JSON object per line.
     """
+    # Query to retrieve users who RSVP'd for the event
+    query = """
+        SELECT u.user_id, u.name, u.email, u.bio, u.interests, u.language, r.status
+        FROM RSVP r
+        JOIN User u ON r.user_id = u.user_id
+        WHERE r.event_id = ?
+    """
+
     try:
+        if ndjson_requested():
+            return stream_query(query, (event_id,), _format_rsvp_user)
+
         with get_db_connection() as conn:
             cursor = conn.cursor()
-
-            # Query to retrieve users who RSVP'd for the event
-            query = """
-                SELECT u.user_id, u.name, u.email, u.bio, u.interests, u.language, r.status
-                FROM RSVP r
-                JOIN User u ON r.user_id = u.user_id
-                WHERE r.event_id = ?
-            """
             cursor.execute(query, (event_id,))
             rsvps = cursor.fetchall()
 
@@ -146,20 +136,29 @@ def get_event_rsvps(event_id):
                 return jsonify({'success': False, 'message': 'No RSVPs found for this event.'}), 404
 
             # Format the results
-            formatted_rsvps = [
-                {
-                    "user_id": row["user_id"],
-                    "name": row["name"],
-                    "email": row["email"],
-                    "bio": row["bio"],
-                    "interests": row["interests"],
-                    "language": row["language"],
-                    "status": row["status"]
-                }
-                for row in rsvps
-            ]
+            formatted_rsvps = [_format_rsvp_user(row) for row in rsvps]
 
         return jsonify({"success": True, "users": formatted_rsvps}), 200
 
     except sqlite3.Error as e:
         return jsonify({'success': False, 'message': 'Failed to retrieve RSVPs.', 'details': str(e)}), 500
+
+def _format_rsvp_event(row):
+    """
+    _format_rsvp_event(row) formats an EventSummary row joined with the user's RSVP status.
+    """
+    return dict(format_event_summary(row), status=row["status"])
+
+def _format_rsvp_user(row):
+    """
+    _format_rsvp_user(row) formats a User row joined with their RSVP status.
+    """
+    return {
+        "user_id": row["user_id"],
+        "name": row["name"],
+        "email": row["email"],
+        "bio": row["bio"],
+        "interests": row["interests"],
+        "language": row["language"],
+        "status": row["status"]
+    }
@@ -1,10 +1,23 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, g
 from app.data.database import get_db_connection
-from app.auth import validate_token
+from app.data.streaming import ndjson_requested, stream_query
+from app.data.pagination import parse_page_args, encode_cursor, decode_cursor
+from app.cache import profile_cache, profile_version
+from app.data.food_types import get_food_types, resolve_food_type_ids, UnknownFoodTypeError
 import sqlite3
+import string
+import logging
 
 user_bp = Blueprint('user_bp', __name__)
 
+# Columns returned by /api/users; password_hash is deliberately left out
+USER_COLUMNS = "u.user_id, u.email, u.bu_id, u.name, u.bio, u.interests, u.language"
+
+# NOCASE compares strings with ASCII letters folded to lowercase, and nothing else folded
+_NOCASE_FOLD = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+logger = logging.getLogger(__name__)
+
 @user_bp.route('/auth/profile_status', methods=['GET'])
 def profile_status():
     """
@@ -16,35 +29,27 @@ def profile_status():
     if not token:
         return jsonify({'success': False, 'message': 'Authorization token is missing or invalid.'}), 401
 
-    # Validate the token and extract the user ID
-    user_id = validate_token(token)
+    # The user ID was validated by the auth layer
+    user_id = g.user_id
 
     if not user_id:
         return jsonify({'success': False, 'message': 'Invalid token'}), 401
 
     try:
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-
-            # Check User table fields
-            cursor.execute("SELECT language FROM User WHERE user_id = ?", (user_id,))
-            user = cursor.fetchone()
-
-            if not user:
-                return jsonify({'profile_complete': False, 'message': 'User not found'}), 200
+        # Answered from the cached profile; SQLite is only read on a miss
+        profile = _get_profile(user_id)
 
-            if not user['language']:
-                return jsonify({'profile_complete': False, 'message': 'Missing language field'}), 200
+        if profile is None:
+            return jsonify({'profile_complete': False, 'message': 'User not found'}), 200
 
-            # Check dietary preferences
-            cursor.execute("SELECT COUNT(*) AS diet_count FROM UserFoodTypes WHERE user_id = ?", (user_id,))
-            diet_count = cursor.fetchone()['diet_count']
+        if not profile['language']:
+            return jsonify({'profile_complete': False, 'message': 'Missing language field'}), 200
 
-            if diet_count == 0:
-                return jsonify({'profile_complete': False, 'message': 'Missing dietary preferences'}), 200
+        if not profile['dietary_preferences']:
+            return jsonify({'profile_complete': False, 'message': 'Missing dietary preferences'}), 200
 
-            # Profile is complete
-            return jsonify({'profile_complete': True}), 200
+        # Profile is complete
+        return jsonify({'profile_complete': True}), 200
 
     except Exception as e:
         return jsonify({'success': False, 'message': 'An error occurred', 'details': str(e)}), 500
@@ -52,14 +57,66 @@ def profile_status():
 @user_bp.route('/api/users', methods=['GET'])
 def get_users():
     """
-    get_users() retrieves all users from the User table.
+    get_users() retrieves a page of users, ordered by user_id. Password hashes are never selected.
+
+    Parameters:
+        cursor (str): Opaque position returned as next_cursor by the previous page.
+        per_page (int): The number of users per page (default 10, max 100).
+        search (str): Prefix of the user's name or email. Only ASCII letters match regardless of
+            case (SQLite's NOCASE collation); other characters must match exactly.
+
+    Returns {"success", "users", "next_cursor"} rather than the bare list of every user the
+    endpoint used to return; next_cursor is None on the last page.
+
+    With ?stream=1 or Accept: application/x-ndjson, every matching user after the cursor is
+    streamed one JSON object per line instead.
     """
+    _, per_page, _, _ = parse_page_args(request.args)
+    cursor_param = request.args.get('cursor')
+    # Folded the way NOCASE folds, so the range's upper bound is in the space NOCASE compares in
+    search = request.args.get('search', '').strip().translate(_NOCASE_FOLD)
+
+    query = "SELECT {} FROM User u WHERE 1=1".format(USER_COLUMNS)
+    params = []
+
+    if search:
+        # Prefix ranges so the NOCASE indexes on name and email can be used
+        upper = search[:-1] + chr(ord(search[-1]) + 1)
+        query += """
+            AND (
+                (u.name >= ? COLLATE NOCASE AND u.name < ? COLLATE NOCASE)
+                OR (u.email >= ? COLLATE NOCASE AND u.email < ? COLLATE NOCASE)
+            )
+        """
+        params.extend([search, upper, search, upper])
+
+    if cursor_param:
+        try:
+            _, after_id = decode_cursor(cursor_param, 'user_id', 'asc')
+        except ValueError as e:
+            return jsonify({'success': False, 'message': str(e)}), 400
+        query += " AND u.user_id > ?"
+        params.append(after_id)
+
+    query += " ORDER BY u.user_id"
+
     try:
+        if ndjson_requested():
+            return stream_query(query, params, dict)
+
+        # Fetch one extra row to detect the next page
+        query += " LIMIT ?"
+        params.append(per_page + 1)
+
         conn = get_db_connection()
-        users = conn.execute('SELECT * FROM User').fetchall()
-        conn.close()
-        user_list = [dict(row) for row in users]
-        return jsonify(user_list), 200
+        users = conn.execute(query, params).fetchall()
+
+        next_cursor = None
+        if len(users) > per_page:
+            users = users[:per_page]
+            next_cursor = encode_cursor('user_id', 'asc', None, users[-1]['user_id'])
+
+        return jsonify({'success': True, 'users': [dict(row) for row in users], 'next_cursor': next_cursor}), 200
     
     except sqlite3.Error as e:
         return jsonify({'error':'Database error occurred', 'details': str(e)}), 500
@@ -75,8 +132,8 @@ def create_profile():
     if not token:
         return jsonify({'success': False, 'message': 'Authorization token is missing or invalid.'}), 401
 
-    # Validate the token and extract the user ID
-    user_id = validate_token(token)
+    # The user ID was validated by the auth layer
+    user_id = g.user_id
 
     data = request.get_json()
     
@@ -86,7 +143,7 @@ def create_profile():
     diet = data.get('diet', [])
     language = data.get('language')
 
-    print("Diet received from client:", diet)
+    logger.debug("Diet received from client: %s", diet)
 
     # Validate input data
     if bio is not None and not isinstance(bio, str):
@@ -101,13 +158,18 @@ def create_profile():
     if language is not None and not isinstance(language, str):
         return jsonify({'success': False, 'message': 'Invalid language'}), 400
 
+    try:
+        food_type_ids = resolve_food_type_ids(diet or [])
+    except UnknownFoodTypeError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+
     try:
         # Update the user's profile in the database
         with get_db_connection() as conn:
             cursor = conn.cursor()
 
             # Update user profile fields
-            cursor.execute(
+            updated = cursor.execute(
                 """
                 UPDATE User
                 SET bio = ?, interests = ?, language = ?
@@ -117,30 +179,25 @@ def create_profile():
             ).rowcount
 
             # Update user diet
-
-            diet_update = 0
-
             cursor.execute("DELETE FROM UserFoodTypes WHERE user_id = ?", (user_id,))
 
-            for food_type in diet:
-                cursor.execute(
-                    """
-                    INSERT OR REPLACE INTO UserFoodTypes (user_id, food_type_id)
-                    SELECT ?, food_type_id FROM FoodTypes WHERE food_type_name = ?
-                    """,
-                    (user_id, food_type)
-                ).rowcount
+            cursor.executemany(
+                "INSERT INTO UserFoodTypes (user_id, food_type_id) VALUES (?, ?)",
+                [(user_id, food_type_id) for food_type_id in food_type_ids]
+            )
 
             conn.commit()
 
+        _invalidate_profile(user_id)
+
         # Check if the update was successful
-        if cursor.rowcount > 0:
+        if updated > 0:
             return jsonify({'success': True, 'message': 'Profile created successfully'}), 200
         else:
             return jsonify({'success': False, 'message': 'No profile was updated. User not found.'}), 404
 
     except Exception as e:
-        print(f"Error occurred during profile creation: {e}")  # Log the error
+        logger.error("Error occurred during profile creation: %s", e)
         return jsonify({'success': False, 'message': 'An error occurred', 'details': str(e)}), 500
   
 @user_bp.route('/api/get_profile', methods=['GET'])
@@ -154,49 +211,16 @@ def get_profile():
     if not token:
         return jsonify({'success': False, 'message': 'Authorization token is missing or invalid.'}), 401
 
-    # Validate the token and extract the user ID
-    user_id = validate_token(token)
+    # The user ID was validated by the auth layer
+    user_id = g.user_id
 
     try:
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
+        profile = _get_profile(user_id)
 
-            # Fetch basic user profile info
-            cursor.execute(
-                """
-                SELECT name, bio, interests, bu_id, language
-                FROM User
-                WHERE user_id = ?
-                """,
-                (user_id,)
-            )
-            user = cursor.fetchone()
+        if profile is None:
+            return jsonify({'message': 'User not found'}), 404
 
-            if not user:
-                return jsonify({'message': 'User not found'}), 404
-
-            # Fetch user dietary preferences
-            cursor.execute(
-                """
-                SELECT ft.food_type_name
-                FROM UserFoodTypes uft
-                JOIN FoodTypes ft ON uft.food_type_id = ft.food_type_id
-                WHERE uft.user_id = ?
-                """,
-                (user_id,)
-            )
-            food_preferences = [row[0] for row in cursor.fetchall()]
-
-            # Map the data to a dictionary
-            user_profile = {
-                'name': user[0],
-                'bio': user[1],
-                'interests': user[2],
-                'buID': user[3],
-                'language': user[4],
-                'dietary_preferences': food_preferences,
-            }
-            return jsonify(user_profile), 200
+        return jsonify(profile), 200
 
     except Exception as e:
         return jsonify({'message': 'An error occurred', 'details': str(e)}), 500
@@ -212,8 +236,8 @@ def edit_profile():
     if not token:
         return jsonify({'success': False, 'message': 'Authorization token is missing or invalid.'}), 401
 
-    # Validate the token and extract the user ID
-    user_id = validate_token(token)
+    # The user ID was validated by the auth layer
+    user_id = g.user_id
     if not user_id:
         return jsonify({'success': False, 'message': 'Invalid or expired JWT token.'}), 401
 
@@ -232,6 +256,14 @@ def edit_profile():
     if not name:
         return jsonify({'success': False, 'message': 'Name is required.'}), 400
 
+    if not isinstance(dietary_preferences, list):
+        return jsonify({'success': False, 'message': 'Invalid diet'}), 400
+
+    try:
+        food_type_ids = resolve_food_type_ids(dietary_preferences)
+    except UnknownFoodTypeError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+
     try:
         with get_db_connection() as conn:
             cursor = conn.cursor()
@@ -256,20 +288,72 @@ def edit_profile():
             )
 
             # Insert updated dietary preferences
-            for preference in dietary_preferences:
-                cursor.execute(
-                    """
-                    INSERT INTO UserFoodTypes (user_id, food_type_id)
-                    SELECT ?, food_type_id FROM FoodTypes WHERE food_type_name = ?
-                    """,
-                    (user_id, preference)
-                )
+            cursor.executemany(
+                "INSERT INTO UserFoodTypes (user_id, food_type_id) VALUES (?, ?)",
+                [(user_id, food_type_id) for food_type_id in food_type_ids]
+            )
 
             conn.commit()
 
+        _invalidate_profile(user_id)
+
         return jsonify({'success': True, 'message': 'Profile updated successfully.'}), 200
 
     except sqlite3.Error as e:
         return jsonify({'success': False, 'message': 'Failed to update profile.', 'details': str(e)}), 500
 
 
+def _get_profile(user_id):
+    """
+    _get_profile(user_id) returns the user's profile from the profile cache, loading it from
+    SQLite on a miss. Unknown users are not cached.
+
+    Returns:
+        dict: name, bio, interests, buID, language and dietary_preferences, or None if the user
+        does not exist.
+    """
+    version = profile_version.value(user_id)
+    profile = profile_cache.get(user_id, version)
+    if profile is not None:
+        return profile
+
+    conn = get_db_connection()
+
+    # Fetch basic user profile info
+    user = conn.execute(
+        """
+        SELECT name, bio, interests, bu_id, language
+        FROM User
+        WHERE user_id = ?
+        """,
+        (user_id,)
+    ).fetchone()
+
+    if not user:
+        return None
+
+    # Fetch user dietary preferences, named from the FoodTypes map
+    food_type_names = get_food_types().by_id
+    food_type_ids = conn.execute(
+        "SELECT food_type_id FROM UserFoodTypes WHERE user_id = ?", (user_id,)
+    ).fetchall()
+
+    profile = {
+        'name': user[0],
+        'bio': user[1],
+        'interests': user[2],
+        'buID': user[3],
+        'language': user[4],
+        'dietary_preferences': [food_type_names[row[0]] for row in food_type_ids if row[0] in food_type_names],
+    }
+    profile_cache.set(user_id, profile, version=version)
+    return profile
+
+
+def _invalidate_profile(user_id):
+    """
+    _invalidate_profile(user_id) drops the user's cached profile here and, through the user's
+    shared profile version, in every other worker. Other users' profiles stay cached.
+    """
+    profile_cache.delete(user_id)
+    profile_version.bump(user_id)
@@ -0,0 +1,8 @@
+"""
+Load benchmarks for the Spark Bytes back-end.
+
+- generate.py builds a database of realistic data at a chosen scale factor.
+- run.py drives the API routes with concurrent workers and reports latency percentiles and
+  throughput as JSON, optionally compared against a stored baseline.
+- scaling.py runs the same mix against gunicorn at increasing worker counts.
+"""
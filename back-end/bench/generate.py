@@ -0,0 +1,234 @@
+"""
+Bulk data generator for the benchmarks.
+
+Scale factor 1 is 2,000 users, 1,000 events, 10,000 RSVPs, 5,000 favorites and 2,000 reviews;
+every count grows linearly, so scale factor 100 gives 100k events and 1M RSVPs. The data is
+deterministic for a given scale factor and seed.
+
+Usage (from back-end/):
+    python -m bench.generate --scale 10 --db /tmp/bench.db
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import time
+from datetime import date, timedelta
+from werkzeug.security import generate_password_hash
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.data.migrations import apply_migrations  # noqa: E402
+
+# Rows per scale factor
+USERS = 2000
+EVENTS = 1000
+RSVPS = 10000
+FAVORITES = 5000
+REVIEWS = 2000
+
+# Every generated user can log in with this password
+PASSWORD = 'bench-password'
+
+BATCH_SIZE = 10000
+
+_FIRST_NAMES = [
+    'Alex', 'Sam', 'Jordan', 'Taylor', 'Morgan', 'Casey', 'Riley', 'Jamie', 'Avery', 'Quinn',
+    'Priya', 'Wei', 'Fatima', 'Diego', 'Noah', 'Emma', 'Liam', 'Olivia', 'Mateo', 'Aisha',
+]
+_LAST_NAMES = [
+    'Smith', 'Chen', 'Patel', 'Garcia', 'Kim', 'Nguyen', 'Johnson', 'Lee', 'Brown', 'Davis',
+    'Martinez', 'Lopez', 'Wilson', 'Khan', 'Silva', 'Cohen', 'Rossi', 'Okafor', 'Sato', 'Muller',
+]
+_INTERESTS = [
+    'coding', 'music', 'soccer', 'chess', 'cooking', 'robotics', 'art', 'hiking', 'film', 'poetry',
+    'startups', 'biology', 'dance', 'gaming', 'volunteering', 'photography', 'debate', 'yoga',
+]
+_EVENT_KINDS = [
+    'Pizza Night', 'Study Break', 'Bagel Brunch', 'Taco Tuesday', 'Career Mixer', 'Club Social',
+    'Cookie Swap', 'Hackathon Dinner', 'Coffee Hour', 'Vegan Potluck', 'Sushi Social', 'Ice Cream Hour',
+    'Research Seminar Lunch', 'Movie Night', 'Game Night', 'Welcome Reception',
+]
+_HOSTS = [
+    'Computer Science Club', 'Engineering Society', 'Photography Club', 'Chess Club', 'Debate Team',
+    'Student Government', 'Film Society', 'Robotics Team', 'Dance Collective', 'Biology Society',
+]
+_LOCATIONS = [
+    ('College of Arts and Sciences', '725 Commonwealth Ave'),
+    ('George Sherman Union', '775 Commonwealth Ave'),
+    ('Photonics Center', '8 St Marys St'),
+    ('Questrom School of Business', '595 Commonwealth Ave'),
+    ('Mugar Library', '771 Commonwealth Ave'),
+    ('Center for Computing & Data Sciences', '665 Commonwealth Ave'),
+    ('Kilachand Hall', '91 Bay State Rd'),
+    ('Warren Towers', '700 Commonwealth Ave'),
+]
+_LANGUAGES = ['English'] * 8 + ['Spanish', 'Mandarin', 'Hindi', 'French']
+_RSVP_STATUSES = ['Going'] * 6 + ['Interested'] * 3 + ['Not Going']
+
+
+def _batched(rows, size=BATCH_SIZE):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _insert(conn, sql, rows):
+    count = 0
+    for batch in _batched(rows):
+        conn.executemany(sql, batch)
+        count += len(batch)
+    return count
+
+
+def _users(rng, count):
+    # Single-iteration hashes: password_hash is unique, so every user needs its own salted
+    # hash, and full-strength hashing would dominate the run
+    for user_id in range(1, count + 1):
+        first, last = rng.choice(_FIRST_NAMES), rng.choice(_LAST_NAMES)
+        yield (
+            user_id,
+            f"{first.lower()}.{last.lower()}{user_id}@bu.edu",
+            generate_password_hash(PASSWORD, method='pbkdf2:sha256:1'),
+            f"U{user_id:08d}",
+            f"{first} {last}",
+            f"{rng.choice(_INTERESTS).capitalize()} enthusiast.",
+            ', '.join(rng.sample(_INTERESTS, rng.randint(1, 4))),
+            rng.choice(_LANGUAGES),
+        )
+
+
+def _events(rng, count, user_count, today):
+    for event_id in range(1, count + 1):
+        kind, host = rng.choice(_EVENT_KINDS), rng.choice(_HOSTS)
+        location, address = rng.choice(_LOCATIONS)
+        start_hour = rng.randint(8, 20)
+        yield (
+            event_id,
+            rng.randint(1, user_count),
+            f"{host} {kind}",
+            f"Free food at the {host} {kind.lower()}. Come meet people interested in "
+            f"{rng.choice(_INTERESTS)} and {rng.choice(_INTERESTS)}.",
+            rng.choice([0, 5, 10, 20, 30, 50, 100, 200]),
+            location,
+            address,
+            (today + timedelta(days=rng.randint(-30, 60))).isoformat(),
+            f"{start_hour:02d}:{rng.choice([0, 15, 30, 45]):02d}:00",
+            f"{min(start_hour + rng.randint(1, 3), 23):02d}:00:00",
+        )
+
+
+def _pairs(rng, count, left_count, right_count):
+    # Distinct (left, right) pairs, as required by the RSVP, Favorite and food type keys
+    count = min(count, left_count * right_count)
+    seen = set()
+    while len(seen) < count:
+        pair = (rng.randint(1, left_count), rng.randint(1, right_count))
+        if pair not in seen:
+            seen.add(pair)
+            yield pair
+
+
+def generate(db_path, scale=1.0, seed=42):
+    """
+    generate() creates a fresh benchmark database at db_path.
+
+    Returns:
+        dict: The number of rows written per table and the elapsed seconds.
+    """
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(db_path + suffix):
+            os.remove(db_path + suffix)
+
+    started = time.perf_counter()
+    apply_migrations(db_path)
+
+    rng = random.Random(seed)
+    user_count = max(1, int(USERS * scale))
+    event_count = max(1, int(EVENTS * scale))
+    today = date.today()
+
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = OFF")
+    conn.execute("PRAGMA cache_size = -262144")
+    conn.execute("PRAGMA foreign_keys = OFF")
+
+    food_type_count = conn.execute("SELECT COUNT(*) FROM FoodTypes").fetchone()[0]
+    counts = {}
+
+    # One transaction; the schema triggers keep EventSummary, the search index and the
+    # aggregates in sync as rows are inserted
+    conn.execute("BEGIN")
+    counts['User'] = _insert(
+        conn,
+        "INSERT INTO User (user_id, email, password_hash, bu_id, name, bio, interests, language) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        _users(rng, user_count)
+    )
+    counts['UserFoodTypes'] = _insert(
+        conn,
+        "INSERT INTO UserFoodTypes (user_id, food_type_id) VALUES (?, ?)",
+        ((user_id, food_type_id)
+         for user_id in range(1, user_count + 1)
+         for food_type_id in rng.sample(range(1, food_type_count + 1), rng.randint(0, 3)))
+    )
+    counts['Event'] = _insert(
+        conn,
+        "INSERT INTO Event (event_id, user_id, title, description, quantity, location, address, "
+        "event_date, start_time, end_time) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        _events(rng, event_count, user_count, today)
+    )
+    counts['EventFoodTypes'] = _insert(
+        conn,
+        "INSERT INTO EventFoodTypes (event_id, food_type_id) VALUES (?, ?)",
+        ((event_id, food_type_id)
+         for event_id in range(1, event_count + 1)
+         for food_type_id in rng.sample(range(1, food_type_count + 1), rng.randint(1, 3)))
+    )
+    counts['RSVP'] = _insert(
+        conn,
+        "INSERT INTO RSVP (user_id, event_id, status) VALUES (?, ?, ?)",
+        ((user_id, event_id, rng.choice(_RSVP_STATUSES))
+         for user_id, event_id in _pairs(rng, int(RSVPS * scale), user_count, event_count))
+    )
+    counts['Favorite'] = _insert(
+        conn,
+        "INSERT INTO Favorite (user_id, event_id) VALUES (?, ?)",
+        _pairs(rng, int(FAVORITES * scale), user_count, event_count)
+    )
+    counts['Review'] = _insert(
+        conn,
+        "INSERT INTO Review (user_id, event_id, rating, comments) VALUES (?, ?, ?, ?)",
+        ((user_id, event_id, rng.choice([1, 2, 3, 3, 4, 4, 4, 5, 5, 5]), 'Generated review.')
+         for user_id, event_id in _pairs(rng, int(REVIEWS * scale), user_count, event_count))
+    )
+    conn.execute("COMMIT")
+
+    conn.execute("PRAGMA optimize")
+    conn.execute("ANALYZE")
+    conn.close()
+
+    return dict(counts, seconds=round(time.perf_counter() - started, 2))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a benchmark database.")
+    parser.add_argument('--db', default='bench.db', help="Path of the database to (re)create.")
+    parser.add_argument('--scale', type=float, default=1.0, help="Scale factor (1 = 1,000 events).")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args(argv)
+
+    result = generate(args.db, args.scale, args.seed)
+    print(result)
+
+
+if __name__ == '__main__':
+    main()
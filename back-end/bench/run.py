@@ -0,0 +1,432 @@
+"""
+Load benchmark for the API routes.
+
+Concurrent workers, each logged in as a different generated user, send a weighted mix of requests
+for a fixed duration. The report is JSON with the request count, errors, p50/p95/p99 latency and
+throughput of every route, and can be saved as a baseline or compared against one.
+
+The routes are driven in-process through the Flask test client by default, which measures the app
+without a server in front of it, or over HTTP with --url against a server started on the same
+database.
+
+Not driven, because they would change the state the other requests depend on: DELETE and PUT
+/api/events/<id>, /auth/logout and /api/create_profile.
+
+Usage (from back-end/):
+    python -m bench.generate --scale 10 --db /tmp/bench.db
+    python -m bench.run --db /tmp/bench.db --workers 8 --duration 30 --save-baseline bench/baseline.json
+    python -m bench.run --db /tmp/bench.db --workers 8 --duration 30 --baseline bench/baseline.json
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import sqlite3
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from http.cookies import SimpleCookie
+from urllib.parse import urlencode, urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench.generate import PASSWORD  # noqa: E402
+
+# Relative increase in p95 latency, or decrease in throughput, reported as a regression
+DEFAULT_TOLERANCE = 0.2
+
+# Routes with fewer requests than this in either run are too noisy to compare
+MIN_COMPARABLE_COUNT = 20
+
+_SEARCH_TERMS = ['pizza', 'club', 'coffee', 'night', 'vegan', 'social', 'chess', 'dinner']
+_RSVP_STATUSES = ['Going', 'Interested', 'Not Going']
+
+
+class HttpSession:
+    """
+    HttpSession sends requests over one keep-alive HTTP connection and keeps the cookies the
+    server sets, like a browser tab would.
+    """
+
+    def __init__(self, url):
+        parts = urlsplit(url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.cookies = {}
+        self._conn = None
+
+    def request(self, method, path, body=None):
+        headers = {}
+        if body is not None:
+            body = json.dumps(body)
+            headers['Content-Type'] = 'application/json'
+        if self.cookies:
+            headers['Cookie'] = '; '.join(f"{name}={value}" for name, value in self.cookies.items())
+
+        for attempt in range(2):
+            if self._conn is None:
+                self._conn = http.client.HTTPConnection(self.host, self.port, timeout=30)
+            try:
+                self._conn.request(method, path, body=body, headers=headers)
+                response = self._conn.getresponse()
+                payload = response.read()
+                break
+            except (http.client.HTTPException, ConnectionError):
+                # The server closed the idle connection; retry once on a new one
+                self._conn.close()
+                self._conn = None
+                if attempt:
+                    raise
+
+        for header in response.headers.get_all('Set-Cookie') or []:
+            for name, morsel in SimpleCookie(header).items():
+                self.cookies[name] = morsel.value
+        if response.getheader('Connection', '').lower() == 'close':
+            self._conn.close()
+            self._conn = None
+        return response.status, payload
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+
+
+class AppSession:
+    """
+    AppSession sends requests to the app in this process through the Flask test client.
+    """
+
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def request(self, method, path, body=None):
+        response = self.client.open(path, method=method, json=body)
+        return response.status_code, response.get_data()
+
+    def close(self):
+        pass
+
+
+class Dataset:
+    """
+    Dataset holds the ids and names requests are built from, read from the benchmark database.
+    """
+
+    def __init__(self, db_path):
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        try:
+            self.max_event_id = conn.execute("SELECT MAX(event_id) FROM Event").fetchone()[0]
+            self.users = conn.execute("SELECT user_id, email FROM User ORDER BY user_id").fetchall()
+            self.food_types = [row[0] for row in conn.execute("SELECT food_type_name FROM FoodTypes")]
+        finally:
+            conn.close()
+        if not self.max_event_id or not self.users:
+            raise SystemExit(f"{db_path} has no events or users; run bench.generate first")
+
+
+class Scenario:
+    """
+    Scenario is one kind of request in the mix. build(worker) returns (method, path, body).
+    A response is an error if its status is not in ok_statuses.
+    """
+
+    def __init__(self, name, weight, build, ok_statuses=(200,)):
+        self.name = name
+        self.weight = weight
+        self.build = build
+        self.ok_statuses = ok_statuses
+
+
+class Worker:
+    """
+    Worker is one simulated user with its own session and random stream.
+    """
+
+    def __init__(self, index, session, dataset, seed):
+        self.index = index
+        self.session = session
+        self.dataset = dataset
+        self.rng = random.Random(seed * 1000 + index)
+        self.user_id, self.email = dataset.users[index % len(dataset.users)]
+        self.counter = 0
+        self.latencies = {}
+        self.errors = {}
+
+    def event_id(self):
+        return self.rng.randint(1, self.dataset.max_event_id)
+
+    def login(self):
+        status, _ = self.session.request('POST', '/auth/login', {'email': self.email, 'password': PASSWORD})
+        if status != 200:
+            raise SystemExit(f"Login failed for {self.email} with status {status}")
+
+    def run(self, scenarios, deadline):
+        weights = [scenario.weight for scenario in scenarios]
+        while time.monotonic() < deadline:
+            scenario = self.rng.choices(scenarios, weights)[0]
+            method, path, body = scenario.build(self)
+            started = time.perf_counter()
+            try:
+                status, _ = self.session.request(method, path, body)
+            except (OSError, http.client.HTTPException):
+                status = None
+            elapsed = time.perf_counter() - started
+
+            self.latencies.setdefault(scenario.name, []).append(elapsed)
+            if status not in scenario.ok_statuses:
+                self.errors[scenario.name] = self.errors.get(scenario.name, 0) + 1
+        self.session.close()
+
+
+def _getevents(worker):
+    rng = worker.rng
+    params = {}
+    roll = rng.random()
+    if roll < 0.3:
+        params['search'] = rng.choice(_SEARCH_TERMS)
+    elif roll < 0.5:
+        params['dietary_needs'] = rng.choice(worker.dataset.food_types)
+    elif roll < 0.6:
+        params['date'] = (date.today() + timedelta(days=rng.randint(0, 30))).isoformat()
+    query = f"?{urlencode(params)}" if params else ''
+    return 'GET', f"/api/getevents{query}", None
+
+
+def _create_event(worker):
+    worker.counter += 1
+    return 'POST', '/api/events', {
+        'title': f"Bench Event {worker.index}-{worker.counter}",
+        'description': 'Created by the load benchmark.',
+        'date': (date.today() + timedelta(days=worker.rng.randint(1, 60))).isoformat(),
+        'location': 'George Sherman Union',
+        'address': '775 Commonwealth Ave',
+        'food_types': worker.rng.sample(worker.dataset.food_types, 2),
+        'quantity': worker.rng.randint(10, 100),
+        'start_time': '12:00:00',
+        'end_time': '14:00:00',
+    }
+
+
+def _register(worker):
+    worker.counter += 1
+    suffix = f"{worker.index}-{worker.counter}-{os.getpid()}-{time.time_ns()}"
+    return 'POST', '/auth/register', {
+        'email': f"bench-{suffix}@bu.edu",
+        'password': PASSWORD,
+        'buid': f"B-{suffix}",
+        'name': 'Bench User',
+    }
+
+
+def _edit_profile(worker):
+    return 'PUT', '/api/edit_profile', {
+        'name': f"Bench User {worker.index}",
+        'bio': 'Benchmarking.',
+        'interests': 'coding, music',
+        'language': 'English',
+        'diet': worker.rng.sample(worker.dataset.food_types, 2),
+    }
+
+
+SCENARIOS = [
+    # Reads
+    Scenario('GET /api/getevents', 15, _getevents),
+    Scenario('GET /api/events/<id>', 10, lambda w: ('GET', f"/api/events/{w.event_id()}", None), (200, 404)),
+    Scenario('GET /api/events?ids=', 4, lambda w: (
+        'GET', f"/api/events?ids={','.join(str(w.event_id()) for _ in range(10))}", None)),
+    Scenario('POST /api/events/batch', 3, lambda w: (
+        'POST', '/api/events/batch', {'ids': [w.event_id() for _ in range(10)]})),
+    Scenario('GET /api/events/top_rated', 4, lambda w: ('GET', '/api/events/top_rated?limit=20', None)),
+    Scenario('GET /api/event_rsvps/<id>', 6, lambda w: ('GET', f"/api/event_rsvps/{w.event_id()}", None), (200, 404)),
+    Scenario('GET /favorites', 6, lambda w: ('GET', '/favorites', None)),
+    Scenario('GET /api/user_rsvps', 5, lambda w: ('GET', '/api/user_rsvps', None), (200, 404)),
+    Scenario('GET /api/user_events', 3, lambda w: ('GET', '/api/user_events', None), (200, 404)),
+    Scenario('GET /api/feed', 6, lambda w: ('GET', '/api/feed?limit=20', None)),
+    Scenario('GET /api/get_profile', 4, lambda w: ('GET', '/api/get_profile', None)),
+    Scenario('GET /auth/profile_status', 3, lambda w: ('GET', '/auth/profile_status', None)),
+    Scenario('GET /auth/verify', 3, lambda w: ('GET', '/auth/verify', None)),
+    Scenario('GET /api/users', 3, lambda w: (
+        'GET', f"/api/users?search={w.rng.choice(['a', 'm', 'pr', 'sam', 'chen'])}", None)),
+    Scenario('GET /metrics', 1, lambda w: ('GET', '/metrics', None)),
+    # Writes
+    Scenario('POST /api/rsvp', 5, lambda w: (
+        'POST', '/api/rsvp', {'event_id': w.event_id(), 'rsvp_status': w.rng.choice(_RSVP_STATUSES)}),
+        (200, 201, 404, 409)),
+    Scenario('POST /api/favorites', 3, lambda w: ('POST', '/api/favorites', {'event_id': w.event_id()}), (201, 400)),
+    Scenario('POST /api/review', 2, lambda w: (
+        'POST', '/api/review', {'user_id': w.user_id, 'event_id': w.event_id(), 'rating': w.rng.randint(1, 5)}),
+        (201,)),
+    Scenario('POST /api/events', 1, _create_event, (201,)),
+    Scenario('PUT /api/edit_profile', 1, _edit_profile),
+    Scenario('POST /auth/refresh', 1, lambda w: ('POST', '/auth/refresh', None)),
+    # Password hashing makes these far more expensive than everything else
+    Scenario('POST /auth/login', 0.5, lambda w: (
+        'POST', '/auth/login', {'email': w.email, 'password': PASSWORD})),
+    Scenario('POST /auth/register', 0.2, _register, (201,)),
+]
+
+
+def _percentile(sorted_values, fraction):
+    # Nearest-rank percentile
+    index = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def _summarize(latencies, errors, seconds):
+    latencies = sorted(latencies)
+    return {
+        'count': len(latencies),
+        'errors': errors,
+        'rps': round(len(latencies) / seconds, 1),
+        'p50_ms': round(_percentile(latencies, 0.50) * 1000, 2),
+        'p95_ms': round(_percentile(latencies, 0.95) * 1000, 2),
+        'p99_ms': round(_percentile(latencies, 0.99) * 1000, 2),
+    }
+
+
+def measure(session_factory, dataset, workers=8, duration=30.0, warmup=2.0, seed=1, only=None, first_index=0):
+    """
+    measure() logs in one session per worker, runs the request mix for warmup seconds unmeasured
+    and then for duration seconds. Workers are numbered from first_index, which picks the users
+    they log in as, so that several processes can drive the same server as different users.
+
+    Returns:
+        tuple: (latencies in seconds per scenario name, errors per scenario name, elapsed seconds)
+    """
+    scenarios = [s for s in SCENARIOS if not only or any(name in s.name for name in only)]
+    if not scenarios:
+        raise SystemExit("No scenarios match --only")
+
+    pool = [Worker(first_index + index, session_factory(), dataset, seed) for index in range(workers)]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(Worker.login, pool))
+
+        if warmup > 0:
+            deadline = time.monotonic() + warmup
+            list(executor.map(lambda worker: worker.run(scenarios, deadline), pool))
+            for worker in pool:
+                worker.latencies, worker.errors = {}, {}
+
+        started = time.monotonic()
+        deadline = started + duration
+        list(executor.map(lambda worker: worker.run(scenarios, deadline), pool))
+        elapsed = time.monotonic() - started
+
+    latencies, errors = {}, {}
+    for worker in pool:
+        for name, values in worker.latencies.items():
+            latencies.setdefault(name, []).extend(values)
+        for name, count in worker.errors.items():
+            errors[name] = errors.get(name, 0) + count
+    return latencies, errors, elapsed
+
+
+def build_report(latencies, errors, elapsed, config):
+    """
+    build_report() summarizes the output of measure() per route and in total.
+    """
+    return {
+        'config': config,
+        'total': _summarize(
+            [value for values in latencies.values() for value in values], sum(errors.values()), elapsed
+        ),
+        'routes': {
+            name: _summarize(values, errors.get(name, 0), elapsed)
+            for name, values in sorted(latencies.items())
+        },
+    }
+
+
+def run(session_factory, dataset, workers=8, duration=30.0, warmup=2.0, seed=1, only=None):
+    """
+    run() measures the request mix with measure() and returns the report as a dict.
+    """
+    latencies, errors, elapsed = measure(session_factory, dataset, workers, duration, warmup, seed, only)
+    return build_report(latencies, errors, elapsed, {
+        'workers': workers,
+        'duration': duration,
+        'seed': seed,
+        'events': dataset.max_event_id,
+        'users': len(dataset.users),
+        'cpus': os.cpu_count(),
+    })
+
+
+def compare(report, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    compare() returns a description of every route whose p95 latency grew, or whose throughput
+    (for the total) dropped, by more than tolerance relative to the baseline, or which started
+    returning errors.
+    """
+    regressions = []
+
+    def check(name, current, previous):
+        if current['count'] < MIN_COMPARABLE_COUNT or previous['count'] < MIN_COMPARABLE_COUNT:
+            return
+        if current['p95_ms'] > previous['p95_ms'] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {previous['p95_ms']} ms -> {current['p95_ms']} ms")
+        if current['errors'] and not previous['errors']:
+            regressions.append(f"{name}: {current['errors']} errors (baseline had none)")
+
+    check('total', report['total'], baseline['total'])
+    if report['total']['rps'] < baseline['total']['rps'] * (1 - tolerance):
+        regressions.append(f"total: {baseline['total']['rps']} -> {report['total']['rps']} requests/s")
+    for name, current in report['routes'].items():
+        if name in baseline['routes']:
+            check(name, current, baseline['routes'][name])
+    return regressions
+
+
+def _app_session_factory(db_path):
+    from app import create_app
+    from app.config import Config
+
+    # Config read DATABASE_PATH from the environment when the app package was imported
+    Config.DATABASE_PATH = os.path.abspath(db_path)
+    app = create_app()
+    return lambda: AppSession(app)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the API load benchmark.")
+    parser.add_argument('--db', default='bench.db', help="Database made by bench.generate (and served by --url).")
+    parser.add_argument('--url', help="Base URL of a running server; in-process if omitted.")
+    parser.add_argument('--workers', type=int, default=8, help="Concurrent simulated users.")
+    parser.add_argument('--duration', type=float, default=30.0, help="Measured seconds.")
+    parser.add_argument('--warmup', type=float, default=2.0, help="Unmeasured seconds before measuring.")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--only', action='append', help="Only run scenarios whose name contains this.")
+    parser.add_argument('--output', help="Also write the report to this file.")
+    parser.add_argument('--save-baseline', metavar='PATH', help="Write the report as the new baseline.")
+    parser.add_argument('--baseline', metavar='PATH', help="Compare against this baseline; exit 1 on regression.")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args(argv)
+
+    dataset = Dataset(args.db)
+    if args.url:
+        session_factory = lambda: HttpSession(args.url)  # noqa: E731
+    else:
+        session_factory = _app_session_factory(args.db)
+
+    report = run(session_factory, dataset, args.workers, args.duration, args.warmup, args.seed, args.only)
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    for path in filter(None, (args.output, args.save_baseline)):
+        with open(path, 'w') as f:
+            f.write(text + '\n')
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
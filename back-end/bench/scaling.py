@@ -0,0 +1,202 @@
+"""
+Throughput scaling test for the production server.
+
+For each worker count, starts gunicorn with gunicorn.conf.py on a fresh copy of the benchmark
+database, drives it with the bench.run request mix from several client processes (so the load
+generator is not limited to one core by the GIL), and stops it with SIGTERM. The report lists
+throughput and latency per worker count, with the speedup over one worker and the scaling
+efficiency (speedup / workers).
+
+The clients run on the same machine and use cores too, so efficiency is understated once
+workers plus client processes exceed the core count; run against a machine with spare cores
+for clean numbers.
+
+Usage (from back-end/):
+    python -m bench.generate --scale 10 --db /tmp/bench.db
+    python -m bench.scaling --db /tmp/bench.db --server-workers 1,2,4 --duration 20
+"""
+
+import argparse
+import json
+import os
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench.run import Dataset, HttpSession, build_report, measure  # noqa: E402
+
+BACK_END_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _default_worker_counts():
+    cores = os.cpu_count() or 1
+    counts, count = [], 1
+    while count < cores:
+        counts.append(count)
+        count *= 2
+    return counts + [cores]
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for_port(port, process, timeout=60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f"gunicorn exited with status {process.returncode} during startup")
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise SystemExit(f"gunicorn did not start listening on port {port} within {timeout} seconds")
+
+
+def _start_server(db_path, port, workers, threads, log):
+    env = dict(
+        os.environ,
+        DATABASE_PATH=db_path,
+        GUNICORN_BIND=f"127.0.0.1:{port}",
+        GUNICORN_WORKERS=str(workers),
+        GUNICORN_THREADS=str(threads),
+        GUNICORN_LOG_LEVEL='warning',
+    )
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:app'],
+        cwd=BACK_END_DIR, env=env, stdout=log, stderr=subprocess.STDOUT,
+    )
+    _wait_for_port(port, process)
+    return process
+
+
+def _stop_server(process, timeout=60.0):
+    process.send_signal(signal.SIGTERM)
+    try:
+        process.wait(timeout)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+def _client(url, db_path, clients, duration, warmup, seed, first_index):
+    # Runs in a client process
+    dataset = Dataset(db_path)
+    return measure(lambda: HttpSession(url), dataset, clients, duration, warmup, seed, first_index=first_index)
+
+
+def _drive(url, db_path, client_processes, clients, duration, warmup, seed):
+    # Split the clients over the processes; each logs in as different users
+    shares = [clients // client_processes + (i < clients % client_processes) for i in range(client_processes)]
+    firsts = [sum(shares[:i]) for i in range(client_processes)]
+
+    with ProcessPoolExecutor(max_workers=client_processes) as executor:
+        futures = [
+            executor.submit(_client, url, db_path, share, duration, warmup, seed, first)
+            for share, first in zip(shares, firsts) if share
+        ]
+        results = [future.result() for future in futures]
+
+    latencies, errors = {}, {}
+    for process_latencies, process_errors, _ in results:
+        for name, values in process_latencies.items():
+            latencies.setdefault(name, []).extend(values)
+        for name, count in process_errors.items():
+            errors[name] = errors.get(name, 0) + count
+    elapsed = max(result[2] for result in results)
+    return latencies, errors, elapsed
+
+
+def scaling(db_path, worker_counts, threads=4, clients_per_worker=8, client_processes=None,
+            duration=20.0, warmup=3.0, seed=1, log=None):
+    """
+    scaling() benchmarks the server at each worker count and returns the report as a dict.
+    """
+    runs = []
+    worker_counts = sorted(set(worker_counts))
+    workdir = tempfile.mkdtemp(prefix='bench-scaling-')
+    try:
+        for workers in worker_counts:
+            # Every run starts from the same data
+            run_db = os.path.join(workdir, f"workers-{workers}.db")
+            shutil.copyfile(db_path, run_db)
+
+            port = _free_port()
+            clients = clients_per_worker * workers
+            processes = client_processes or min(clients, max(1, workers))
+            server = _start_server(run_db, port, workers, threads, log)
+            try:
+                latencies, errors, elapsed = _drive(
+                    f"http://127.0.0.1:{port}", run_db, processes, clients, duration, warmup, seed
+                )
+            finally:
+                _stop_server(server)
+
+            report = build_report(latencies, errors, elapsed, {})
+            runs.append(dict(report['total'], workers=workers, clients=clients, client_processes=processes))
+            print(f"{workers} workers: {report['total']['rps']} requests/s, "
+                  f"p95 {report['total']['p95_ms']} ms", file=sys.stderr)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    # Relative to the smallest worker count
+    base = runs[0]
+    for run in runs:
+        speedup = run['rps'] / base['rps'] if base['rps'] else 0.0
+        run['speedup'] = round(speedup, 2)
+        run['efficiency'] = round(speedup * base['workers'] / run['workers'], 2)
+
+    return {
+        'config': {
+            'threads': threads,
+            'clients_per_worker': clients_per_worker,
+            'duration': duration,
+            'seed': seed,
+            'cpus': os.cpu_count(),
+        },
+        'runs': runs,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure how throughput scales with gunicorn workers.")
+    parser.add_argument('--db', default='bench.db', help="Database made by bench.generate (copied per run).")
+    parser.add_argument('--server-workers', help="Comma-separated worker counts (default: 1, 2, 4, ... cores).")
+    parser.add_argument('--threads', type=int, default=4, help="Threads per worker.")
+    parser.add_argument('--clients-per-worker', type=int, default=8, help="Concurrent simulated users per worker.")
+    parser.add_argument('--client-processes', type=int, help="Load generator processes (default: one per worker).")
+    parser.add_argument('--duration', type=float, default=20.0, help="Measured seconds per worker count.")
+    parser.add_argument('--warmup', type=float, default=3.0)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help="Also write the report to this file.")
+    args = parser.parse_args(argv)
+
+    if args.server_workers:
+        worker_counts = [int(count) for count in args.server_workers.split(',')]
+    else:
+        worker_counts = _default_worker_counts()
+
+    report = scaling(
+        os.path.abspath(args.db), worker_counts, args.threads, args.clients_per_worker,
+        args.client_processes, args.duration, args.warmup, args.seed, log=sys.stderr,
+    )
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+
+
+if __name__ == '__main__':
+    main()
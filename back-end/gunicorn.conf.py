@@ -0,0 +1,68 @@
+"""
+Gunicorn settings for serving the app in production (from back-end/):
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Every setting can be overridden from the environment (GUNICORN_WORKERS, GUNICORN_THREADS, ...)
+or on the command line.
+
+The defaults are tuned for SQLite's single-writer model:
+- One worker process per core. Request handling is CPU-bound Python, and more processes than
+  cores only adds contention for SQLite's write lock without adding throughput.
+- A few threads per worker. WAL mode lets them read concurrently, and they overlap I/O; within a
+  worker, writes are group-committed by one writer thread, so threads don't fight over the lock.
+- Each worker's connection pool holds one connection per thread plus one for the writer, and
+  the password hashing pool is split across workers instead of each one starting a process per
+  core.
+"""
+
+import os
+
+_cores = os.cpu_count() or 1
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:5002')
+workers = int(os.getenv('GUNICORN_WORKERS', _cores))
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', 4))
+
+# Create the app once in the master: startup work (migrations, lookup tables) runs once, and
+# workers share the shared-memory cache version counters and the copy-on-write pages
+preload_app = True
+
+# Recycle workers after this many requests (plus jitter, so they don't all restart at once)
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 5000))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', 500))
+
+# On SIGTERM, workers finish the requests in flight for up to graceful_timeout seconds.
+# timeout is above SQLite's busy timeout and the write queue and hashing timeouts
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 5))
+
+# Worker heartbeat files in memory rather than on a possibly slow disk
+if os.path.isdir('/dev/shm'):
+    worker_tmp_dir = '/dev/shm'
+
+accesslog = os.getenv('GUNICORN_ACCESS_LOG')
+errorlog = '-'
+loglevel = os.getenv('GUNICORN_LOG_LEVEL', 'info')
+
+# Read by the app config when the app is loaded, after this file (so nothing here may import
+# the app at module level)
+os.environ.setdefault('DB_POOL_SIZE', str(threads + 1))
+os.environ.setdefault('PASSWORD_HASH_WORKERS', str(max(1, _cores // workers)))
+
+
+def pre_fork(server, worker):
+    from app.data import database
+
+    # Connections opened while loading the app must not be carried into the workers
+    database.get_pool().close_all()
+
+
+def worker_exit(server, worker):
+    from app.data import database, write_queue
+
+    # Commit queued writes and close this worker's connections before it exits
+    write_queue.shutdown()
+    database.get_pool().close_all()
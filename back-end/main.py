@@ -15,8 +15,8 @@ Key Features:
 
 from app import create_app
 
-# Create the app instance
-app = create_app()
-
 if __name__ == '__main__':
+    # Only when run directly: the password hashing workers are spawned processes that re-import
+    # this module, and must not build an app of their own. Production servers import wsgi.py.
+    app = create_app()
     app.run(host="localhost", port=5002, debug=True)
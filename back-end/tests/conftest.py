@@ -0,0 +1,96 @@
+"""
+Shared fixtures: an app on a freshly migrated database in a temporary directory, a test
+client, and helpers to create users and events and to sign requests in as a user.
+"""
+
+import os
+import sqlite3
+import sys
+from datetime import date, timedelta
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app  # noqa: E402
+from app.auth.token_utils import generate_token  # noqa: E402
+from app.cache import event_feed_cache, profile_cache  # noqa: E402
+from app.config import Config  # noqa: E402
+from app.data import database, write_queue  # noqa: E402
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'DATABASE_PATH', str(tmp_path / 'test.db'))
+    # Hashing strength is not under test
+    monkeypatch.setattr(Config, 'PASSWORD_HASH_METHOD', 'pbkdf2:sha256:1')
+    monkeypatch.setattr(Config, 'PASSWORD_HASH_WORKERS', 1)
+
+    app = create_app()
+    app.config['TESTING'] = True
+    event_feed_cache.clear()
+    profile_cache.clear()
+
+    yield app
+
+    write_queue.shutdown()
+    database.get_pool().close_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def db(app):
+    conn = sqlite3.connect(app.config['DATABASE_PATH'], isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA foreign_keys = ON")
+    yield conn
+    conn.close()
+
+
+def create_user(db, name='Test User', email=None):
+    """
+    create_user() inserts a user with a complete profile and returns its ID.
+    """
+    count = db.execute("SELECT COUNT(*) FROM User").fetchone()[0] + 1
+    email = email or f"user{count}@bu.edu"
+    return db.execute(
+        """
+        INSERT INTO User (email, password_hash, bu_id, name, bio, interests, language)
+        VALUES (?, ?, ?, ?, 'Bio', 'coding', 'English')
+        """,
+        (email, f"unused-hash-{count}", f"U{count:08d}", name)
+    ).lastrowid
+
+
+def create_event(db, user_id, title='Pizza Night', quantity=10, days_ahead=1, food_types=('Vegan',)):
+    """
+    create_event() inserts an event with the given food types and returns its ID.
+    """
+    event_id = db.execute(
+        """
+        INSERT INTO Event (user_id, title, description, quantity, location, address,
+                           event_date, start_time, end_time)
+        VALUES (?, ?, 'Free food', ?, 'GSU', '775 Commonwealth Ave', ?, '12:00:00', '14:00:00')
+        """,
+        (user_id, title, quantity, (date.today() + timedelta(days=days_ahead)).isoformat())
+    ).lastrowid
+    for name in food_types:
+        db.execute(
+            """
+            INSERT INTO EventFoodTypes (event_id, food_type_id)
+            SELECT ?, food_type_id FROM FoodTypes WHERE food_type_name = ?
+            """,
+            (event_id, name)
+        )
+    return event_id
+
+
+def login_as(client, user_id):
+    """
+    login_as() signs the client's later requests in as user_id.
+    """
+    client.set_cookie('token', generate_token(user_id))
@@ -0,0 +1,43 @@
+from conftest import create_event, create_user
+
+# The Event columns get_event returned before the food-type mask and version stamp were added
+EVENT_KEYS = {
+    'event_id', 'user_id', 'title', 'description', 'quantity', 'location', 'address',
+    'event_date', 'start_time', 'end_time',
+}
+
+SUMMARY_KEYS = {
+    'event_id', 'title', 'description', 'event_date', 'start_time', 'end_time', 'location',
+    'address', 'quantity', 'dietary_needs', 'rsvp_count', 'favorite_count', 'rating_count',
+    'average_rating',
+}
+
+
+def test_get_event_returns_only_public_columns(client, db):
+    event_id = create_event(db, create_user(db))
+
+    response = client.get(f'/api/events/{event_id}')
+
+    assert response.status_code == 200
+    assert set(response.get_json()) == EVENT_KEYS
+    assert response.headers['ETag']
+
+
+def test_get_event_revalidates_with_etag(client, db):
+    event_id = create_event(db, create_user(db))
+    etag = client.get(f'/api/events/{event_id}').headers['ETag']
+
+    assert client.get(f'/api/events/{event_id}', headers={'If-None-Match': etag}).status_code == 304
+
+
+def test_batch_lookups_return_only_summary_columns(client, db):
+    user_id = create_user(db)
+    first, second = create_event(db, user_id), create_event(db, user_id, title='Tacos')
+
+    by_query = client.get(f'/api/events?ids={second},{first},999').get_json()
+    by_body = client.post('/api/events/batch', json={'ids': [second, first, 999]}).get_json()
+
+    for body in (by_query, by_body):
+        assert [event['event_id'] for event in body['events']] == [second, first]
+        assert body['missing_ids'] == [999]
+        assert all(set(event) == SUMMARY_KEYS for event in body['events'])
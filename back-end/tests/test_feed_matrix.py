@@ -0,0 +1,119 @@
+"""
+EventMatrix follows the EventChange log incrementally, and reloads in full once the log has
+been pruned past its position.
+"""
+
+import time
+
+import pytest
+
+from app.data import feed_matrix, write_queue
+from app.data.feed_matrix import EventMatrix, prune_change_log
+from conftest import create_event, create_user, login_as
+
+
+@pytest.fixture
+def host(db):
+    return create_user(db, 'Host')
+
+
+@pytest.fixture
+def matrix(db, host, monkeypatch):
+    matrix = EventMatrix()
+    matrix.full_loads = 0
+    full_load = matrix._full_load
+
+    def counting_full_load(conn):
+        matrix.full_loads += 1
+        full_load(conn)
+
+    monkeypatch.setattr(matrix, '_full_load', counting_full_load)
+    create_event(db, host, 'Pizza Night')
+    matrix.refresh(db, min_interval=0)
+    return matrix
+
+
+def _titles_indexed(matrix, word):
+    return len(matrix._token_rows.get(word, ()))
+
+
+def test_changes_are_applied_incrementally(db, host, matrix):
+    event_id = create_event(db, host, 'Taco Tuesday')
+    db.execute("UPDATE Event SET title = 'Sushi Social' WHERE title = 'Pizza Night'")
+    matrix.refresh(db, min_interval=0)
+
+    assert matrix.full_loads == 1
+    assert event_id in matrix._rows
+    assert _titles_indexed(matrix, 'sushi') == 1
+    assert _titles_indexed(matrix, 'pizza') == 0
+    assert matrix.last_seq == db.execute("SELECT MAX(seq) FROM EventChange").fetchone()[0]
+
+    db.execute("DELETE FROM Event WHERE event_id = ?", (event_id,))
+    matrix.refresh(db, min_interval=0)
+    assert matrix.full_loads == 1
+    assert event_id not in matrix._rows
+
+
+def test_pruned_log_triggers_a_full_reload(db, host, matrix):
+    events = [create_event(db, host, f"Bagel Brunch {i}") for i in range(5)]
+    assert prune_change_log(db, retain=2) > 0
+    assert db.execute("SELECT COUNT(*) FROM EventChange").fetchone()[0] == 2
+
+    matrix.refresh(db, min_interval=0)
+
+    assert matrix.full_loads == 2
+    assert all(event_id in matrix._rows for event_id in events)
+    assert matrix.last_seq == db.execute("SELECT MAX(seq) FROM EventChange").fetchone()[0]
+
+
+def test_prune_keeps_the_latest_entry(db, host):
+    create_event(db, host)
+    create_event(db, host)
+    prune_change_log(db, retain=0)
+    assert db.execute("SELECT COUNT(*) FROM EventChange").fetchone()[0] == 1
+
+
+def test_writer_thread_prunes_the_log(client, db, host, monkeypatch):
+    monkeypatch.setitem(write_queue._maintenance_tasks, prune_change_log, 0)
+    monkeypatch.setitem(feed_matrix._settings, 'retain', 3)
+    events = [create_event(db, host, quantity=5) for _ in range(10)]
+
+    guest = create_user(db, 'Guest')
+    login_as(client, guest)
+    for event_id in events:
+        # Every reservation changes the event's quantity and so appends to the log
+        assert client.post('/api/rsvp', json={'event_id': event_id, 'rsvp_status': 'Going'}).status_code == 201
+
+    assert db.execute("SELECT COUNT(*) FROM EventChange").fetchone()[0] <= 3 + 1
+
+
+def test_started_events_are_dropped_when_changes_are_applied(db, host, matrix):
+    started = create_event(db, host, 'Bagel Brunch', days_ahead=0)
+    db.execute("UPDATE Event SET start_time = '00:00:00' WHERE event_id = ?", (started,))
+    upcoming = create_event(db, host, 'Taco Tuesday')
+    matrix.refresh(db, min_interval=0)
+
+    assert started not in matrix._rows
+    assert upcoming in matrix._rows
+    assert _titles_indexed(matrix, 'bagel') == 0
+
+    # Moving it later brings it back
+    db.execute("UPDATE Event SET event_date = date('now', '+2 day') WHERE event_id = ?", (started,))
+    matrix.refresh(db, min_interval=0)
+    assert started in matrix._rows
+
+
+def test_idle_writer_prunes_the_log(client, db, host, monkeypatch):
+    monkeypatch.setitem(write_queue._maintenance_tasks, prune_change_log, 0.05)
+    monkeypatch.setitem(feed_matrix._settings, 'retain', 3)
+    for _ in range(10):
+        create_event(db, host)
+
+    # Any request starts the writer; no write goes through the queue
+    assert client.get('/api/events/top_rated').status_code == 200
+
+    deadline = time.monotonic() + 5
+    while db.execute("SELECT COUNT(*) FROM EventChange").fetchone()[0] > 3:
+        assert time.monotonic() < deadline, "EventChange was not pruned"
+        time.sleep(0.05)
+    assert write_queue.get_write_queue_stats()['ops'] == 0
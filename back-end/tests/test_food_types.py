@@ -0,0 +1,95 @@
+import sqlite3
+
+import pytest
+
+from app.data import food_types
+from app.data.food_types import (
+    UnknownFoodTypeError, encode_mask, get_food_types, resolve_food_type_ids
+)
+
+from conftest import create_user, login_as
+
+
+@pytest.fixture
+def ctx(app):
+    with app.app_context():
+        yield
+
+
+def _id(name):
+    return get_food_types().by_name[name]
+
+
+def test_encode_mask_sets_one_bit_per_food_type(ctx):
+    mask, unknown = encode_mask(['Vegan', 'Snacks', 'Vegan'])
+
+    assert mask == (1 << (_id('Vegan') - 1)) | (1 << (_id('Snacks') - 1))
+    assert unknown == []
+
+
+def test_encode_mask_reports_unknown_names(ctx):
+    mask, unknown = encode_mask(['Halal', 'Pizza'])
+
+    assert mask == 1 << (_id('Halal') - 1)
+    assert unknown == ['Pizza']
+
+
+def test_resolve_food_type_ids_drops_duplicates(ctx):
+    assert resolve_food_type_ids(['Vegan', 'Halal', 'Vegan']) == [_id('Vegan'), _id('Halal')]
+
+
+def test_resolve_food_type_ids_rejects_unknown_names(ctx):
+    with pytest.raises(UnknownFoodTypeError) as excinfo:
+        resolve_food_type_ids(['Vegan', 'Pizza', 7])
+
+    assert excinfo.value.names == ['Pizza', 7]
+    assert isinstance(excinfo.value, ValueError)
+
+
+def test_rename_is_picked_up_on_the_next_lookup(ctx, db):
+    vegan = _id('Vegan')
+    db.execute("UPDATE FoodTypes SET food_type_name = 'Plant-Based' WHERE food_type_id = ?", (vegan,))
+
+    # The new name misses the loaded map, which forces a version check
+    assert resolve_food_type_ids(['Plant-Based']) == [vegan]
+    with pytest.raises(UnknownFoodTypeError):
+        resolve_food_type_ids(['Vegan'])
+
+
+def test_removal_is_picked_up_after_the_check_interval(ctx, db, monkeypatch):
+    other = _id('Other')
+    db.execute("DELETE FROM FoodTypes WHERE food_type_id = ?", (other,))
+    assert 'Other' in get_food_types().by_name
+
+    monkeypatch.setattr(food_types, 'VERSION_CHECK_INTERVAL', 0.0)
+    assert 'Other' not in get_food_types().by_name
+    assert encode_mask(['Other']) == (0, ['Other'])
+
+
+def test_unchanged_table_is_not_reloaded(ctx, monkeypatch):
+    loaded = get_food_types()
+    monkeypatch.setattr(food_types, 'VERSION_CHECK_INTERVAL', 0.0)
+
+    assert get_food_types() is loaded
+
+
+def test_edit_profile_rejects_unknown_diet(client, db):
+    login_as(client, create_user(db))
+
+    response = client.put('/api/edit_profile', json={'name': 'Alice', 'diet': ['Vegan', 'Pizza']})
+
+    assert response.status_code == 400
+    assert 'Pizza' in response.get_json()['message']
+
+
+def test_food_type_ids_are_capped_to_the_mask_width(ctx, db, monkeypatch):
+    monkeypatch.setattr(food_types, 'VERSION_CHECK_INTERVAL', 0.0)
+    db.execute("INSERT INTO FoodTypes (food_type_id, food_type_name) VALUES (63, 'Last Bit')")
+    assert encode_mask(['Last Bit']) == (1 << 62, [])
+
+    # The next AUTOINCREMENT ID would be 64, which has no bit in the mask
+    with pytest.raises(sqlite3.IntegrityError, match='between 1 and 63'):
+        db.execute("INSERT INTO FoodTypes (food_type_name) VALUES ('Overflow')")
+    with pytest.raises(sqlite3.IntegrityError):
+        db.execute("UPDATE FoodTypes SET food_type_id = 0 WHERE food_type_name = 'Vegan'")
+    assert 'Overflow' not in get_food_types().by_name
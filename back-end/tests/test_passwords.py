@@ -0,0 +1,42 @@
+"""
+Password hashing runs in a pool of spawned processes, which re-import the __main__ module.
+"""
+
+import os
+import runpy
+
+import app as app_package
+from app.auth.passwords import hash_password, needs_rehash, verify_password
+
+MAIN_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'main.py')
+
+
+def test_main_module_does_not_create_an_app_when_reimported(monkeypatch):
+    def fail():
+        raise AssertionError("create_app() called on import")
+
+    monkeypatch.setattr(app_package, 'create_app', fail)
+
+    # How spawned workers import the parent's main module
+    namespace = runpy.run_path(MAIN_PATH, run_name='__mp_main__')
+
+    assert 'app' not in namespace
+
+
+def test_hash_and_verify_in_the_worker_pool(app):
+    password_hash = hash_password('s3cret')
+
+    assert password_hash.startswith('pbkdf2:sha256:1$')
+    assert verify_password(password_hash, 's3cret')
+    assert not verify_password(password_hash, 'wrong')
+    assert not needs_rehash(password_hash)
+    assert needs_rehash('scrypt:32768:8:1$salt$hash')
+
+
+def test_register_then_login(client):
+    response = client.post('/auth/register', json={
+        'email': 'hash@bu.edu', 'password': 's3cret', 'buid': 'U00000042', 'name': 'Hash User',
+    })
+    assert response.status_code == 201
+    assert client.post('/auth/login', json={'email': 'hash@bu.edu', 'password': 's3cret'}).status_code == 200
+    assert client.post('/auth/login', json={'email': 'hash@bu.edu', 'password': 'wrong'}).status_code == 401
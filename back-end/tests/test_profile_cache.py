@@ -0,0 +1,45 @@
+from app.cache import profile_cache, profile_version
+
+from conftest import create_user, login_as
+
+
+def _edit(client, name):
+    return client.put('/api/edit_profile', json={'name': name, 'diet': ['Vegan']})
+
+
+def test_edit_only_evicts_the_editors_profile(app, db):
+    alice = create_user(db, name='Alice')
+    bob = create_user(db, name='Bob')
+    alice_client, bob_client = app.test_client(), app.test_client()
+    login_as(alice_client, alice)
+    login_as(bob_client, bob)
+
+    # Warm both users' cached profiles
+    assert alice_client.get('/api/get_profile').get_json()['name'] == 'Alice'
+    assert bob_client.get('/api/get_profile').get_json()['name'] == 'Bob'
+
+    assert _edit(alice_client, 'Alice B').status_code == 200
+
+    hits = profile_cache.stats()['hits']
+    assert bob_client.get('/api/get_profile').get_json()['name'] == 'Bob'
+    assert profile_cache.stats()['hits'] == hits + 1
+
+    misses = profile_cache.stats()['misses']
+    profile = alice_client.get('/api/get_profile').get_json()
+    assert profile['name'] == 'Alice B'
+    assert profile['dietary_preferences'] == ['Vegan']
+    assert profile_cache.stats()['misses'] == misses + 1
+
+
+def test_other_workers_copy_is_stale_after_edit(app, db):
+    user_id = create_user(db, name='Alice')
+    client = app.test_client()
+    login_as(client, user_id)
+    client.get('/api/get_profile')
+
+    # A copy cached by another worker, which only sees the shared version move
+    stale = dict(profile_cache.get(user_id, profile_version.value(user_id)))
+    assert _edit(client, 'Alice B').status_code == 200
+    profile_cache.set(user_id, stale, version=profile_version.value(user_id) - 1)
+
+    assert client.get('/api/get_profile').get_json()['name'] == 'Alice B'
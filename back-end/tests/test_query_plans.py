@@ -0,0 +1,141 @@
+"""
+The hot-path queries must be answered from indexes:
+
+- no plan step may be a full table scan ("SCAN <table>" without an index);
+- a full walk of an index ("SCAN <table> USING INDEX") is only allowed where the case expects
+  it, i.e. an ordered walk that stops at the LIMIT;
+- every case must show the index steps it exists for (usually a SEARCH);
+- keyset-paged listings must be read in index order, without a temporary sort.
+"""
+
+import re
+from datetime import date
+
+import pytest
+
+from app.data import database
+from conftest import create_event, create_user, login_as
+
+_PLANNABLE_RE = re.compile(r"\s*(SELECT|WITH|INSERT|UPDATE|DELETE)\b", re.IGNORECASE)
+
+# Scans that walk an index (in its order) or are an FTS5 index lookup
+_INDEXED_SCAN_RE = re.compile(r"USING (COVERING |INTEGER PRIMARY KEY |)INDEX|VIRTUAL TABLE INDEX")
+
+# Names of common table expressions, whose rows are already the result of an indexed query
+_CTE_RE = re.compile(r"\b(\w+)\s+AS\s+(?:NOT\s+)?(?:MATERIALIZED\s+)?\(", re.IGNORECASE)
+
+# Statements FTS5 runs on its own shadow tables (tiny configuration lookups)
+_FTS_SHADOW_RE = re.compile(r"'main'\.'EventSearch_\w+'")
+
+
+@pytest.fixture
+def statements(app, monkeypatch):
+    # Record every statement run on pooled connections, with its parameters expanded
+    captured = []
+    monkeypatch.setattr(
+        database, '_connection_hooks',
+        database._connection_hooks + [lambda conn: conn.set_trace_callback(captured.append)]
+    )
+    database.get_pool().close_all()
+    return captured
+
+
+@pytest.fixture
+def seeded(db):
+    host = create_user(db, 'Host')
+    guest = create_user(db, 'Guest')
+    events = [create_event(db, host, f"Event {i}", food_types=('Vegan', 'Halal')) for i in range(5)]
+    for event_id in events[:3]:
+        db.execute("INSERT INTO RSVP (user_id, event_id, status) VALUES (?, ?, 'Going')", (guest, event_id))
+        db.execute("INSERT INTO Favorite (user_id, event_id) VALUES (?, ?)", (guest, event_id))
+        db.execute("INSERT INTO Review (user_id, event_id, rating) VALUES (?, ?, 4)", (guest, event_id))
+    return {'host': host, 'guest': guest, 'events': events}
+
+
+def _plan(db, statements):
+    plan = []
+    for sql in statements:
+        if not _PLANNABLE_RE.match(sql) or _FTS_SHADOW_RE.search(sql):
+            continue
+        derived = {name.lower() for name in _CTE_RE.findall(sql)} | {'constant'}
+        for row in db.execute(f"EXPLAIN QUERY PLAN {sql}"):
+            plan.append((row[3], derived, ' '.join(sql.split())))
+    return plan
+
+
+def _violations(plan, expected, paged):
+    violations = []
+    for detail, derived, sql in plan:
+        if detail.startswith('SCAN '):
+            source = detail.split()[1]
+            if source.startswith('(') or source.lower() in derived or 'VIRTUAL TABLE INDEX' in detail:
+                continue
+            if not _INDEXED_SCAN_RE.search(detail):
+                violations.append(f"full table scan: {detail}  <-  {sql}")
+            elif not any(step in detail for step in expected):
+                violations.append(f"full index walk: {detail}  <-  {sql}")
+        elif paged and 'TEMP B-TREE' in detail:
+            violations.append(f"temporary sort in a keyset-paged listing: {detail}  <-  {sql}")
+
+    details = [detail for detail, _, _ in plan]
+    for step in expected:
+        if not any(step in detail for detail in details):
+            violations.append(f"missing plan step: {step}")
+    return violations
+
+
+@pytest.mark.parametrize('user, method, path, body, expected, paged', [
+    # Ordered walks of the feed index, stopping at the page's LIMIT
+    ('guest', 'GET', '/api/getevents', None,
+     ['SCAN e USING INDEX idx_event_summary_date'], True),
+    ('guest', 'GET', '/api/getevents?dietary_needs=Vegan', None,
+     ['SCAN e USING INDEX idx_event_summary_date'], True),
+    ('guest', 'GET', '/api/getevents?cursor={cursor}', None,
+     ['SEARCH e USING INDEX idx_event_summary_date (event_date>?)'], True),
+    ('guest', 'GET', '/api/getevents?date={today}', None,
+     ['SEARCH e USING INDEX idx_event_summary_date (event_date=?)'], True),
+    # Ranked by bm25, so sorted after the full-text lookup
+    ('guest', 'GET', '/api/getevents?search=pizza', None,
+     ['SCAN EventSearch VIRTUAL TABLE INDEX', 'SEARCH e USING INTEGER PRIMARY KEY'], False),
+    ('host', 'GET', '/api/user_events', None,
+     ['SEARCH e USING INDEX idx_event_summary_user (user_id=?)'], False),
+    # Only the user's own favorites are sorted; walking every event in date order to find
+    # them would cost more for everyone with few favorites
+    ('guest', 'GET', '/favorites', None,
+     ['SEARCH f USING COVERING INDEX sqlite_autoindex_Favorite_1 (user_id=?)',
+      'SEARCH e USING INTEGER PRIMARY KEY'], False),
+    ('guest', 'GET', '/favorites?dietary_needs=Vegan', None,
+     ['SEARCH f USING COVERING INDEX sqlite_autoindex_Favorite_1 (user_id=?)'], False),
+    ('guest', 'GET', '/api/user_rsvps', None,
+     ['SEARCH r USING INDEX idx_rsvp_user_event_unique (user_id=?)'], False),
+    ('guest', 'GET', '/api/event_rsvps/{event}', None,
+     ['SEARCH r USING COVERING INDEX idx_rsvp_event_user (event_id=?)'], False),
+    ('guest', 'POST', '/api/rsvp', {'event_id': '{event}', 'rsvp_status': 'Going'},
+     ['SEARCH r USING INDEX idx_rsvp_user_event_unique (user_id=? AND event_id=?)'], False),
+    ('host', 'POST', '/api/rsvp', {'event_id': '{event}', 'rsvp_status': 'Going'},
+     ['SEARCH RSVP USING INDEX idx_rsvp_user_event_unique (user_id=? AND event_id=?)',
+      'SEARCH Event USING INTEGER PRIMARY KEY'], False),
+    ('host', 'POST', '/api/review', {'user_id': '{user}', 'event_id': '{event}', 'rating': 5},
+     ['SEARCH Event USING INTEGER PRIMARY KEY'], False),
+    # The top-rated index is walked in rating order up to the LIMIT
+    ('guest', 'GET', '/api/events/top_rated', None,
+     ['SCAN e USING INDEX idx_event_summary_top_rated'], False),
+    ('guest', 'GET', '/api/events/{event}', None,
+     ['SEARCH Event USING INTEGER PRIMARY KEY'], False),
+])
+def test_hot_queries_use_indexes(client, db, seeded, statements, user, method, path, body, expected, paged):
+    values = {'event': seeded['events'][0], 'user': seeded[user], 'today': date.today().isoformat()}
+    login_as(client, seeded[user])
+    if '{cursor}' in path:
+        values['cursor'] = client.get('/api/getevents?per_page=2').get_json()['next_cursor']
+    if body is not None:
+        body = {
+            key: int(value.format(**values)) if isinstance(value, str) and '{' in value else value
+            for key, value in body.items()
+        }
+
+    statements.clear()
+    response = client.open(path.format(**values), method=method, json=body)
+    assert response.status_code < 400, response.get_data(as_text=True)
+    assert any(_PLANNABLE_RE.match(sql) for sql in statements)
+    assert _violations(_plan(db, statements), expected, paged) == []
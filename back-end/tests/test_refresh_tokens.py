@@ -0,0 +1,94 @@
+"""
+Refresh tokens are rotated on every use; presenting an already-rotated token revokes every
+token of its login (its family).
+"""
+
+import pytest
+
+from app.auth.refresh_tokens import purge_expired_refresh_tokens
+
+PASSWORD = 'correct horse battery staple'
+
+
+@pytest.fixture
+def logged_in(client):
+    response = client.post('/auth/register', json={
+        'email': 'refresh@bu.edu', 'password': PASSWORD, 'buid': 'U12345678', 'name': 'Refresh User',
+    })
+    assert response.status_code == 201
+    response = client.post('/auth/login', json={'email': 'refresh@bu.edu', 'password': PASSWORD})
+    assert response.status_code == 200
+    return client
+
+
+def _refresh_token(client):
+    cookie = client.get_cookie('refresh_token', path='/auth')
+    return cookie.value if cookie is not None else None
+
+
+def _refresh_with(client, token):
+    client.set_cookie('refresh_token', token, path='/auth')
+    return client.post('/auth/refresh')
+
+
+def test_refresh_rotates_the_token(logged_in, db):
+    first = _refresh_token(logged_in)
+
+    response = logged_in.post('/auth/refresh')
+
+    assert response.status_code == 200
+    second = _refresh_token(logged_in)
+    assert second and second != first
+    assert logged_in.get_cookie('token').value
+    assert logged_in.get('/auth/verify').status_code == 200
+
+    rows = db.execute("SELECT family_id, revoked FROM RefreshToken ORDER BY revoked DESC").fetchall()
+    assert [row["revoked"] for row in rows] == [1, 0]
+    assert rows[0]["family_id"] == rows[1]["family_id"]
+
+
+def test_reusing_a_rotated_token_revokes_the_family(logged_in, db):
+    first = _refresh_token(logged_in)
+    assert logged_in.post('/auth/refresh').status_code == 200
+    second = _refresh_token(logged_in)
+
+    # The old token is presented again, e.g. by whoever copied it
+    assert _refresh_with(logged_in, first).status_code == 401
+
+    # The legitimate holder's current token was revoked with it
+    assert _refresh_with(logged_in, second).status_code == 401
+    assert db.execute("SELECT COUNT(*) FROM RefreshToken WHERE revoked = 0").fetchone()[0] == 0
+
+
+def test_logout_revokes_the_refresh_token(logged_in):
+    token = _refresh_token(logged_in)
+
+    assert logged_in.post('/auth/logout').status_code == 200
+
+    assert _refresh_with(logged_in, token).status_code == 401
+
+
+def test_unknown_token_is_rejected(client):
+    assert _refresh_with(client, 'not-a-token').status_code == 401
+    assert client.post('/auth/refresh').status_code == 401
+
+
+def test_logout_leaves_expired_tokens_to_the_purge(logged_in, db):
+    db.execute("UPDATE RefreshToken SET expires_at = 0")
+
+    assert logged_in.post('/auth/logout').status_code == 200
+
+    assert db.execute("SELECT COUNT(*) FROM RefreshToken").fetchone()[0] == 1
+
+
+def test_purge_deletes_only_expired_tokens_by_index(logged_in, db):
+    logged_in.post('/auth/refresh')
+    db.execute("UPDATE RefreshToken SET expires_at = 0 WHERE revoked = 1")
+
+    assert purge_expired_refresh_tokens(db) == 1
+    assert db.execute("SELECT COUNT(*) FROM RefreshToken").fetchone()[0] == 1
+
+    plan = db.execute(
+        "EXPLAIN QUERY PLAN DELETE FROM RefreshToken WHERE expires_at <= ?", (0,)
+    ).fetchall()
+    assert any(row['detail'].startswith('SEARCH') and 'idx_refresh_token_expires' in row['detail'] for row in plan)
@@ -0,0 +1,50 @@
+"""
+Feedback posted to /api/review is stored (comment in Review.comments) and reflected in the
+rating aggregates served by /api/events/top_rated.
+"""
+
+from conftest import create_event, create_user
+
+
+def test_posted_feedback_is_stored_and_aggregated(client, db):
+    host = create_user(db, 'Host')
+    guests = [create_user(db, f"Guest {i}") for i in range(2)]
+    event_id = create_event(db, host)
+
+    # Warm the top-rated cache so the test also covers its invalidation
+    assert client.get('/api/events/top_rated').get_json()['events'] == []
+
+    for user_id, rating in zip(guests, (5, 4)):
+        response = client.post('/api/review', json={
+            'user_id': user_id, 'event_id': event_id, 'rating': rating, 'comment': f"Rated {rating}",
+        })
+        assert response.status_code == 201
+
+    rows = db.execute(
+        "SELECT user_id, rating, comments FROM Review WHERE event_id = ? ORDER BY user_id", (event_id,)
+    ).fetchall()
+    assert [tuple(row) for row in rows] == [(guests[0], 5, 'Rated 5'), (guests[1], 4, 'Rated 4')]
+
+    events = client.get('/api/events/top_rated').get_json()['events']
+    assert len(events) == 1
+    assert events[0]['event_id'] == event_id
+    assert events[0]['rating_count'] == 2
+    assert events[0]['average_rating'] == 4.5
+
+
+def test_feedback_for_a_missing_event_is_404(client, db):
+    user_id = create_user(db)
+
+    response = client.post('/api/review', json={'user_id': user_id, 'event_id': 999, 'rating': 5})
+
+    assert response.status_code == 404
+    assert db.execute("SELECT COUNT(*) FROM Review").fetchone()[0] == 0
+
+
+def test_feedback_with_an_invalid_rating_is_400(client, db):
+    host = create_user(db, 'Host')
+    event_id = create_event(db, host)
+
+    response = client.post('/api/review', json={'user_id': host, 'event_id': event_id, 'rating': 9})
+
+    assert response.status_code == 400
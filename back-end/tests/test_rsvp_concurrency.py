@@ -0,0 +1,67 @@
+"""
+Concurrent RSVPs must never reserve more portions than an event has.
+"""
+
+import threading
+from collections import Counter
+
+from app.data.write_queue import get_write_queue_stats
+from conftest import create_event, create_user, login_as
+
+CLIENTS = 300
+QUANTITY = 50
+
+
+def test_concurrent_going_rsvps_never_oversell(app, db):
+    host = create_user(db, 'Host')
+    event_id = create_event(db, host, quantity=QUANTITY)
+    users = [create_user(db, f"Guest {i}") for i in range(CLIENTS)]
+
+    barrier = threading.Barrier(CLIENTS)
+    statuses = []
+    lock = threading.Lock()
+
+    def rsvp(user_id):
+        client = app.test_client()
+        login_as(client, user_id)
+        barrier.wait()
+        response = client.post('/api/rsvp', json={'event_id': event_id, 'rsvp_status': 'Going'})
+        with lock:
+            statuses.append(response.status_code)
+
+    threads = [threading.Thread(target=rsvp, args=(user_id,)) for user_id in users]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert Counter(statuses) == {201: QUANTITY, 409: CLIENTS - QUANTITY}
+
+    quantity = db.execute("SELECT quantity FROM Event WHERE event_id = ?", (event_id,)).fetchone()[0]
+    going = db.execute(
+        "SELECT COUNT(*) FROM RSVP WHERE event_id = ? AND status = 'Going'", (event_id,)
+    ).fetchone()[0]
+    summary = db.execute(
+        "SELECT quantity, rsvp_count FROM EventSummary WHERE event_id = ?", (event_id,)
+    ).fetchone()
+    assert quantity == 0
+    assert going == QUANTITY
+    assert tuple(summary) == (0, QUANTITY)
+
+    # Sold-out answers are business rejections, not write errors
+    stats = get_write_queue_stats()
+    assert stats['failed'] == 0
+    assert stats['ops'] == QUANTITY + stats['rejected']
+
+
+def test_cancelling_gives_the_portion_back(client, db):
+    host = create_user(db, 'Host')
+    guest = create_user(db, 'Guest')
+    event_id = create_event(db, host, quantity=1)
+    login_as(client, guest)
+
+    assert client.post('/api/rsvp', json={'event_id': event_id, 'rsvp_status': 'Going'}).status_code == 201
+    assert client.post('/api/rsvp', json={'event_id': event_id, 'rsvp_status': 'Going'}).status_code == 200
+    assert client.post('/api/rsvp', json={'event_id': event_id, 'rsvp_status': 'Not Going'}).status_code == 201
+
+    assert db.execute("SELECT quantity FROM Event WHERE event_id = ?", (event_id,)).fetchone()[0] == 1
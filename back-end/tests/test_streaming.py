@@ -0,0 +1,46 @@
+from app.data.database import get_pool_stats
+from app.data.streaming import stream_query
+
+from conftest import create_user
+
+
+def _stream_users(app):
+    with app.test_request_context('/api/users?stream=1'):
+        return stream_query("SELECT user_id, name FROM User ORDER BY user_id", [], dict)
+
+
+def test_unread_stream_releases_its_connection_on_close(app, db):
+    create_user(db)
+    in_use = get_pool_stats()['in_use']
+
+    response = _stream_users(app)
+    assert get_pool_stats()['in_use'] == in_use + 1
+
+    response.close()
+    assert get_pool_stats()['in_use'] == in_use
+
+
+def test_read_stream_releases_its_connection_once(app, db):
+    user_id = create_user(db, name='Alice')
+    before = get_pool_stats()
+
+    response = _stream_users(app)
+    assert response.get_data(as_text=True) == f'{{"user_id":{user_id},"name":"Alice"}}\n'
+    response.close()
+
+    after = get_pool_stats()
+    assert after['in_use'] == before['in_use']
+    assert after['released'] + after['discarded'] == before['released'] + before['discarded'] + 1
+
+
+def test_head_request_releases_the_stream_connection(client, db):
+    create_user(db)
+    client.get('/api/users')
+    in_use = get_pool_stats()['in_use']
+
+    response = client.head('/api/users?stream=1')
+    assert response.status_code == 200 and response.data == b''
+
+    # The WSGI server closes the (empty) body it was handed
+    response.close()
+    assert get_pool_stats()['in_use'] == in_use
@@ -0,0 +1,53 @@
+from conftest import create_user
+
+
+def _pages(client, **params):
+    pages = []
+    cursor = None
+    while True:
+        query = dict(params, cursor=cursor) if cursor else params
+        body = client.get('/api/users', query_string=query).get_json()
+        pages.append([user['name'] for user in body['users']])
+        cursor = body['next_cursor']
+        if cursor is None:
+            return pages
+
+
+def test_search_is_case_insensitive_across_pages(client, db):
+    for name in ('Alice', 'bob', 'alfred', 'ALBERT', 'Alma', 'Carol'):
+        create_user(db, name=name)
+
+    assert _pages(client, search='aL', per_page=2) == [['Alice', 'alfred'], ['ALBERT', 'Alma']]
+    assert _pages(client, search='AL', per_page=3) == [['Alice', 'alfred', 'ALBERT'], ['Alma']]
+
+
+def test_search_matches_email_prefix(client, db):
+    create_user(db, name='Dana', email='dana@bu.edu')
+    create_user(db, name='Eve', email='DANIEL@bu.edu')
+    create_user(db, name='Frank', email='frank@bu.edu')
+
+    assert _pages(client, search='dan') == [['Dana', 'Eve']]
+
+
+def test_pages_never_include_password_hashes(client, db):
+    for count in range(3):
+        create_user(db, name=f'User {count}')
+
+    body = client.get('/api/users', query_string={'per_page': 2}).get_json()
+
+    assert len(body['users']) == 2 and body['next_cursor']
+    assert all('password_hash' not in user for user in body['users'])
+
+
+def test_invalid_cursor_is_rejected(client):
+    assert client.get('/api/users', query_string={'cursor': 'nonsense'}).status_code == 400
+
+
+def test_search_folds_only_ascii_case(client, db):
+    for name in ('Émile', 'émilie', 'Azure', 'AZTEC', 'Eve'):
+        create_user(db, name=name)
+
+    # NOCASE folds ASCII letters only, so a non-ASCII letter matches exactly
+    assert _pages(client, search='Ém') == [['Émile']]
+    assert _pages(client, search='ém') == [['émilie']]
+    assert _pages(client, search='aZ') == [['Azure', 'AZTEC']]
@@ -0,0 +1,68 @@
+import threading
+import time
+
+import pytest
+
+from app.cache import event_version
+from app.data import write_queue
+from app.data.rsvps import save_rsvp
+from app.data.write_queue import WriteQueueTimeout, execute_write, get_write_queue
+from app.routes import rsvp_routes
+
+from conftest import create_event, create_user, login_as
+
+
+@pytest.fixture
+def short_timeout(app, monkeypatch):
+    monkeypatch.setitem(write_queue._settings, 'timeout', 0.05)
+
+
+def _slow_insert(conn, user_id, delay):
+    time.sleep(delay)
+    conn.execute("UPDATE User SET bio = 'written' WHERE user_id = ?", (user_id,))
+    return 'done'
+
+
+def test_running_write_is_awaited_past_the_timeout(short_timeout, db):
+    user_id = create_user(db)
+
+    # Still running when the timeout expires: the result is reported once its batch commits
+    assert execute_write(_slow_insert, user_id, 0.3) == 'done'
+    assert db.execute("SELECT bio FROM User WHERE user_id = ?", (user_id,)).fetchone()[0] == 'written'
+
+
+def test_queued_write_times_out_and_never_runs(short_timeout, db):
+    user_id = create_user(db)
+    ran = threading.Event()
+
+    def record(conn):
+        ran.set()
+
+    # Keep the writer busy so the next write is still queued when the timeout expires
+    blocker = get_write_queue().submit(_slow_insert, user_id, 0.3)
+    time.sleep(0.05)
+
+    with pytest.raises(WriteQueueTimeout):
+        execute_write(record)
+
+    assert blocker.result() == 'done'
+    get_write_queue().submit(lambda conn: None).result()
+    assert not ran.is_set()
+
+
+def test_slow_rsvp_is_reported_and_invalidates_the_feed(short_timeout, client, db, monkeypatch):
+    event_id = create_event(db, create_user(db, name='Host'), quantity=5)
+    login_as(client, create_user(db, name='Guest'))
+
+    def slow_save_rsvp(conn, *args):
+        time.sleep(0.2)
+        return save_rsvp(conn, *args)
+
+    monkeypatch.setattr(rsvp_routes, 'save_rsvp', slow_save_rsvp)
+    version = event_version.value
+
+    response = client.post('/api/rsvp', json={'event_id': event_id, 'rsvp_status': 'Going'})
+
+    assert response.status_code == 201
+    assert event_version.value > version
+    assert db.execute("SELECT quantity FROM Event WHERE event_id = ?", (event_id,)).fetchone()[0] == 4
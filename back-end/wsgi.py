@@ -0,0 +1,11 @@
+"""
+WSGI entry point for production servers.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+main.py runs the single-process development server instead.
+"""
+
+from app import create_app
+
+app = create_app()